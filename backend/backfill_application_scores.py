@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Migra a pontuação legada para applications.scores
+
+Antes, a pontuação ficava espalhada entre a coleção scores,
+applications.stage_score e applications.scores. Agora ela vive só em
+applications.scores ({status, total, breakdown, updated_at}), com
+scores.total indexado.
+
+Para candidaturas sem scores.total:
+- com documento na coleção scores: copia o mais recente (total_score,
+  breakdown, calculated_at);
+- sem documento: marca scores.status = "pending", e a fila de pontuação
+  recalcula no próximo startup.
+
+Em todas as candidaturas remove stage_score. A coleção scores não é apagada;
+use --drop-legacy depois de conferir a migração.
+
+Uso:
+    python backfill_application_scores.py
+    python backfill_application_scores.py --batch-size 2000
+    python backfill_application_scores.py --drop-legacy
+"""
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).parent / '.env')
+
+
+async def legacy_scores(db, application_ids):
+    """application_id -> documento mais recente da coleção scores"""
+    latest = {}
+    async for score in db.scores.find(
+        {"application_id": {"$in": application_ids}},
+        {"_id": 0, "application_id": 1, "total_score": 1, "breakdown": 1, "calculated_at": 1}
+    ).sort("calculated_at", 1):
+        latest[score["application_id"]] = score
+    return latest
+
+
+async def backfill(args):
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+
+    query = {"$or": [{"scores.total": {"$exists": False}}, {"stage_score": {"$exists": True}}]}
+    last_id = None
+    copied = pending = cleaned = 0
+
+    while True:
+        page_query = query if last_id is None else {"$and": [query, {"_id": {"$gt": last_id}}]}
+        batch = await db.applications.find(
+            page_query, {"_id": 1, "id": 1, "scores": 1}
+        ).sort("_id", 1).limit(args.batch_size).to_list(args.batch_size)
+        if not batch:
+            break
+
+        unscored = [a["id"] for a in batch if "total" not in (a.get("scores") or {})]
+        legacy = await legacy_scores(db, unscored) if unscored else {}
+
+        operations = []
+        for app in batch:
+            update = {"$unset": {"stage_score": ""}}
+            if "total" not in (app.get("scores") or {}):
+                score = legacy.get(app["id"])
+                if score:
+                    update["$set"] = {"scores": {
+                        "status": "done",
+                        "total": score["total_score"],
+                        "breakdown": score.get("breakdown", {}),
+                        "updated_at": score.get("calculated_at")
+                    }}
+                    copied += 1
+                else:
+                    update["$set"] = {"scores": {"status": "pending"}}
+                    pending += 1
+            else:
+                cleaned += 1
+            operations.append(UpdateOne({"_id": app["_id"]}, update))
+
+        await db.applications.bulk_write(operations, ordered=False)
+        last_id = batch[-1]["_id"]
+        print(f"✓ lote de {len(batch)} ({copied} copiadas, {pending} pendentes, {cleaned} só stage_score removido)")
+
+    print(f"✅ {copied} pontuações copiadas, {pending} marcadas para recálculo, {cleaned} limpas")
+
+    if args.drop_legacy:
+        await db.scores.drop()
+        print("✅ coleção scores removida")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--drop-legacy", action="store_true", help="remove a coleção scores ao final")
+    asyncio.run(backfill(parser.parse_args()))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Preenche os campos normalizados de busca: candidates.search, jobs.search e
+skills.search
+
+Recalcula em lotes com bulk_write (para candidatos, os usuários de cada
+lote vêm de um único $in). Os normalizadores são memoizados, então valores
+repetidos (cidades, estados, instituições) são normalizados uma vez só.
+Idempotente; por padrão só processa documentos sem search ou gravados com
+uma versão anterior da normalização (search.v).
+
+Uso:
+    python backfill_search_fields.py                      # candidatos, vagas e skills desatualizados
+    python backfill_search_fields.py --collection jobs    # só vagas
+    python backfill_search_fields.py --all                # recalcula todos
+    python backfill_search_fields.py --batch-size 2000
+"""
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+from utils.candidate_search import build_search_fields, CANDIDATE_PROJECTION, USER_PROJECTION, SEARCH_FIELDS_VERSION
+from utils.search_fields import (
+    build_job_search_fields, build_skill_search_fields, JOB_PROJECTION, SKILL_PROJECTION,
+    JOB_SEARCH_VERSION, SKILL_SEARCH_VERSION
+)
+
+load_dotenv(Path(__file__).parent / '.env')
+
+COLLECTIONS = ["candidates", "jobs", "skills"]
+
+
+async def candidate_operations(db, batch):
+    user_ids = [c["user_id"] for c in batch]
+    users = {u["id"]: u async for u in db.users.find({"id": {"$in": user_ids}}, USER_PROJECTION)}
+    return [
+        UpdateOne({"_id": c["_id"]}, {"$set": {"search": build_search_fields(c, users.get(c["user_id"]))}})
+        for c in batch
+    ]
+
+
+async def job_operations(db, batch):
+    return [UpdateOne({"_id": j["_id"]}, {"$set": {"search": build_job_search_fields(j)}}) for j in batch]
+
+
+async def skill_operations(db, batch):
+    return [UpdateOne({"_id": s["_id"]}, {"$set": {"search": build_skill_search_fields(s.get("name"))}}) for s in batch]
+
+
+# coleção -> (projeção, versão atual, montagem das operações)
+BACKFILLS = {
+    "candidates": ({**CANDIDATE_PROJECTION, "_id": 1}, SEARCH_FIELDS_VERSION, candidate_operations),
+    "jobs": (JOB_PROJECTION, JOB_SEARCH_VERSION, job_operations),
+    "skills": (SKILL_PROJECTION, SKILL_SEARCH_VERSION, skill_operations),
+}
+
+
+async def backfill_collection(db, name, args):
+    projection, version, build_operations = BACKFILLS[name]
+    collection = db[name]
+    query = {} if args.all else {"search.v": {"$ne": version}}
+    last_id = None
+    updated = 0
+
+    while True:
+        page_query = query if last_id is None else {"$and": [query, {"_id": {"$gt": last_id}}]}
+        batch = await collection.find(page_query, projection).sort("_id", 1).limit(args.batch_size).to_list(args.batch_size)
+        if not batch:
+            break
+
+        result = await collection.bulk_write(await build_operations(db, batch), ordered=False)
+        updated += result.modified_count
+        last_id = batch[-1]["_id"]
+        print(f"✓ {name}: lote de {len(batch)} ({updated} atualizados)")
+
+    print(f"✅ {name}: {updated} documentos atualizados")
+
+
+async def backfill(args):
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+
+    for name in ([args.collection] if args.collection else COLLECTIONS):
+        await backfill_collection(db, name, args)
+
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", choices=COLLECTIONS, help="processa só uma coleção")
+    parser.add_argument("--all", action="store_true", help="recalcula inclusive quem já está na versão atual")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    asyncio.run(backfill(parser.parse_args()))
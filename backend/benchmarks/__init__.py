@@ -0,0 +1,14 @@
+"""
+Benchmark de carga local contra server.app (ASGI em processo)
+
+Sobe a aplicação com httpx.ASGITransport, popula um banco dedicado
+(mongod local ou, com --in-memory, o mongomock_motor) e executa os fluxos
+de candidato, recrutador e cliente em paralelo, reportando p50/p95/p99 e
+throughput por endpoint. O resultado é gravado em JSON para servir de
+baseline e comparado com --compare.
+
+Uso (a partir de backend/):
+    python -m benchmarks --in-memory --scale small --duration 10
+    python -m benchmarks --scale medium --out baseline.json
+    python -m benchmarks --scale medium --compare baseline.json --tolerance 0.2
+"""
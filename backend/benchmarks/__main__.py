@@ -0,0 +1,181 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks import __doc__ as USAGE
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=USAGE, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--in-memory", action="store_true", help="usa mongomock_motor em vez de um mongod")
+    parser.add_argument("--mongo-url", default=None, help="padrão: MONGO_URL do ambiente/.env")
+    parser.add_argument("--db-name", default="ciatos_benchmark", help="banco dedicado; é apagado antes do seed")
+    parser.add_argument("--scale", default="small", help="small | medium | large")
+    parser.add_argument("--tenants", type=int)
+    parser.add_argument("--jobs-per-tenant", type=int)
+    parser.add_argument("--candidates", type=int)
+    parser.add_argument("--applications-per-candidate", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--concurrency", type=int, default=20, help="usuários virtuais simultâneos")
+    parser.add_argument("--duration", type=float, default=15.0, help="segundos de medição")
+    parser.add_argument("--warmup", type=float, default=2.0, help="segundos descartados no início")
+    parser.add_argument("--mix", default="candidate=5,recruiter=3,client=2")
+    parser.add_argument("--out", default=None, help="grava o resultado em JSON")
+    parser.add_argument("--compare", default=None, help="baseline JSON para comparação")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="piora aceita no p95 (fração)")
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    """Precisa rodar antes de importar server (que conecta no import)"""
+    os.environ["DB_NAME"] = args.db_name
+    if args.mongo_url:
+        os.environ["MONGO_URL"] = args.mongo_url
+    os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+    os.environ.setdefault("JWT_REFRESH_SECRET", "benchmark-refresh-secret")
+
+    if args.in_memory:
+        os.environ.setdefault("MONGO_URL", "mongodb://in-memory")
+        try:
+            import mongomock_motor
+        except ImportError:
+            sys.exit("--in-memory requer o pacote mongomock-motor (pip install mongomock-motor)")
+        import motor.motor_asyncio
+        motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+
+
+async def login(client, email: str, password: str):
+    """Autentica via header Bearer (o cookie de sessão é secure e não trafega em http)"""
+    response = await client.post("/api/auth/login", json={"email": email, "password": password})
+    if response.status_code != 200:
+        raise RuntimeError(f"Login falhou para {email}: {response.status_code} {response.text}")
+    client.cookies.clear()
+    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+
+async def build_memory_indexes(db):
+    """
+    Reconstrói os índices em memória com o banco já populado. Os refreshers
+    do startup fazem a primeira construção com o banco vazio e só voltam
+    depois do intervalo de refresh; sem isso a busca por skills, o ranking
+    semântico e /jobs/{id}/matches mediriam o caminho vazio.
+    """
+    from utils.skill_index import skill_index, SKILL_INDEX_ENABLED
+    from utils.semantic_search import semantic_index, SEMANTIC_INDEX_ENABLED
+    from utils.typeahead import typeahead_index, TYPEAHEAD_ENABLED
+    from services.matching import pool_matcher, MATCHING_POOL_ENABLED
+
+    builds = [
+        index.build(db) for index, enabled in (
+            (skill_index, SKILL_INDEX_ENABLED),
+            (semantic_index, SEMANTIC_INDEX_ENABLED),
+            (typeahead_index, TYPEAHEAD_ENABLED),
+            (pool_matcher, MATCHING_POOL_ENABLED),
+        ) if enabled
+    ]
+    await asyncio.gather(*builds)
+
+
+async def run(args) -> int:
+    import httpx
+    import server
+    from benchmarks.dataset import SCALES, BENCHMARK_PASSWORD, seed_dataset
+    from benchmarks.scenarios import FLOWS, Recorder, VirtualUser, parse_mix
+    from benchmarks.report import summarize, format_table, compare, load_baseline, write_report
+
+    if args.scale not in SCALES:
+        sys.exit(f"Escala desconhecida: {args.scale}")
+    scale = dict(SCALES[args.scale])
+    for key in scale:
+        if getattr(args, key) is not None:
+            scale[key] = getattr(args, key)
+
+    await server.client.drop_database(args.db_name)
+    await server.app.router.startup()
+
+    try:
+        started_at = time.perf_counter()
+        dataset = await seed_dataset(server.db, seed=args.seed, **scale)
+        print(f"Seed em {time.perf_counter() - started_at:.1f}s: {dataset.counts}")
+        started_at = time.perf_counter()
+        await build_memory_indexes(server.db)
+        print(f"Índices em memória em {time.perf_counter() - started_at:.1f}s")
+
+        rng = random.Random(args.seed)
+        weights = parse_mix(args.mix)
+        roles = [role for role, weight in weights.items() for _ in range(weight)]
+        transport = httpx.ASGITransport(app=server.app)
+
+        vus = []
+        for i in range(args.concurrency):
+            role = roles[i % len(roles)]
+            tenant_id = dataset.tenant_ids[i % len(dataset.tenant_ids)]
+            if role == "candidate":
+                email = dataset.candidate_emails[i % len(dataset.candidate_emails)]
+            elif role == "recruiter":
+                email = dataset.recruiter_emails[tenant_id]
+            else:
+                email = dataset.client_emails[tenant_id]
+            client = httpx.AsyncClient(transport=transport, base_url="http://benchmark")
+            await login(client, email, BENCHMARK_PASSWORD)
+            vus.append(VirtualUser(role, client, tenant_id, random.Random(rng.random())))
+
+        recorder = Recorder()
+        warmup_until = time.perf_counter() + args.warmup
+        deadline = warmup_until + args.duration
+
+        async def worker(vu: VirtualUser):
+            while time.perf_counter() < deadline:
+                await FLOWS[vu.role](vu, dataset, recorder)
+
+        print(f"Executando {args.concurrency} usuários virtuais ({args.mix}) por {args.duration:.0f}s...")
+        await asyncio.gather(*(worker(vu) for vu in vus))
+
+        # Descarta as amostras do aquecimento
+        measured = [s for s in recorder.samples if s.started_at >= warmup_until]
+        summary = summarize(measured, args.duration)
+        for vu in vus:
+            await vu.client.aclose()
+    finally:
+        await server.app.router.shutdown()
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "scale": scale,
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "mix": args.mix,
+            "backend": "in-memory" if args.in_memory else "mongod",
+        },
+        "endpoints": summary,
+    }
+
+    print(format_table(summary))
+    if args.out:
+        write_report(args.out, report)
+        print(f"\nResultado gravado em {args.out}")
+
+    if args.compare:
+        regressions = compare(report, load_baseline(args.compare), args.tolerance)
+        if regressions:
+            print(f"\n❌ Regressões em relação a {args.compare}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\n✅ Sem regressões em relação a {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    configure_environment(arguments)
+    sys.exit(asyncio.run(run(arguments)))
@@ -0,0 +1,58 @@
+"""
+Massa de dados do benchmark
+
+Usa o gerador determinístico de synthetic_data.py: cada tenant é uma
+organização cliente com recrutadores, um usuário cliente e suas vagas;
+candidatos ficam na organização "Candidatos" (como no signup) e têm
+candidaturas com stage_history, entrevistas e notificações.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from synthetic_data import SyntheticDataGenerator, DEFAULT_PASSWORD, LOCATIONS, SKILL_CATALOG, write_dataset
+
+BENCHMARK_PASSWORD = DEFAULT_PASSWORD
+
+SCALES = {
+    "small": {"tenants": 2, "jobs_per_tenant": 5, "candidates": 200, "applications_per_candidate": 3},
+    "medium": {"tenants": 10, "jobs_per_tenant": 20, "candidates": 5000, "applications_per_candidate": 4},
+    "large": {"tenants": 50, "jobs_per_tenant": 40, "candidates": 50000, "applications_per_candidate": 5},
+}
+
+CITIES = [city for city, _, _ in LOCATIONS]
+SKILLS = [name for names in SKILL_CATALOG.values() for name in names]
+
+# Contas de candidato usadas pelos usuários virtuais
+MAX_CANDIDATE_ACCOUNTS = 1000
+
+
+@dataclass
+class Dataset:
+    """Ids e credenciais usados pelos cenários"""
+    tenant_ids: List[str] = field(default_factory=list)
+    job_ids_by_tenant: Dict[str, List[str]] = field(default_factory=dict)
+    recruiter_emails: Dict[str, str] = field(default_factory=dict)  # tenant -> email
+    client_emails: Dict[str, str] = field(default_factory=dict)
+    candidate_emails: List[str] = field(default_factory=list)
+    counts: Dict[str, int] = field(default_factory=dict)
+
+
+async def seed_dataset(db, tenants: int, jobs_per_tenant: int, candidates: int,
+                       applications_per_candidate: int, seed: int = 42, batch_size: int = 1000) -> Dataset:
+    generator = SyntheticDataGenerator(
+        seed=seed,
+        tenants=tenants,
+        jobs_per_tenant=jobs_per_tenant,
+        candidates=candidates,
+        applications_per_candidate=applications_per_candidate
+    )
+    counts = await write_dataset(db, generator, batch_size=batch_size)
+
+    dataset = Dataset(counts=counts)
+    for t, tenant_id in enumerate(generator.recruiters_by_tenant):
+        dataset.tenant_ids.append(tenant_id)
+        dataset.recruiter_emails[tenant_id] = generator.recruiter_email(t, 0)
+        dataset.client_emails[tenant_id] = generator.client_email(t)
+        dataset.job_ids_by_tenant[tenant_id] = [job.id for job in generator.jobs if job.organization_id == tenant_id]
+    dataset.candidate_emails = [generator.candidate_email(i) for i in range(min(candidates, MAX_CANDIDATE_ACCOUNTS))]
+    return dataset
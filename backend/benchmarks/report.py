@@ -0,0 +1,78 @@
+"""
+Agregação dos resultados e comparação com baseline
+"""
+import json
+import math
+from collections import defaultdict
+from typing import Dict, List, Any
+
+from benchmarks.scenarios import Sample
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Percentil por nearest-rank sobre uma lista já ordenada"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: List[Sample], duration_seconds: float) -> Dict[str, Dict[str, Any]]:
+    by_endpoint: Dict[str, List[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample.endpoint].append(sample)
+
+    summary = {}
+    for endpoint, items in sorted(by_endpoint.items()):
+        latencies = sorted(s.elapsed * 1000 for s in items)
+        errors = [s for s in items if not s.ok]
+        summary[endpoint] = {
+            "requests": len(items),
+            "errors": len(errors),
+            "error_statuses": sorted({s.status for s in errors}),
+            "rps": round(len(items) / duration_seconds, 2) if duration_seconds else 0.0,
+            "mean_ms": round(sum(latencies) / len(latencies), 2),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "max_ms": round(latencies[-1], 2),
+        }
+    return summary
+
+
+def format_table(summary: Dict[str, Dict[str, Any]]) -> str:
+    header = f"{'endpoint':<45} {'req':>6} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+    lines = [header, "-" * len(header)]
+    for endpoint, s in summary.items():
+        lines.append(
+            f"{endpoint:<45} {s['requests']:>6} {s['errors']:>5} {s['rps']:>8.1f} "
+            f"{s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f}"
+        )
+    return "\n".join(lines)
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float,
+            metric: str = "p95_ms") -> List[str]:
+    """Lista regressões: endpoints cujo metric piorou mais que tolerance (fração)"""
+    regressions = []
+    for endpoint, base in baseline.get("endpoints", {}).items():
+        cur = current["endpoints"].get(endpoint)
+        if cur is None:
+            regressions.append(f"{endpoint}: ausente na execução atual")
+            continue
+        if base[metric] > 0 and cur[metric] > base[metric] * (1 + tolerance):
+            delta = (cur[metric] / base[metric] - 1) * 100
+            regressions.append(f"{endpoint}: {metric} {base[metric]:.1f} -> {cur[metric]:.1f} (+{delta:.0f}%)")
+        if cur["errors"] > base["errors"]:
+            regressions.append(f"{endpoint}: erros {base['errors']} -> {cur['errors']}")
+    return regressions
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_report(path: str, report: Dict[str, Any]):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False, sort_keys=True)
@@ -0,0 +1,102 @@
+"""
+Fluxos de usuário executados pelo benchmark
+
+Cada fluxo recebe um VirtualUser já autenticado e executa uma iteração,
+registrando cada chamada pelo template do endpoint (ex.:
+"GET /api/applications/{job_id}/pipeline"), não pela URL concreta.
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional
+
+import httpx
+
+from benchmarks.dataset import CITIES, SKILLS, Dataset
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    started_at: float  # time.perf_counter()
+    elapsed: float
+    status: int
+    ok: bool
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: List[Sample] = []
+
+    async def call(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str,
+                   expected=(200,), **kwargs) -> Optional[httpx.Response]:
+        # Com --in-memory nenhuma chamada cede o event loop; sem isto um único
+        # usuário virtual monopolizaria a execução
+        await asyncio.sleep(0)
+        started_at = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = response.status_code
+        except Exception:
+            response, status = None, 0
+        self.samples.append(Sample(endpoint, started_at, time.perf_counter() - started_at, status, status in expected))
+        return response
+
+
+@dataclass
+class VirtualUser:
+    role: str
+    client: httpx.AsyncClient
+    tenant_id: Optional[str]
+    rng: random.Random
+
+
+async def candidate_flow(vu: VirtualUser, dataset: Dataset, rec: Recorder):
+    await rec.call(vu.client, "GET /api/auth/me", "GET", "/api/auth/me")
+    await rec.call(vu.client, "GET /api/candidates/profile", "GET", "/api/candidates/profile")
+    await rec.call(vu.client, "GET /api/applications/my", "GET", "/api/applications/my")
+    city = vu.rng.choice(CITIES)
+    await rec.call(vu.client, "GET /api/jobs/public", "GET", "/api/jobs/public", params={"city": city})
+    await rec.call(vu.client, "GET /api/notifications/unread-count", "GET", "/api/notifications/unread-count")
+
+
+async def recruiter_flow(vu: VirtualUser, dataset: Dataset, rec: Recorder):
+    tenant_id = vu.tenant_id
+    job_id = vu.rng.choice(dataset.job_ids_by_tenant[tenant_id])
+    await rec.call(vu.client, "GET /api/recruiter/dashboard/kpis", "GET", "/api/recruiter/dashboard/kpis",
+                   params={"tenant_id": tenant_id})
+    await rec.call(vu.client, "GET /api/recruiter/dashboard/jobs", "GET", "/api/recruiter/dashboard/jobs",
+                   params={"tenant_id": tenant_id})
+    await rec.call(vu.client, "GET /api/jobs-kanban/kanban", "GET", "/api/jobs-kanban/kanban")
+    await rec.call(vu.client, "GET /api/applications/{job_id}/pipeline", "GET", f"/api/applications/{job_id}/pipeline")
+    await rec.call(vu.client, "GET /api/applications", "GET", "/api/applications", params={"job_id": job_id})
+    search = {"city": vu.rng.choice(CITIES), "skills": vu.rng.sample(SKILLS, 2)}
+    await rec.call(vu.client, "POST /api/candidates/advanced-search", "POST", "/api/candidates/advanced-search", json=search)
+
+
+async def client_flow(vu: VirtualUser, dataset: Dataset, rec: Recorder):
+    job_id = vu.rng.choice(dataset.job_ids_by_tenant[vu.tenant_id])
+    await rec.call(vu.client, "GET /api/jobs-kanban/kanban", "GET", "/api/jobs-kanban/kanban")
+    await rec.call(vu.client, "GET /api/applications/{job_id}/pipeline", "GET", f"/api/applications/{job_id}/pipeline",
+                   params={"readonly": "true"})
+    await rec.call(vu.client, "GET /api/notifications", "GET", "/api/notifications")
+
+
+FLOWS = {
+    "candidate": candidate_flow,
+    "recruiter": recruiter_flow,
+    "client": client_flow,
+}
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    """'candidate=5,recruiter=3,client=2' -> pesos por fluxo"""
+    weights: Dict[str, Any] = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in FLOWS:
+            raise ValueError(f"Fluxo desconhecido: {name}")
+        weights[name] = int(weight or 1)
+    return weights
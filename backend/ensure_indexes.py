@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Aplica o registro de índices (utils/indexes.py) e reporta drift
+
+Uso:
+    python ensure_indexes.py              # cria índices ausentes
+    python ensure_indexes.py --check      # apenas reporta drift
+    python ensure_indexes.py --rebuild    # recria índices com especificação diferente
+    python ensure_indexes.py --drop-extra # remove índices não declarados
+"""
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+from utils.indexes import ensure_indexes, check_index_drift, format_drift_report
+
+load_dotenv(Path(__file__).parent / '.env')
+
+
+async def main(args):
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+
+    if args.check:
+        drift = await check_index_drift(db, args.collection or None)
+    else:
+        drift = await ensure_indexes(
+            db,
+            args.collection or None,
+            rebuild_different=args.rebuild,
+            drop_extra=args.drop_extra
+        )
+
+    lines = format_drift_report(drift)
+    for line in lines:
+        print(line)
+    print("✅ Índices em dia" if not lines else f"⚠️  {len(lines)} divergência(s) de índice")
+
+    client.close()
+    return 1 if lines else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Registro de índices do MongoDB")
+    parser.add_argument("--check", action="store_true", help="Apenas reportar drift, sem alterar o banco")
+    parser.add_argument("--rebuild", action="store_true", help="Recriar índices com especificação diferente")
+    parser.add_argument("--drop-extra", action="store_true", help="Remover índices não declarados")
+    parser.add_argument("--collection", action="append", help="Limitar a uma coleção (pode repetir)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Normaliza user_sessions para o índice TTL em expires_at
+
+O índice TTL só remove documentos cujo expires_at é do tipo data. Sessões
+antigas têm expires_at/created_at em string ISO ou sem expires_at; este
+script converte esses campos para datetime UTC em lotes (bulk_write) e
+remove de imediato as sessões já expiradas.
+
+É retomável: o progresso (último _id processado) fica em
+migration_checkpoints e uma nova execução continua de onde parou.
+
+Uso:
+    python migrate_sessions.py                  # migra/retoma
+    python migrate_sessions.py --dry-run        # apenas conta
+    python migrate_sessions.py --restart        # ignora o checkpoint
+    python migrate_sessions.py --batch-size 500
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne, DeleteOne
+from dotenv import load_dotenv
+from utils.sessions import session_expiry, to_utc_datetime
+
+load_dotenv(Path(__file__).parent / '.env')
+
+CHECKPOINT_ID = "user_sessions_expires_at"
+
+# expires_at ausente ou de outro tipo, ou created_at em string
+PENDING_FILTER = {"$or": [
+    {"expires_at": {"$not": {"$type": "date"}}},
+    {"created_at": {"$type": "string"}}
+]}
+
+
+def plan_session(session: dict, now: datetime):
+    """Retorna a operação de bulk_write para a sessão (ou None se já está ok)"""
+    created_at = to_utc_datetime(session.get("created_at"))
+    expires_at = to_utc_datetime(session.get("expires_at"))
+    if expires_at is None:
+        expires_at = session_expiry(created_at)
+
+    if expires_at < now:
+        return DeleteOne({"_id": session["_id"]})
+
+    return UpdateOne(
+        {"_id": session["_id"]},
+        {"$set": {"expires_at": expires_at, "created_at": created_at or now}}
+    )
+
+
+async def migrate(args):
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+
+    if args.dry_run:
+        pending = await db.user_sessions.count_documents(PENDING_FILTER)
+        print(f"{pending} sessões a normalizar")
+        client.close()
+        return
+
+    if args.restart:
+        await db.migration_checkpoints.delete_one({"_id": CHECKPOINT_ID})
+
+    checkpoint = await db.migration_checkpoints.find_one({"_id": CHECKPOINT_ID})
+    last_id = checkpoint["last_id"] if checkpoint else None
+    if last_id is not None:
+        print(f"Retomando após _id {last_id}")
+
+    updated = deleted = 0
+    while True:
+        query = dict(PENDING_FILTER)
+        if last_id is not None:
+            query = {"$and": [PENDING_FILTER, {"_id": {"$gt": last_id}}]}
+
+        batch = await db.user_sessions.find(
+            query, {"_id": 1, "created_at": 1, "expires_at": 1}
+        ).sort("_id", 1).limit(args.batch_size).to_list(args.batch_size)
+        if not batch:
+            break
+
+        now = datetime.now(timezone.utc)
+        operations = [plan_session(session, now) for session in batch]
+        result = await db.user_sessions.bulk_write(operations, ordered=False)
+        updated += result.modified_count
+        deleted += result.deleted_count
+
+        last_id = batch[-1]["_id"]
+        await db.migration_checkpoints.update_one(
+            {"_id": CHECKPOINT_ID},
+            {"$set": {"last_id": last_id, "updated_at": now}},
+            upsert=True
+        )
+        print(f"✓ Lote de {len(batch)}: {updated} atualizadas, {deleted} expiradas removidas")
+
+    await db.migration_checkpoints.delete_one({"_id": CHECKPOINT_ID})
+    print(f"\n✅ Migração concluída: {updated} sessões atualizadas, {deleted} expiradas removidas")
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="apenas conta as sessões pendentes")
+    parser.add_argument("--restart", action="store_true", help="ignora o checkpoint salvo")
+    asyncio.run(migrate(parser.parse_args()))
@@ -29,6 +29,7 @@ class User(BaseModel):
     picture: Optional[str] = None
     is_active: bool = True
     requires_password_change: bool = False
+    token_version: int = 0  # incrementado para revogar tokens stateless já emitidos
     created_at: datetime = Field(default_factory=lambda: datetime.now())
     updated_at: datetime = Field(default_factory=lambda: datetime.now())
 
@@ -182,7 +183,7 @@ class Application(BaseModel):
     candidate_id: str
     current_stage: Literal["submitted", "screening", "recruiter_interview", "shortlisted", "client_interview", "offer", "hired", "rejected", "withdrawn"] = "submitted"
     status: Literal["active", "withdrawn", "rejected", "hired"] = "active"
-    scores: Optional[Dict[str, Any]] = None  # { total: Number, breakdown: {...} }
+    scores: Optional[Dict[str, Any]] = None  # { status: pending|done|failed, total: Number, breakdown: {...} }
     stage_history: List[Dict[str, Any]] = Field(default_factory=list)  # [{ from?, to, changedBy, changedAt, note? }]
     created_at: datetime = Field(default_factory=lambda: datetime.now())
     updated_at: datetime = Field(default_factory=lambda: datetime.now())
@@ -282,6 +283,7 @@ class Assessment(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now())
 
 
+# Legado: a pontuação agora vive em applications.scores (backfill_application_scores.py)
 class Score(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=generate_id)
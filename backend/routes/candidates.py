@@ -1,9 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends, Request, Cookie, UploadFile, File
+from fastapi import APIRouter, HTTPException, Depends, Request, Cookie, Query, UploadFile, File
 from pydantic import BaseModel
 from typing import Optional, List
 from server import db
 from models import Candidate, CandidateSkill, Experience, Education
 from utils.auth import get_current_user
+from utils.candidate_search import refresh_candidate_search, normalize_key
+from utils.skill_index import skill_index
+from utils.semantic_search import semantic_index
+from utils.search_cache import search_cache
+from utils.typeahead import typeahead_index
+from utils.pagination import fetch_page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from services.rescoring import rescore_tracker, affects_score, CANDIDATE_SCORE_FIELDS
 from datetime import datetime, timezone
 import os
 import uuid
@@ -70,6 +77,12 @@ async def create_or_update_profile(data: CandidateCreate, request: Request, sess
         await db.candidates.insert_one(candidate_obj.model_dump())
         candidate = candidate_obj.model_dump()
     
+    await refresh_candidate_search(db, user["id"])
+    await semantic_index.refresh_candidate(db, candidate["id"])
+    typeahead_index.update_candidate(existing, candidate)
+    if existing and affects_score(CANDIDATE_SCORE_FIELDS, existing, update_data):
+        rescore_tracker.candidate_changed(candidate["id"])
+    
     return candidate
 
 
@@ -94,6 +107,11 @@ async def add_skill(data: CandidateSkillCreate, request: Request, session_token:
     
     skill_obj = CandidateSkill(candidate_id=candidate["id"], **data.model_dump())
     await db.candidate_skills.insert_one(skill_obj.model_dump())
+    skill_index.add(skill_obj.candidate_id, skill_obj.skill_id, skill_obj.level)
+    search_cache.bump()
+    typeahead_index.add_candidate_skill(skill_obj.skill_id)
+    await semantic_index.refresh_candidate(db, skill_obj.candidate_id)
+    rescore_tracker.candidate_changed(skill_obj.candidate_id)
     return skill_obj
 
 
@@ -107,6 +125,7 @@ async def add_experience(data: ExperienceCreate, request: Request, session_token
     
     exp_obj = Experience(candidate_id=candidate["id"], **data.model_dump())
     await db.experiences.insert_one(exp_obj.model_dump())
+    rescore_tracker.candidate_changed(exp_obj.candidate_id)
     return exp_obj
 
 
@@ -124,15 +143,29 @@ async def add_education(data: EducationCreate, request: Request, session_token:
 
 
 @router.get("/search")
-async def search_candidates(skill: Optional[str] = None, city: Optional[str] = None, request: Request = None, session_token: Optional[str] = Cookie(None)):
+async def search_candidates(
+    skill: Optional[str] = None,
+    city: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    request: Request = None,
+    session_token: Optional[str] = Cookie(None)
+):
+    """
+    Candidatos do banco de talentos, paginados por cursor (repasse next_cursor)
+
+    Compatibilidade: antes a resposta era uma lista (cortada em 100); agora é
+    {"candidates": [...], "next_cursor": ...}. Clientes que liam a lista
+    devem ler "candidates" e seguir next_cursor até None.
+    """
     user = await get_current_user(request, session_token)
     
     query = {"visibility": "pool"}
     if city:
-        query["location_city"] = {"$regex": city, "$options": "i"}
+        query["search.city"] = normalize_key("city", city)
     
-    candidates = await db.candidates.find(query, {"_id": 0}).to_list(100)
-    return candidates
+    candidates, next_cursor = await fetch_page(db.candidates, query, {"_id": 0, "search": 0}, limit, cursor)
+    return {"candidates": candidates, "next_cursor": next_cursor}
 
 
 @router.post("/upload-resume")
@@ -225,6 +258,10 @@ async def update_address(
             {"id": candidate["id"]},
             {"$set": update_data}
         )
+        await refresh_candidate_search(db, user["id"])
+        typeahead_index.update_candidate(candidate, update_data)
+        if affects_score(CANDIDATE_SCORE_FIELDS, candidate, update_data):
+            rescore_tracker.candidate_changed(candidate["id"])
     
     return {"message": "Endereço atualizado com sucesso"}
 
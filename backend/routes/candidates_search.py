@@ -1,14 +1,19 @@
 from fastapi import APIRouter, HTTPException, Request, Cookie, Query
-from pydantic import BaseModel
-from typing import Optional, List
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Callable, Optional, List, Literal, Set, Tuple
 from datetime import datetime, timezone
 from server import db
-from utils.auth import get_current_user
-from emergentintegrations.llm.chat import LlmChat, UserMessage
+from utils.auth import get_current_user, get_principal
+from utils.text_normalization import normalize_text, normalize_skill
+from utils.candidate_search import normalize_key
+from utils.skill_index import skill_index
+from utils.semantic_search import semantic_index
+from utils.pagination import fetch_page, encode_cursor, decode_cursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.typeahead import typeahead_index, TYPEAHEAD_MAX_RESULTS
+from utils.search_cache import search_cache, canonical_key, page_from_ids, TOO_LARGE, ADVANCED_SEARCH_CACHE_ENABLED
+import json
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
 
 router = APIRouter()
 
@@ -32,10 +37,322 @@ class AdvancedSearchRequest(BaseModel):
     
     # Skills
     skills: Optional[List[str]] = None
+    skills_match: Literal["any", "all"] = "any"  # qualquer uma / todas
+    skills_min_level: int = 1  # 1-5
     
     # Busca por IA
     use_ai: bool = False
     ai_query: Optional[str] = None
+    
+    # Paginação por cursor
+    limit: int = Field(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+    cursor: Optional[str] = None
+    include_total: bool = True
+    
+    # Contagens por cidade, estado, formação, faixa etária e skills
+    facets: bool = False
+
+
+SEARCH_PROJECTION = {"_id": 0, "search": 0}
+EXPORT_BATCH_SIZE = 500
+
+# Faixas etárias (idade mínima, máxima), contíguas e da mais nova para a mais velha
+AGE_RANGES = {
+    "18-25": (18, 25),
+    "26-35": (26, 35),
+    "36-45": (36, 45),
+    "46-55": (46, 55),
+    "56+": (56, 150)
+}
+EDUCATION_LEVELS = {
+    "ensino_medio": "Ensino Médio",
+    "graduacao": "Graduação",
+    "pos_graduacao": "Pós-graduação",
+    "mestrado": "Mestrado",
+    "doutorado": "Doutorado"
+}
+FACET_LIMIT = 20
+TOP_SKILLS_LIMIT = 10
+
+# Acima disso o filtro de skills não vira {"id": {"$in": [...]}}: um comando
+# com centenas de milhares de ids arrisca o limite de 16 MB do BSON e custa caro
+# para planejar. Os ids da query base passam então por um teste em memória.
+SKILL_FILTER_MAX_IDS = int(os.getenv("SKILL_FILTER_MAX_IDS", "10000"))
+ID_BATCH_SIZE = 5000
+
+
+class _SkillFilter:
+    """Filtro de skills grande demais para $in, aplicado em memória (ou via $lookup nas agregações)"""
+
+    def __init__(self, contains: Callable[[str], bool], count: int, groups: List[Set[str]],
+                 require_all: bool, min_level: int):
+        self.contains = contains
+        self.count = count
+        self.groups = groups
+        self.require_all = require_all
+        self.min_level = min_level
+
+    def lookup_stages(self) -> List[dict]:
+        """Mesmo predicado como estágios de agregação (usado pelas facetas)"""
+        def has_any(group: Set[str]) -> dict:
+            return {"_skills": {"$elemMatch": {"skill_id": {"$in": list(group)}, "level": {"$gte": self.min_level}}}}
+        if self.require_all:
+            match = {"$and": [has_any(group) for group in self.groups]}
+        else:
+            match = has_any(set().union(*self.groups))
+        return [
+            {"$lookup": {"from": "candidate_skills", "localField": "id", "foreignField": "candidate_id", "as": "_skills"}},
+            {"$match": match},
+            {"$project": {"_skills": 0}}
+        ]
+
+
+async def _build_search_query(search: AdvancedSearchRequest) -> Optional[Tuple[dict, Optional[_SkillFilter]]]:
+    """
+    Monta a query MongoDB dos filtros e, se o filtro de skills casar com
+    mais de SKILL_FILTER_MAX_IDS candidatos, o _SkillFilter a aplicar sobre
+    ela; None quando nenhum candidato pode casar.
+    """
+    mongo_query = {}
+    
+    # Filtros de localização e formação: igualdade nos campos normalizados (indexados)
+    key_filters = {
+        "city": search.city,
+        "state": search.state,
+        "neighborhood": search.neighborhood,
+        "education_area": search.education_area,
+        "education_institution": search.education_institution
+    }
+    for key, value in key_filters.items():
+        normalized = normalize_key(key, value)
+        if normalized:
+            mongo_query[f"search.{key}"] = normalized
+    
+    if search.education_level:
+        mongo_query["education_level"] = search.education_level
+    
+    # Busca por texto: índice de texto em search.text; todos os termos são obrigatórios
+    if search.query and not search.use_ai:
+        terms = (normalize_text(search.query) or "").split()
+        if terms:
+            mongo_query["$text"] = {"$search": " ".join(f'"{term}"' for term in terms)}
+    
+    # Filtro de idade: por ano de nascimento pré-calculado (search.birth_year)
+    if search.age_range in AGE_RANGES:
+        min_age, max_age = AGE_RANGES[search.age_range]
+        current_year = datetime.now(timezone.utc).year
+        mongo_query["search.birth_year"] = {
+            "$gte": current_year - max_age,
+            "$lte": current_year - min_age
+        }
+    
+    # Filtro de skills: índice em memória quando pronto, senão resolvido no banco
+    skill_filter = None
+    requested_skills = _requested_skills(search)
+    if requested_skills:
+        require_all = search.skills_match == "all"
+        if skill_index.ready:
+            groups = skill_index.skill_ids_for_names(requested_skills)
+            bitmap = skill_index.match(groups, require_all=require_all, min_level=search.skills_min_level)
+            count = bitmap.bit_count()
+            contains = skill_index.predicate(bitmap)
+            candidate_ids = skill_index.candidate_ids(bitmap) if count <= SKILL_FILTER_MAX_IDS else None
+        else:
+            groups = await _skill_groups_from_db(requested_skills)
+            matched = await _candidate_ids_with_skills(groups, require_all, search.skills_min_level)
+            count = len(matched)
+            contains = matched.__contains__
+            candidate_ids = list(matched) if count <= SKILL_FILTER_MAX_IDS else None
+        if not count:
+            return None
+        if candidate_ids is not None:
+            mongo_query["id"] = {"$in": candidate_ids}
+        else:
+            skill_filter = _SkillFilter(contains, count, groups, require_all, search.skills_min_level)
+    
+    return mongo_query, skill_filter
+
+
+async def _matching_ids(mongo_query: dict, skill_filter: Optional[_SkillFilter],
+                        limit: Optional[int] = None, after: Optional[str] = None) -> List[str]:
+    """Ids (em ordem de id) que casam com a query e o filtro de skills em memória"""
+    query = mongo_query if after is None else {"$and": [mongo_query, {"id": {"$gt": after}}]}
+    cursor = db.candidates.find(query, {"_id": 0, "id": 1}).sort("id", 1)
+    if skill_filter is None:
+        return [c["id"] for c in await (cursor.limit(limit) if limit else cursor).to_list(None)]
+    ids = []
+    async for candidate in cursor.batch_size(ID_BATCH_SIZE):
+        if skill_filter.contains(candidate["id"]):
+            ids.append(candidate["id"])
+            if limit and len(ids) >= limit:
+                break
+    return ids
+
+
+async def _count_matching(mongo_query: dict, skill_filter: Optional[_SkillFilter]) -> int:
+    if skill_filter is None:
+        return await db.candidates.count_documents(mongo_query)
+    if not mongo_query:
+        return skill_filter.count
+    return len(await _matching_ids(mongo_query, skill_filter))
+
+
+async def _load_in_order(candidate_ids: List[str]) -> List[dict]:
+    found = await db.candidates.find({"id": {"$in": candidate_ids}}, SEARCH_PROJECTION).to_list(None)
+    found_by_id = {c["id"]: c for c in found}
+    return [found_by_id[candidate_id] for candidate_id in candidate_ids if candidate_id in found_by_id]
+
+
+def _requested_skills(search: AdvancedSearchRequest) -> List[str]:
+    return [name.strip() for name in (search.skills or []) if name.strip()]
+
+
+def _cache_filters(search: AdvancedSearchRequest) -> dict:
+    """Filtros canonicalizados (normalizados, skills ordenadas) para a chave do cache"""
+    return {
+        "city": normalize_key("city", search.city),
+        "state": normalize_key("state", search.state),
+        "neighborhood": normalize_key("neighborhood", search.neighborhood),
+        "education_level": search.education_level,
+        "education_area": normalize_key("education_area", search.education_area),
+        "education_institution": normalize_key("education_institution", search.education_institution),
+        "query": None if search.use_ai else normalize_text(search.query),
+        "age_range": search.age_range,
+        "skills": sorted({normalize_skill(name) for name in _requested_skills(search)}),
+        "skills_match": search.skills_match,
+        "skills_min_level": search.skills_min_level,
+    }
+
+
+async def _enrich(candidates: List[dict], with_skills: bool):
+    """Anexa usuário (e skills) em lote: uma consulta por coleção, independente do número de candidatos"""
+    if not candidates:
+        return
+    users = await db.users.find(
+        {"id": {"$in": list({c["user_id"] for c in candidates})}},
+        {"_id": 0, "id": 1, "full_name": 1, "email": 1}
+    ).to_list(None)
+    users_by_id = {u["id"]: u for u in users}
+    for candidate in candidates:
+        if candidate["user_id"] in users_by_id:
+            candidate["user"] = users_by_id[candidate["user_id"]]
+    
+    if with_skills:
+        if skill_index.ready:
+            for candidate in candidates:
+                candidate["skills"] = [
+                    {"id": skill_id, "name": skill_index.skill_name(skill_id)}
+                    for skill_id in skill_index.levels_for(candidate["id"])
+                    if skill_index.skill_name(skill_id)
+                ]
+        else:
+            await _attach_skills(candidates)
+
+
+def _age_bucket_stage(current_year: int) -> dict:
+    """$bucket por search.birth_year com um intervalo por faixa etária"""
+    oldest_first = sorted(AGE_RANGES.items(), key=lambda item: -item[1][1])
+    boundaries = [current_year - max_age for _, (_, max_age) in oldest_first]
+    boundaries.append(current_year - oldest_first[-1][1][0] + 1)
+    return {"$bucket": {
+        "groupBy": "$search.birth_year",
+        "boundaries": boundaries,
+        "default": "unknown",
+        "output": {"count": {"$sum": 1}}
+    }}
+
+
+def _age_counts(buckets: List[dict], current_year: int) -> List[dict]:
+    counts = {b["_id"]: b["count"] for b in buckets}
+    return [
+        {"value": value, "count": counts.get(current_year - max_age, 0)}
+        for value, (_, max_age) in AGE_RANGES.items()
+    ]
+
+
+def _group_stage(key_field: str, label_field: str) -> List[dict]:
+    """Histograma pelo campo normalizado, rotulado com um valor original"""
+    return [
+        {"$match": {key_field: {"$ne": None}}},
+        {"$group": {"_id": f"${key_field}", "label": {"$first": f"${label_field}"}, "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": FACET_LIMIT}
+    ]
+
+
+def _facet_stages(current_year: int) -> dict:
+    return {
+        "city": _group_stage("search.city", "location_city"),
+        "state": _group_stage("search.state", "location_state"),
+        "education_level": [
+            {"$match": {"education_level": {"$ne": None}}},
+            {"$group": {"_id": "$education_level", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1}}
+        ],
+        "age_range": [_age_bucket_stage(current_year)],
+        "skills": [
+            {"$lookup": {"from": "candidate_skills", "localField": "id", "foreignField": "candidate_id", "as": "cs"}},
+            {"$unwind": "$cs"},
+            # Uma contagem por candidato, mesmo com a skill repetida
+            {"$group": {"_id": {"skill": "$cs.skill_id", "candidate": "$id"}}},
+            {"$group": {"_id": "$_id.skill", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": TOP_SKILLS_LIMIT}
+        ]
+    }
+
+
+async def _search_with_facets(search: AdvancedSearchRequest, mongo_query: dict,
+                              skill_filter: Optional[_SkillFilter] = None) -> dict:
+    """Página, total e histogramas em uma única agregação $facet"""
+    current_year = datetime.now(timezone.utc).year
+    page_stages = []
+    if search.cursor:
+        page_stages.append({"$match": {"id": {"$gt": decode_cursor(search.cursor)}}})
+    page_stages += [{"$sort": {"id": 1}}, {"$limit": search.limit + 1}, {"$project": SEARCH_PROJECTION}]
+    
+    stages = {"page": page_stages, **_facet_stages(current_year)}
+    if search.include_total:
+        stages["total"] = [{"$count": "count"}]
+    
+    pipeline = [{"$match": mongo_query}]
+    if skill_filter is not None:
+        pipeline += skill_filter.lookup_stages()
+    pipeline.append({"$facet": stages})
+    result = (await db.candidates.aggregate(pipeline).to_list(1))[0]
+    
+    candidates = result["page"]
+    next_cursor = None
+    if len(candidates) > search.limit:
+        candidates = candidates[:search.limit]
+        next_cursor = encode_cursor(candidates[-1]["id"])
+    
+    skill_counts = result["skills"]
+    if skill_index.ready:
+        skill_names = {s["_id"]: skill_index.skill_name(s["_id"]) for s in skill_counts}
+    else:
+        skills = await db.skills.find({"id": {"$in": [s["_id"] for s in skill_counts]}}, {"_id": 0, "id": 1, "name": 1}).to_list(None)
+        skill_names = {s["id"]: s["name"] for s in skills}
+    
+    facets = {
+        "city": [{"value": b["label"], "count": b["count"]} for b in result["city"]],
+        "state": [{"value": b["label"], "count": b["count"]} for b in result["state"]],
+        "education_level": [{"value": b["_id"], "count": b["count"]} for b in result["education_level"]],
+        "age_range": _age_counts(result["age_range"], current_year),
+        "skills": [
+            {"id": b["_id"], "value": skill_names[b["_id"]], "count": b["count"]}
+            for b in skill_counts if skill_names.get(b["_id"])
+        ]
+    }
+    total = (result["total"][0]["count"] if result["total"] else 0) if search.include_total else None
+    return {"candidates": candidates, "next_cursor": next_cursor, "total": total, "facets": facets}
+
+
+def _empty_facets() -> dict:
+    return {
+        "city": [], "state": [], "education_level": [], "skills": [],
+        "age_range": [{"value": value, "count": 0} for value in AGE_RANGES]
+    }
 
 
 @router.post("/advanced-search")
@@ -46,206 +363,212 @@ async def advanced_search_candidates(
 ):
     """
     Busca avançada de candidatos com múltiplos filtros e busca por IA
+
+    Paginada por cursor (ordem estável por id): repasse next_cursor em
+    "cursor" para a próxima página; next_cursor é None na última.
+    include_total=false evita a contagem; facets=true inclui contagens por
+    cidade, estado, formação, faixa etária e skills. Para exportar o
+    resultado completo, use /advanced-search/export (NDJSON).
     """
-    user = await get_current_user(request, session_token)
+    principal = await get_principal(request, session_token)
+    with_skills = bool(_requested_skills(search))
     
-    # Construir query MongoDB
-    mongo_query = {}
+    # Busca semântica: top-K por similaridade no índice vetorial local,
+    # restrita aos candidatos que passaram pelos filtros estruturados
+    if search.use_ai and search.ai_query and semantic_index.ready:
+        built = await _build_search_query(search)
+        if built is None:
+            return {"total": 0, "candidates": [], "next_cursor": None, "used_ai": True,
+                    "ranking_mode": semantic_index.ranking_mode}
+        mongo_query, skill_filter = built
+        allowed_ids = None
+        if mongo_query or skill_filter is not None:
+            allowed_ids = await _matching_ids(mongo_query, skill_filter)
+        hits = await semantic_index.search(search.ai_query, search.limit, allowed_ids)
+        
+        found = await db.candidates.find({"id": {"$in": [candidate_id for candidate_id, _ in hits]}}, SEARCH_PROJECTION).to_list(None)
+        found_by_id = {c["id"]: c for c in found}
+        candidates = []
+        for candidate_id, score in hits:
+            if candidate_id in found_by_id:
+                candidate = found_by_id[candidate_id]
+                candidate["ai_relevance_score"] = round(score * 100, 1)
+                candidates.append(candidate)
+        await _enrich(candidates, with_skills)
+        return {
+            "total": len(candidates),
+            "candidates": candidates,
+            "next_cursor": None,
+            "used_ai": True,
+            # 'lexical' sem modelo de embeddings: o front não deve anunciar ranking semântico
+            "ranking_mode": semantic_index.ranking_mode
+        }
     
-    # Filtros de localização
-    if search.city:
-        mongo_query["location_city"] = {"$regex": search.city, "$options": "i"}
-    if search.state:
-        mongo_query["location_state"] = {"$regex": search.state, "$options": "i"}
-    if search.neighborhood:
-        mongo_query["location_neighborhood"] = {"$regex": search.neighborhood, "$options": "i"}
+    # Facetas: página, total e contagens na mesma agregação (sem cache de ids)
+    if search.facets:
+        built = await _build_search_query(search)
+        if built is None:
+            return {"total": 0, "candidates": [], "next_cursor": None, "facets": _empty_facets(), "used_ai": False}
+        result = await _search_with_facets(search, *built)
+        await _enrich(result["candidates"], with_skills)
+        return {**result, "used_ai": False}
     
-    # Filtros de formação
-    if search.education_level:
-        mongo_query["education_level"] = search.education_level
-    if search.education_area:
-        mongo_query["education_area"] = {"$regex": search.education_area, "$options": "i"}
-    if search.education_institution:
-        mongo_query["education_institution"] = {"$regex": search.education_institution, "$options": "i"}
-    
-    # Filtro de idade
-    if search.age_range:
-        age_ranges = {
-            "18-25": (18, 25),
-            "26-35": (26, 35),
-            "36-45": (36, 45),
-            "46-55": (46, 55),
-            "56+": (56, 150)
+    # Resultado em cache (lista de ids): páginas seguintes não repetem a consulta
+    cache_key = canonical_key(principal.tenant_ids(), _cache_filters(search))
+    cached = search_cache.get(cache_key) if ADVANCED_SEARCH_CACHE_ENABLED else TOO_LARGE
+    
+    if cached is None:
+        version = search_cache.version
+        built = await _build_search_query(search)
+        if built is None:
+            cached = []
+        else:
+            cached = await _matching_ids(*built, limit=search_cache.max_ids + 1)
+            if len(cached) > search_cache.max_ids:
+                cached = TOO_LARGE
+        search_cache.set(cache_key, None if cached is TOO_LARGE else cached, version)
+    
+    if cached is not TOO_LARGE:
+        after = decode_cursor(search.cursor) if search.cursor else None
+        page_ids, has_more = page_from_ids(cached, search.limit, after)
+        candidates = await _load_in_order(page_ids)
+        await _enrich(candidates, with_skills)
+        return {
+            "total": len(cached) if search.include_total else None,
+            "candidates": candidates,
+            "next_cursor": encode_cursor(page_ids[-1]) if has_more else None,
+            "used_ai": False
         }
-        if search.age_range in age_ranges:
-            min_age, max_age = age_ranges[search.age_range]
-            current_year = datetime.now(timezone.utc).year
-            
-            max_birth_year = current_year - min_age
-            min_birth_year = current_year - max_age
-            
-            mongo_query["birthdate"] = {
-                "$gte": datetime(min_birth_year, 1, 1),
-                "$lte": datetime(max_birth_year, 12, 31, 23, 59, 59)
-            }
-    
-    # Buscar candidatos
-    candidates = await db.candidates.find(mongo_query, {"_id": 0}).to_list(None)
-    
-    # Enriquecer com dados do usuário
-    for candidate in candidates:
-        user_data = await db.users.find_one(
-            {"id": candidate["user_id"]},
-            {"_id": 0, "id": 1, "full_name": 1, "email": 1}
+    
+    # Resultado grande demais para o cache: paginação direto no banco
+    built = await _build_search_query(search)
+    if built is None:
+        return {"total": 0, "candidates": [], "next_cursor": None, "used_ai": False}
+    mongo_query, skill_filter = built
+    if skill_filter is None:
+        candidates, next_cursor = await fetch_page(
+            db.candidates, mongo_query, SEARCH_PROJECTION, search.limit, search.cursor
         )
-        if user_data:
-            candidate["user"] = user_data
-        
-        # Buscar skills
-        if search.skills:
-            candidate_skills = await db.candidate_skills.find(
-                {"candidate_id": candidate["id"]},
-                {"_id": 0}
-            ).to_list(None)
-            
-            # Buscar nomes das skills
-            skill_ids = [cs["skill_id"] for cs in candidate_skills]
-            skills = await db.skills.find(
-                {"id": {"$in": skill_ids}},
-                {"_id": 0, "id": 1, "name": 1}
-            ).to_list(None)
-            
-            candidate["skills"] = skills
-            
-            # Filtrar por skills se especificado
-            if search.skills:
-                skill_names = [s["name"].lower() for s in skills]
-                if not any(req_skill.lower() in skill_names for req_skill in search.skills):
-                    candidates.remove(candidate)
-                    continue
-    
-    # Busca por texto simples
-    if search.query and not search.use_ai:
-        query_lower = search.query.lower()
-        filtered_candidates = []
-        for candidate in candidates:
-            # Buscar em nome, email, resumo, formação
-            searchable_text = " ".join([
-                candidate.get("user", {}).get("full_name", ""),
-                candidate.get("user", {}).get("email", ""),
-                candidate.get("professional_summary", ""),
-                candidate.get("education_area", ""),
-                candidate.get("education_course", ""),
-                candidate.get("education_institution", ""),
-            ]).lower()
-            
-            if query_lower in searchable_text:
-                filtered_candidates.append(candidate)
-        
-        candidates = filtered_candidates
+    else:
+        after = decode_cursor(search.cursor) if search.cursor else None
+        page_ids = await _matching_ids(mongo_query, skill_filter, search.limit + 1, after)
+        next_cursor = encode_cursor(page_ids[search.limit - 1]) if len(page_ids) > search.limit else None
+        candidates = await _load_in_order(page_ids[:search.limit])
+    await _enrich(candidates, with_skills)
     
-    # Busca por IA
-    if search.use_ai and search.ai_query:
-        try:
-            candidates_with_scores = await ai_semantic_search(
-                search.ai_query,
-                candidates
-            )
-            return {
-                "total": len(candidates_with_scores),
-                "candidates": candidates_with_scores,
-                "used_ai": True
-            }
-        except Exception as e:
-            print(f"Erro na busca por IA: {e}")
-            # Fallback para busca normal
-            pass
+    total = await _count_matching(mongo_query, skill_filter) if search.include_total else None
     
     return {
-        "total": len(candidates),
+        "total": total,
         "candidates": candidates,
+        "next_cursor": next_cursor,
         "used_ai": False
     }
 
 
-async def ai_semantic_search(query: str, candidates: List[dict]) -> List[dict]:
+@router.post("/advanced-search/export")
+async def export_advanced_search(
+    search: AdvancedSearchRequest,
+    request: Request,
+    session_token: Optional[str] = Cookie(None)
+):
     """
-    Usa IA para fazer busca semântica e rankear candidatos
+    Exporta todo o resultado da busca avançada como NDJSON (um candidato por
+    linha), lendo e enriquecendo em lotes sem montar a resposta em memória.
+    Busca por IA, limit e cursor não se aplicam.
     """
-    # Inicializar chat LLM
-    chat = LlmChat(
-        api_key=os.getenv("EMERGENT_LLM_KEY"),
-        session_id="candidate-search",
-        system_message="""Você é um assistente especializado em recrutamento. 
-Sua função é analisar perfis de candidatos e rankeá-los de acordo com a relevância para uma busca específica.
-Retorne APENAS um JSON array com os IDs dos candidatos ordenados por relevância (do mais relevante ao menos relevante).
-Formato: ["id1", "id2", "id3", ...]"""
-    ).with_model("openai", "gpt-4o-mini")
-    
-    # Preparar informações dos candidatos para a IA
-    candidates_summary = []
-    for candidate in candidates:
-        summary = {
-            "id": candidate["id"],
-            "name": candidate.get("user", {}).get("full_name", "N/A"),
-            "education_level": candidate.get("education_level", "N/A"),
-            "education_area": candidate.get("education_area", "N/A"),
-            "education_course": candidate.get("education_course", "N/A"),
-            "location": f"{candidate.get('location_city', '')}, {candidate.get('location_state', '')}",
-            "professional_summary": candidate.get("professional_summary", "N/A"),
-            "skills": [s["name"] for s in candidate.get("skills", [])]
-        }
-        candidates_summary.append(summary)
+    user = await get_current_user(request, session_token)
     
-    # Criar prompt
-    prompt = f"""
-Busca: "{query}"
-
-Candidatos disponíveis:
-{candidates_summary}
-
-Analise cada candidato e ordene-os por relevância para a busca. 
-Retorne APENAS um array JSON com os IDs ordenados, exemplo: ["id1", "id2", "id3"]
-"""
+    built = await _build_search_query(search)
+    with_skills = bool(_requested_skills(search))
     
-    # Enviar para IA
-    user_message = UserMessage(text=prompt)
-    response = await chat.send_message(user_message)
+    async def rows():
+        if built is None:
+            return
+        mongo_query, skill_filter = built
+        cursor = db.candidates.find(mongo_query, SEARCH_PROJECTION).sort("id", 1).batch_size(EXPORT_BATCH_SIZE)
+        batch = []
+        async for candidate in cursor:
+            if skill_filter is not None and not skill_filter.contains(candidate["id"]):
+                continue
+            batch.append(candidate)
+            if len(batch) >= EXPORT_BATCH_SIZE:
+                await _enrich(batch, with_skills)
+                yield "".join(json.dumps(c, default=str, ensure_ascii=False) + "\n" for c in batch)
+                batch = []
+        if batch:
+            await _enrich(batch, with_skills)
+            yield "".join(json.dumps(c, default=str, ensure_ascii=False) + "\n" for c in batch)
     
-    # Parse da resposta
-    import json
-    import re
+    return StreamingResponse(
+        rows(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="candidatos.ndjson"'}
+    )
+
+
+async def _skill_groups_from_db(names: List[str]) -> List[Set[str]]:
+    """Ids de skill para cada nome pedido, pelo banco (como skill_index.skill_ids_for_names)"""
+    # Igualdade em skills.search.name (nome normalizado, indexado), como o índice
+    normalized = [normalize_skill(name) for name in names]
+    matches = await db.skills.find({"search.name": {"$in": normalized}}, {"_id": 0, "id": 1, "search.name": 1}).to_list(None)
+    ids_by_name = {}
+    for skill in matches:
+        ids_by_name.setdefault(skill["search"]["name"], set()).add(skill["id"])
+    return [ids_by_name.get(name, set()) for name in normalized]
+
+
+async def _candidates_with_any_skill(skill_ids: Set[str], min_level: int) -> Set[str]:
+    # $group em cursor em vez de distinct: o resultado de distinct é limitado a 16 MB
+    pipeline = [
+        {"$match": {"skill_id": {"$in": list(skill_ids)}, "level": {"$gte": min_level}}},
+        {"$group": {"_id": "$candidate_id"}}
+    ]
+    return {row["_id"] async for row in db.candidate_skills.aggregate(pipeline)}
+
+
+async def _candidate_ids_with_skills(groups: List[Set[str]], require_all: bool, min_level: int) -> Set[str]:
+    """Caminho pelo banco enquanto o índice de skills não está pronto"""
+    if not require_all:
+        skill_ids = set().union(*groups)
+        return await _candidates_with_any_skill(skill_ids, min_level) if skill_ids else set()
     
-    # Extrair JSON da resposta
-    json_match = re.search(r'\[.*\]', response, re.DOTALL)
-    if json_match:
-        ranked_ids = json.loads(json_match.group())
-        
-        # Reordenar candidatos baseado no ranking da IA
-        ranked_candidates = []
-        candidates_dict = {c["id"]: c for c in candidates}
-        
-        for candidate_id in ranked_ids:
-            if candidate_id in candidates_dict:
-                candidate = candidates_dict[candidate_id].copy()
-                candidate["ai_relevance_score"] = len(ranked_ids) - ranked_ids.index(candidate_id)
-                ranked_candidates.append(candidate)
-        
-        # Adicionar candidatos não rankeados no final
-        for candidate in candidates:
-            if candidate["id"] not in ranked_ids:
-                candidate["ai_relevance_score"] = 0
-                ranked_candidates.append(candidate)
-        
-        return ranked_candidates
+    # Todas: interseção dos candidatos de cada skill pedida
+    result = None
+    for skill_ids in groups:
+        if not skill_ids:
+            return set()
+        ids = await _candidates_with_any_skill(skill_ids, min_level)
+        result = ids if result is None else result & ids
+        if not result:
+            return set()
+    return result
+
+
+async def _attach_skills(candidates: List[dict]):
+    """Anexa as skills (id, nome) com uma consulta em lote por coleção"""
+    candidate_skills = await db.candidate_skills.find(
+        {"candidate_id": {"$in": [c["id"] for c in candidates]}},
+        {"_id": 0, "candidate_id": 1, "skill_id": 1}
+    ).to_list(None)
+    skills = await db.skills.find(
+        {"id": {"$in": list({cs["skill_id"] for cs in candidate_skills})}},
+        {"_id": 0, "id": 1, "name": 1}
+    ).to_list(None)
+    skills_by_id = {s["id"]: s for s in skills}
     
-    # Se falhar, retornar ordem original
-    return candidates
+    skills_by_candidate = {}
+    for cs in candidate_skills:
+        if cs["skill_id"] in skills_by_id:
+            skills_by_candidate.setdefault(cs["candidate_id"], []).append(skills_by_id[cs["skill_id"]])
+    for candidate in candidates:
+        candidate["skills"] = skills_by_candidate.get(candidate["id"], [])
 
 
 @router.get("/education-options")
 async def get_education_options(
     request: Request,
+    with_counts: bool = Query(False, description="Inclui a contagem de candidatos por opção"),
     session_token: Optional[str] = Cookie(None)
 ):
     """
@@ -253,19 +576,45 @@ async def get_education_options(
     """
     await get_current_user(request, session_token)
     
+    education_levels = [{"value": value, "label": label} for value, label in EDUCATION_LEVELS.items()]
+    age_ranges = [{"value": value, "label": f"{value} anos"} for value in AGE_RANGES]
+    
+    if with_counts:
+        # Faixas etárias agrupadas por search.birth_year: uma agregação para tudo
+        current_year = datetime.now(timezone.utc).year
+        result = (await db.candidates.aggregate([{"$facet": {
+            "education_level": [{"$group": {"_id": "$education_level", "count": {"$sum": 1}}}],
+            "age_range": [_age_bucket_stage(current_year)]
+        }}]).to_list(1))[0]
+        level_counts = {b["_id"]: b["count"] for b in result["education_level"]}
+        for option in education_levels:
+            option["count"] = level_counts.get(option["value"], 0)
+        age_counts = {b["value"]: b["count"] for b in _age_counts(result["age_range"], current_year)}
+        for option in age_ranges:
+            option["count"] = age_counts[option["value"]]
+    
     return {
-        "education_levels": [
-            {"value": "ensino_medio", "label": "Ensino Médio"},
-            {"value": "graduacao", "label": "Graduação"},
-            {"value": "pos_graduacao", "label": "Pós-graduação"},
-            {"value": "mestrado", "label": "Mestrado"},
-            {"value": "doutorado", "label": "Doutorado"}
-        ],
-        "age_ranges": [
-            {"value": "18-25", "label": "18-25 anos"},
-            {"value": "26-35", "label": "26-35 anos"},
-            {"value": "36-45", "label": "36-45 anos"},
-            {"value": "46-55", "label": "46-55 anos"},
-            {"value": "56+", "label": "56+ anos"}
-        ]
+        "education_levels": education_levels,
+        "age_ranges": age_ranges
     }
+
+
+@router.get("/typeahead/{field}")
+async def typeahead(
+    field: Literal["city", "institution", "area", "skill"],
+    request: Request,
+    q: str = Query("", max_length=100),
+    limit: int = Query(10, ge=1, le=TYPEAHEAD_MAX_RESULTS),
+    session_token: Optional[str] = Cookie(None)
+):
+    """
+    Sugestões para os filtros (cidade, instituição, área de formação, skill)
+    que começam com q, ignorando acentos e caixa, mais frequentes primeiro.
+    Use o "value" retornado como filtro para casar exatamente.
+    """
+    await get_current_user(request, session_token)
+    
+    if not typeahead_index.ready:
+        raise HTTPException(status_code=503, detail="Autocomplete ainda não disponível, tente novamente em instantes")
+    
+    return {"field": field, "suggestions": typeahead_index.complete(field, q, limit)}
@@ -3,7 +3,7 @@ from pydantic import BaseModel
 from typing import Optional, List, Literal
 from server import db
 from models import Feedback
-from utils.auth import get_current_user, get_user_roles
+from utils.auth import get_current_user
 
 router = APIRouter()
 
@@ -24,9 +24,6 @@ async def create_feedback(data: FeedbackCreate, request: Request, session_token:
     if not app:
         raise HTTPException(status_code=404, detail="Candidatura não encontrada")
     
-    job = await db.jobs.find_one({"id": app["job_id"]})
-    await get_user_roles(user["id"], job["organization_id"])
-    
     feedback = Feedback(author_user_id=user["id"], **data.model_dump())
     await db.feedbacks.insert_one(feedback.model_dump())
     return feedback
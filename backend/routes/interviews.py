@@ -4,7 +4,7 @@ from typing import Optional, List, Literal
 from datetime import datetime
 from server import db
 from models import Interview
-from utils.auth import get_current_user, get_user_roles
+from utils.auth import get_current_user
 
 router = APIRouter()
 
@@ -31,9 +31,6 @@ async def create_interview(data: InterviewCreate, request: Request, session_toke
     if not app:
         raise HTTPException(status_code=404, detail="Candidatura não encontrada")
     
-    job = await db.jobs.find_one({"id": app["job_id"]})
-    await get_user_roles(user["id"], job["organization_id"])
-    
     interview = Interview(**data.model_dump())
     await db.interviews.insert_one(interview.model_dump())
     return interview
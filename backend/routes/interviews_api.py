@@ -3,7 +3,7 @@ from typing import Optional, List, Dict, Any
 from pydantic import BaseModel
 from datetime import datetime, timezone, timedelta
 from server import db
-from utils.auth import get_current_user, require_role
+from utils.auth import get_current_user, get_principal
 from models import Interview
 from services.notification_service import get_notification_service
 
@@ -47,7 +47,8 @@ async def create_interview(
     session_token: Optional[str] = Cookie(None)
 ):
     """Cria uma nova entrevista para uma application"""
-    user = await get_current_user(request, session_token)
+    principal = await get_principal(request, session_token)
+    user = principal.user
     
     # Buscar application
     app = await db.applications.find_one({"id": application_id}, {"_id": 0})
@@ -55,8 +56,7 @@ async def create_interview(
         raise HTTPException(status_code=404, detail="Application não encontrada")
     
     # Validar acesso ao tenant (recruiter ou admin)
-    user_roles = await db.user_org_roles.find({"user_id": user["id"]}, {"_id": 0}).to_list(100)
-    has_access = any(r["organization_id"] == app["tenant_id"] and r["role"] in ["admin", "recruiter"] for r in user_roles)
+    has_access = principal.can(app["tenant_id"], "admin", "recruiter")
     
     if not has_access:
         raise HTTPException(status_code=403, detail="Você não tem permissão para criar entrevistas nesta vaga")
@@ -119,15 +119,14 @@ async def get_interview(
     session_token: Optional[str] = Cookie(None)
 ):
     """Busca uma entrevista específica"""
-    user = await get_current_user(request, session_token)
+    principal = await get_principal(request, session_token)
     
     interview = await db.interviews.find_one({"id": interview_id}, {"_id": 0})
     if not interview:
         raise HTTPException(status_code=404, detail="Entrevista não encontrada")
     
     # Validar acesso
-    user_roles = await db.user_org_roles.find({"user_id": user["id"]}, {"_id": 0}).to_list(100)
-    has_access = any(r["organization_id"] == interview["tenant_id"] for r in user_roles)
+    has_access = principal.can(interview["tenant_id"])
     
     if not has_access:
         raise HTTPException(status_code=403, detail="Você não tem acesso a esta entrevista")
@@ -143,15 +142,14 @@ async def update_interview(
     session_token: Optional[str] = Cookie(None)
 ):
     """Atualiza uma entrevista"""
-    user = await get_current_user(request, session_token)
+    principal = await get_principal(request, session_token)
     
     interview = await db.interviews.find_one({"id": interview_id}, {"_id": 0})
     if not interview:
         raise HTTPException(status_code=404, detail="Entrevista não encontrada")
     
     # Validar acesso (recruiter/admin)
-    user_roles = await db.user_org_roles.find({"user_id": user["id"]}, {"_id": 0}).to_list(100)
-    has_access = any(r["organization_id"] == interview["tenant_id"] and r["role"] in ["admin", "recruiter"] for r in user_roles)
+    has_access = principal.can(interview["tenant_id"], "admin", "recruiter")
     
     if not has_access:
         raise HTTPException(status_code=403, detail="Você não tem permissão para editar esta entrevista")
@@ -221,15 +219,14 @@ async def cancel_interview(
     session_token: Optional[str] = Cookie(None)
 ):
     """Cancela uma entrevista"""
-    user = await get_current_user(request, session_token)
+    principal = await get_principal(request, session_token)
     
     interview = await db.interviews.find_one({"id": interview_id}, {"_id": 0})
     if not interview:
         raise HTTPException(status_code=404, detail="Entrevista não encontrada")
     
     # Validar acesso
-    user_roles = await db.user_org_roles.find({"user_id": user["id"]}, {"_id": 0}).to_list(100)
-    has_access = any(r["organization_id"] == interview["tenant_id"] and r["role"] in ["admin", "recruiter"] for r in user_roles)
+    has_access = principal.can(interview["tenant_id"], "admin", "recruiter")
     
     if not has_access:
         raise HTTPException(status_code=403, detail="Você não tem permissão para cancelar esta entrevista")
@@ -263,11 +260,10 @@ async def list_interviews(
     session_token: Optional[str] = Cookie(None)
 ):
     """Lista entrevistas com filtros"""
-    user = await get_current_user(request, session_token)
+    principal = await get_principal(request, session_token)
     
     # Validar acesso ao tenant
-    user_roles = await db.user_org_roles.find({"user_id": user["id"]}, {"_id": 0}).to_list(100)
-    has_access = any(r["organization_id"] == tenant_id for r in user_roles)
+    has_access = principal.can(tenant_id)
     
     if not has_access:
         raise HTTPException(status_code=403, detail="Você não tem acesso a este tenant")
@@ -352,15 +348,15 @@ async def mark_interview_status(
     session_token: Optional[str] = Cookie(None)
 ):
     """Marca entrevista como concluída ou faltou"""
-    user = await get_current_user(request, session_token)
+    principal = await get_principal(request, session_token)
+    user = principal.user
     
     interview = await db.interviews.find_one({"id": interview_id}, {"_id": 0})
     if not interview:
         raise HTTPException(status_code=404, detail="Entrevista não encontrada")
     
     # Validar acesso
-    user_roles = await db.user_org_roles.find({"user_id": user["id"]}, {"_id": 0}).to_list(100)
-    has_access = any(r["organization_id"] == interview["tenant_id"] and r["role"] in ["admin", "recruiter"] for r in user_roles)
+    has_access = principal.can(interview["tenant_id"], "admin", "recruiter")
     
     if not has_access:
         raise HTTPException(status_code=403, detail="Você não tem permissão para alterar esta entrevista")
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, Request, Cookie, UploadFile, File
+from fastapi import APIRouter, HTTPException, Depends, Request, Cookie, Query, UploadFile, File
 from pydantic import BaseModel
 from typing import Optional, List, Literal, Dict, Any
 from datetime import datetime
 from server import db
 from models import Job, JobRequiredSkill, JobPublication
-from utils.auth import get_current_user, require_role, get_user_roles
+from utils.auth import get_principal
+from services.matching import pool_matcher
+from services.job_profiles import PROFILE_VERSION_FIELD, bump_profile_version
+from utils.search_fields import build_job_search_fields
+from utils.text_normalization import normalize_city
+from services.rescoring import rescore_tracker, affects_score, JOB_SCORE_FIELDS
 import os
 
 router = APIRouter()
@@ -49,10 +54,10 @@ class JobRequiredSkillCreate(BaseModel):
 
 @router.post("")
 async def create_job(data: JobCreate, organization_id: str, request: Request, session_token: Optional[str] = Cookie(None)):
-    user = await get_current_user(request, session_token)
-    roles = await get_user_roles(user["id"], organization_id)
+    principal = await get_principal(request, session_token)
+    user = principal.user
     
-    if not any(r["role"] in ["admin", "recruiter", "client"] for r in roles):
+    if not principal.can(organization_id, "admin", "recruiter", "client"):
         raise HTTPException(status_code=403, detail="Permissão negada")
     
     job = Job(
@@ -60,7 +65,7 @@ async def create_job(data: JobCreate, organization_id: str, request: Request, se
         created_by=user["id"],
         **data.model_dump()
     )
-    await db.jobs.insert_one(job.model_dump())
+    await db.jobs.insert_one({**job.model_dump(), "search": build_job_search_fields(job.model_dump())})
     return job
 
 
@@ -77,7 +82,7 @@ async def list_jobs(
     if status:
         query["status"] = status
     
-    jobs = await db.jobs.find(query, {"_id": 0}).to_list(1000)
+    jobs = await db.jobs.find(query, {"_id": 0, "search": 0}).to_list(1000)
     return jobs
 
 
@@ -85,20 +90,21 @@ async def list_jobs(
 async def list_public_jobs(city: Optional[str] = None, work_mode: Optional[str] = None):
     query = {"status": "published"}
     if city:
-        query["location_city"] = {"$regex": city, "$options": "i"}
+        # Igualdade no campo normalizado ("sp", "Sao Paulo" e "São Paulo - SP" casam)
+        query["search.city"] = normalize_city(city)
     if work_mode:
         query["work_mode"] = work_mode
     
     # Excluir vagas de teste/seed (created_by começa com "user-" ou "job-")
     query["created_by"] = {"$not": {"$regex": "^(user-|job-)"}}
     
-    jobs = await db.jobs.find(query, {"_id": 0}).to_list(1000)
+    jobs = await db.jobs.find(query, {"_id": 0, "search": 0}).to_list(1000)
     return jobs
 
 
 @router.get("/{job_id}")
 async def get_job(job_id: str):
-    job = await db.jobs.find_one({"id": job_id}, {"_id": 0})
+    job = await db.jobs.find_one({"id": job_id}, {"_id": 0, "search": 0})
     if not job:
         raise HTTPException(status_code=404, detail="Vaga não encontrada")
     
@@ -108,35 +114,91 @@ async def get_job(job_id: str):
     return job
 
 
+@router.get("/{job_id}/matches")
+async def match_pool_candidates(
+    job_id: str,
+    request: Request,
+    limit: int = Query(20, ge=1, le=200),
+    exclude_applied: bool = Query(True, description="Ignora candidatos que já se candidataram à vaga"),
+    session_token: Optional[str] = Cookie(None)
+):
+    """
+    Top candidatos do banco de talentos para a vaga, pelos critérios do
+    ScoringService, sem criar candidaturas.
+    """
+    principal = await get_principal(request, session_token)
+    
+    job = await db.jobs.find_one({"id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Vaga não encontrada")
+    
+    principal.require(["admin", "recruiter"], job["organization_id"])
+    
+    if not pool_matcher.ready:
+        raise HTTPException(status_code=503, detail="Banco de talentos ainda carregando, tente novamente em instantes")
+    
+    exclude = await db.applications.distinct("candidate_id", {"job_id": job_id}) if exclude_applied else []
+    matches = await pool_matcher.match(db, job, limit, exclude)
+    
+    # Dados do candidato e do usuário em lote
+    candidates = await db.candidates.find(
+        {"id": {"$in": [m["candidate_id"] for m in matches]}},
+        {"_id": 0, "search": 0}
+    ).to_list(None)
+    users = await db.users.find(
+        {"id": {"$in": [c["user_id"] for c in candidates]}},
+        {"_id": 0, "id": 1, "full_name": 1, "email": 1}
+    ).to_list(None)
+    users_by_id = {u["id"]: u for u in users}
+    candidates_by_id = {}
+    for candidate in candidates:
+        candidate["user"] = users_by_id.get(candidate["user_id"])
+        candidates_by_id[candidate["id"]] = candidate
+    
+    for match in matches:
+        match["candidate"] = candidates_by_id.get(match["candidate_id"])
+    
+    return {
+        "job_id": job_id,
+        "pool_size": len(pool_matcher.pool),
+        "pool_loaded_at": pool_matcher.built_at,
+        "matches": [m for m in matches if m["candidate"]]
+    }
+
+
 @router.patch("/{job_id}")
 async def update_job(job_id: str, data: JobUpdate, request: Request, session_token: Optional[str] = Cookie(None)):
-    user = await get_current_user(request, session_token)
+    principal = await get_principal(request, session_token)
     
     job = await db.jobs.find_one({"id": job_id})
     if not job:
         raise HTTPException(status_code=404, detail="Vaga não encontrada")
     
-    roles = await get_user_roles(user["id"], job["organization_id"])
-    if not any(r["role"] in ["admin", "recruiter", "client"] for r in roles):
+    if not principal.can(job["organization_id"], "admin", "recruiter", "client"):
         raise HTTPException(status_code=403, detail="Permissão negada")
     
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
     update_data["updated_at"] = datetime.now()
-    
-    await db.jobs.update_one({"id": job_id}, {"$set": update_data})
-    updated_job = await db.jobs.find_one({"id": job_id}, {"_id": 0})
+    if "location_city" in update_data or "location_state" in update_data:
+        update_data["search"] = build_job_search_fields({**job, **update_data})
+    
+    # Carimbo dos requisitos: perfis compilados em cache (em qualquer worker) são recompilados
+    await db.jobs.update_one({"id": job_id}, {"$set": update_data, "$inc": {PROFILE_VERSION_FIELD: 1}})
+    if affects_score(JOB_SCORE_FIELDS, job, update_data):
+        rescore_tracker.job_changed(job_id)
+    updated_job = await db.jobs.find_one({"id": job_id}, {"_id": 0, "search": 0})
     return updated_job
 
 
 @router.post("/{job_id}/publish")
 async def publish_job(job_id: str, request: Request, session_token: Optional[str] = Cookie(None)):
-    user = await get_current_user(request, session_token)
+    principal = await get_principal(request, session_token)
     
     job = await db.jobs.find_one({"id": job_id})
     if not job:
         raise HTTPException(status_code=404, detail="Vaga não encontrada")
     
-    await require_role(user, ["admin", "recruiter"], job["organization_id"])
+    principal.require(["admin", "recruiter"], job["organization_id"])
     
     await db.jobs.update_one({"id": job_id}, {"$set": {"status": "published", "updated_at": datetime.now()}})
     
@@ -153,16 +215,18 @@ async def publish_job(job_id: str, request: Request, session_token: Optional[str
 
 @router.post("/{job_id}/required-skills")
 async def add_required_skill(job_id: str, data: JobRequiredSkillCreate, request: Request, session_token: Optional[str] = Cookie(None)):
-    user = await get_current_user(request, session_token)
+    principal = await get_principal(request, session_token)
     
     job = await db.jobs.find_one({"id": job_id})
     if not job:
         raise HTTPException(status_code=404, detail="Vaga não encontrada")
     
-    await require_role(user, ["admin", "recruiter", "client"], job["organization_id"])
+    principal.require(["admin", "recruiter", "client"], job["organization_id"])
     
     req_skill = JobRequiredSkill(job_id=job_id, **data.model_dump())
     await db.job_required_skills.insert_one(req_skill.model_dump())
+    await bump_profile_version(db, job_id)
+    rescore_tracker.job_changed(job_id)
     return req_skill
 
 
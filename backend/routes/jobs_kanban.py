@@ -4,7 +4,7 @@ from typing import Optional, Literal, List
 from datetime import datetime, timezone
 from server import db
 from models import JobStageHistory, JobNote
-from utils.auth import get_current_user, get_user_roles
+from utils.auth import get_current_user, get_principal
 
 router = APIRouter()
 
@@ -28,15 +28,12 @@ async def get_jobs_kanban(request: Request, session_token: Optional[str] = Cooki
     """
     Retorna todas as vagas agrupadas por fase do recrutamento para o Kanban
     """
-    user = await get_current_user(request, session_token)
-    
-    # Buscar roles do usuário
-    roles = await get_user_roles(user["id"])
+    principal = await get_principal(request, session_token)
     
     # Filtrar por organização se não for admin
     query = {}
-    if not any(r["role"] == "admin" for r in roles):
-        org_ids = list(set([r["organization_id"] for r in roles if r["role"] in ["recruiter", "client"]]))
+    if not principal.has_role("admin"):
+        org_ids = principal.tenant_ids("recruiter", "client")
         if org_ids:
             # Buscar vagas onde organization_id OU tenant_id estão na lista
             query["$or"] = [
@@ -82,7 +79,8 @@ async def move_job_stage(
     """
     Move uma vaga para uma nova fase do recrutamento
     """
-    user = await get_current_user(request, session_token)
+    principal = await get_principal(request, session_token)
+    user = principal.user
     
     # Buscar vaga
     job = await db.jobs.find_one({"id": job_id})
@@ -90,8 +88,7 @@ async def move_job_stage(
         raise HTTPException(status_code=404, detail="Vaga não encontrada")
     
     # Verificar permissão
-    roles = await get_user_roles(user["id"], job["organization_id"])
-    if not any(r["role"] in ["admin", "recruiter"] for r in roles):
+    if not principal.can(job["organization_id"], "admin", "recruiter"):
         raise HTTPException(status_code=403, detail="Permissão negada")
     
     # Salvar histórico
@@ -132,7 +129,8 @@ async def set_contratacao_result(
     Define o resultado da contratação (positivo ou negativo)
     Se negativo, move automaticamente de volta para Entrevistas
     """
-    user = await get_current_user(request, session_token)
+    principal = await get_principal(request, session_token)
+    user = principal.user
     
     # Buscar vaga
     job = await db.jobs.find_one({"id": job_id})
@@ -140,8 +138,7 @@ async def set_contratacao_result(
         raise HTTPException(status_code=404, detail="Vaga não encontrada")
     
     # Verificar permissão
-    roles = await get_user_roles(user["id"], job["organization_id"])
-    if not any(r["role"] in ["admin", "recruiter"] for r in roles):
+    if not principal.can(job["organization_id"], "admin", "recruiter"):
         raise HTTPException(status_code=403, detail="Permissão negada")
     
     # Verificar se está na fase de contratação
@@ -234,7 +231,8 @@ async def create_job_note(
     """
     Cria uma nova anotação para a vaga (controle do analista)
     """
-    user = await get_current_user(request, session_token)
+    principal = await get_principal(request, session_token)
+    user = principal.user
     
     # Buscar vaga
     job = await db.jobs.find_one({"id": job_id})
@@ -242,8 +240,7 @@ async def create_job_note(
         raise HTTPException(status_code=404, detail="Vaga não encontrada")
     
     # Verificar permissão
-    roles = await get_user_roles(user["id"], job["organization_id"])
-    if not any(r["role"] in ["admin", "recruiter"] for r in roles):
+    if not principal.can(job["organization_id"], "admin", "recruiter"):
         raise HTTPException(status_code=403, detail="Permissão negada")
     
     # Criar nota
@@ -309,7 +306,7 @@ async def delete_job_note(
     """
     Deleta uma anotação (somente o autor ou admin pode deletar)
     """
-    user = await get_current_user(request, session_token)
+    principal = await get_principal(request, session_token)
     
     # Buscar nota
     note = await db.job_notes.find_one({"id": note_id, "job_id": job_id})
@@ -322,9 +319,8 @@ async def delete_job_note(
         raise HTTPException(status_code=404, detail="Vaga não encontrada")
     
     # Verificar se é o autor ou admin
-    roles = await get_user_roles(user["id"], job["organization_id"])
-    is_admin = any(r["role"] == "admin" for r in roles)
-    is_author = note["author_id"] == user["id"]
+    is_admin = principal.can(job["organization_id"], "admin")
+    is_author = note["author_id"] == principal.id
     
     if not (is_admin or is_author):
         raise HTTPException(status_code=403, detail="Apenas o autor ou admin pode deletar esta anotação")
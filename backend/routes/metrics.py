@@ -0,0 +1,15 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+import os
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+
+router = APIRouter()
+
+# Se definido, o scraper deve enviar "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+@router.get("")
+async def get_metrics(request: Request):
+    if METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Não autenticado")
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
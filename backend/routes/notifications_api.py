@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Request, Cookie, Query
 from typing import Optional, List
 from pydantic import BaseModel
-from utils.auth import get_current_user, require_role
+from utils.auth import get_current_user, get_principal
 from services.notification_service import get_notification_service
 
 router = APIRouter()
@@ -146,8 +146,9 @@ async def create_test_notification(
     """
     Cria uma notificação de teste para o usuário logado (admin apenas)
     """
-    user = await get_current_user(request, session_token)
-    await require_role(user, ["admin"])
+    principal = await get_principal(request, session_token)
+    user = principal.user
+    principal.require(["admin"])
     
     service = get_notification_service()
     
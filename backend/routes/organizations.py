@@ -3,7 +3,7 @@ from pydantic import BaseModel
 from typing import Optional, List, Literal
 from server import db
 from models import Organization
-from utils.auth import get_current_user, require_role
+from utils.auth import get_current_user, get_principal
 
 router = APIRouter()
 
@@ -22,8 +22,8 @@ class OrganizationUpdate(BaseModel):
 
 @router.post("")
 async def create_organization(data: OrganizationCreate, request: Request, session_token: Optional[str] = Cookie(None)):
-    user = await get_current_user(request, session_token)
-    await require_role(user, ["admin"])
+    principal = await get_principal(request, session_token)
+    principal.require(["admin"])
     
     org = Organization(**data.model_dump())
     await db.organizations.insert_one(org.model_dump())
@@ -32,8 +32,8 @@ async def create_organization(data: OrganizationCreate, request: Request, sessio
 
 @router.get("")
 async def list_organizations(request: Request, session_token: Optional[str] = Cookie(None)):
-    user = await get_current_user(request, session_token)
-    await require_role(user, ["admin", "recruiter", "client"])
+    principal = await get_principal(request, session_token)
+    principal.require(["admin", "recruiter", "client"])
     
     orgs = await db.organizations.find({"active": True}, {"_id": 0}).to_list(1000)
     return orgs
@@ -51,8 +51,8 @@ async def get_organization(org_id: str, request: Request, session_token: Optiona
 
 @router.patch("/{org_id}")
 async def update_organization(org_id: str, data: OrganizationUpdate, request: Request, session_token: Optional[str] = Cookie(None)):
-    user = await get_current_user(request, session_token)
-    await require_role(user, ["admin"])
+    principal = await get_principal(request, session_token)
+    principal.require(["admin"])
     
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
     if not update_data:
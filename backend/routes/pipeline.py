@@ -1,12 +1,16 @@
 from fastapi import APIRouter, HTTPException, Request, Cookie, Query
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from pydantic import BaseModel
 from server import db
-from utils.auth import get_current_user, require_role
+from utils.auth import get_principal
+from utils.text_normalization import normalize_city
 from datetime import datetime, timezone
 
 router = APIRouter()
 
+# Placeholder: pontuação a partir da qual os must-have são considerados atendidos
+MUST_HAVE_SCORE = 80
+
 
 class MoveApplicationRequest(BaseModel):
     to_stage: str
@@ -21,6 +25,7 @@ async def get_job_pipeline(
     city: Optional[str] = Query(None),
     has_must_have: Optional[bool] = Query(None),
     readonly: bool = Query(False),
+    sort: Literal["recent", "score"] = Query("recent", description="score = maior pontuação primeiro"),
     request: Request = None,
     session_token: Optional[str] = Cookie(None)
 ):
@@ -28,7 +33,7 @@ async def get_job_pipeline(
     Retorna o pipeline (Kanban) de uma vaga com todas as applications organizadas por estágio.
     RBAC: recruiter|admin (full), client (readonly)
     """
-    user = await get_current_user(request, session_token)
+    principal = await get_principal(request, session_token)
     
     # Buscar a vaga
     job = await db.jobs.find_one({"id": job_id}, {"_id": 0})
@@ -38,18 +43,11 @@ async def get_job_pipeline(
     tenant_id = job["organization_id"]
     
     # Validar acesso ao tenant
-    user_roles = await db.user_org_roles.find({"user_id": user["id"]}, {"_id": 0}).to_list(100)
-    user_role_in_tenant = None
-    for r in user_roles:
-        if r["organization_id"] == tenant_id:
-            user_role_in_tenant = r["role"]
-            break
-    
-    if not user_role_in_tenant:
+    if not principal.can(tenant_id):
         raise HTTPException(status_code=403, detail="Você não tem acesso a este tenant")
     
     # Client só pode visualizar em modo readonly
-    if user_role_in_tenant == "client" and not readonly:
+    if principal.can(tenant_id, "client") and not principal.can(tenant_id, "admin", "recruiter") and not readonly:
         raise HTTPException(status_code=403, detail="Cliente só pode visualizar em modo leitura")
     
     # Buscar organização (client)
@@ -75,10 +73,15 @@ async def get_job_pipeline(
     # Aplicar filtros
     if stage:
         query["current_stage"] = stage
-    if min_score:
-        query["scores.total"] = {"$gte": min_score}
+    # Filtros de pontuação no índice (tenant_id, job_id, [current_stage,] scores.total)
+    score_floor = max(min_score or 0, MUST_HAVE_SCORE if has_must_have else 0)
+    if score_floor:
+        query["scores.total"] = {"$gte": score_floor}
     
-    applications = await db.applications.find(query, {"_id": 0}).to_list(1000)
+    cursor = db.applications.find(query, {"_id": 0})
+    if sort == "score":
+        cursor = cursor.sort("scores.total", -1)
+    applications = await cursor.to_list(1000)
     
     # Buscar dados dos candidatos
     cards = []
@@ -96,13 +99,15 @@ async def get_job_pipeline(
         
         # Aplicar filtro de cidade
         candidate_city = candidate.get("location_city")
-        if city and candidate_city != city:
+        if city and normalize_city(candidate_city) != normalize_city(city):
             continue
         
-        # Aplicar filtro de must_have (placeholder - assumir que >80 score = must_have ok)
-        must_have_ok = app.get("scores", {}).get("total", 0) >= 80
-        if has_must_have and not must_have_ok:
-            continue
+        # Pontuação calculada em background: "pending" até o worker gravar
+        scores = app.get("scores") or {}
+        score_total = scores.get("total") or 0
+        
+        # must_have (placeholder - assumir que >80 score = must_have ok); filtro já aplicado na query
+        must_have_ok = score_total >= MUST_HAVE_SCORE
         
         # Contar por estágio
         stage_key = app["current_stage"]
@@ -113,11 +118,13 @@ async def get_job_pipeline(
             "applicationId": app["id"],
             "candidateName": candidate_name,
             "candidateCity": candidate_city,
-            "scoreTotal": app.get("scores", {}).get("total", 0),
+            "scoreTotal": score_total,
+            # Sem scores: candidatura anterior à fila de pontuação, nunca pontuada (não é "pending")
+            "scoreStatus": scores.get("status", "done" if "total" in scores else "unscored"),
             "badges": {
                 "mustHaveOk": must_have_ok,
                 "availability": candidate.get("availability", "N/A"),
-                "cultureMatch": "alto" if app.get("scores", {}).get("total", 0) > 85 else "médio"
+                "cultureMatch": "alto" if score_total > 85 else "médio"
             },
             "currentStage": app["current_stage"],
             "updatedAt": app["updated_at"].isoformat() if isinstance(app["updated_at"], datetime) else app["updated_at"]
@@ -150,7 +157,8 @@ async def move_application_stage(
     Move uma application para um novo estágio.
     RBAC: recruiter|admin apenas
     """
-    user = await get_current_user(request, session_token)
+    principal = await get_principal(request, session_token)
+    user = principal.user
     
     # Buscar application
     app = await db.applications.find_one({"id": application_id}, {"_id": 0})
@@ -158,8 +166,7 @@ async def move_application_stage(
         raise HTTPException(status_code=404, detail="Application não encontrada")
     
     # Validar acesso ao tenant
-    user_roles = await db.user_org_roles.find({"user_id": user["id"]}, {"_id": 0}).to_list(100)
-    has_access = any(r["organization_id"] == app["tenant_id"] and r["role"] in ["admin", "recruiter"] for r in user_roles)
+    has_access = principal.can(app["tenant_id"], "admin", "recruiter")
     
     if not has_access:
         raise HTTPException(status_code=403, detail="Você não tem acesso a esta application")
@@ -235,7 +242,7 @@ async def get_application_history(
     Retorna o histórico de mudanças de estágio de uma application.
     RBAC: recruiter|admin|client
     """
-    user = await get_current_user(request, session_token)
+    principal = await get_principal(request, session_token)
     
     # Buscar application
     app = await db.applications.find_one({"id": application_id}, {"_id": 0})
@@ -243,8 +250,7 @@ async def get_application_history(
         raise HTTPException(status_code=404, detail="Application não encontrada")
     
     # Validar acesso ao tenant
-    user_roles = await db.user_org_roles.find({"user_id": user["id"]}, {"_id": 0}).to_list(100)
-    has_access = any(r["organization_id"] == app["tenant_id"] for r in user_roles)
+    has_access = principal.can(app["tenant_id"])
     
     if not has_access:
         raise HTTPException(status_code=403, detail="Você não tem acesso a esta application")
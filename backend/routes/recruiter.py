@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Request, Cookie, Query
 from typing import Optional, List, Dict, Any
 from server import db
-from utils.auth import get_current_user, require_role
+from utils.auth import get_principal
 from datetime import datetime
 
 router = APIRouter()
@@ -17,12 +17,11 @@ async def get_recruiter_dashboard_kpis(
     Retorna KPIs do dashboard do analista/recrutador.
     Requer role: recruiter ou admin
     """
-    user = await get_current_user(request, session_token)
-    await require_role(user, ["admin", "recruiter"])
+    principal = await get_principal(request, session_token)
+    principal.require(["admin", "recruiter"])
     
     # Validar que o usuário tem acesso ao tenant
-    user_roles = await db.user_org_roles.find({"user_id": user["id"]}, {"_id": 0}).to_list(100)
-    has_access = any(r["organization_id"] == tenant_id and r["role"] in ["admin", "recruiter"] for r in user_roles)
+    has_access = principal.can(tenant_id, "admin", "recruiter")
     
     if not has_access:
         raise HTTPException(status_code=403, detail="Você não tem acesso a este tenant")
@@ -75,12 +74,11 @@ async def get_recruiter_dashboard_jobs(
     Retorna lista de vagas gerenciadas pelo analista/recrutador.
     Requer role: recruiter ou admin
     """
-    user = await get_current_user(request, session_token)
-    await require_role(user, ["admin", "recruiter"])
+    principal = await get_principal(request, session_token)
+    principal.require(["admin", "recruiter"])
     
     # Validar que o usuário tem acesso ao tenant
-    user_roles = await db.user_org_roles.find({"user_id": user["id"]}, {"_id": 0}).to_list(100)
-    has_access = any(r["organization_id"] == tenant_id and r["role"] in ["admin", "recruiter"] for r in user_roles)
+    has_access = principal.can(tenant_id, "admin", "recruiter")
     
     if not has_access:
         raise HTTPException(status_code=403, detail="Você não tem acesso a este tenant")
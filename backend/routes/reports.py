@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends, Request, Cookie
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
 from server import db
-from utils.auth import get_current_user, get_user_roles
+from utils.auth import get_current_user
 
 router = APIRouter()
 
@@ -15,8 +15,6 @@ async def get_pipeline_report(job_id: str, request: Request, session_token: Opti
     if not job:
         raise HTTPException(status_code=404, detail="Vaga não encontrada")
     
-    await get_user_roles(user["id"], job["organization_id"])
-    
     applications = await db.applications.find({"job_id": job_id}, {"_id": 0}).to_list(1000)
     
     stages_count = {}
@@ -35,8 +33,6 @@ async def get_pipeline_report(job_id: str, request: Request, session_token: Opti
 @router.get("/organization/{org_id}/overview")
 async def get_organization_overview(org_id: str, request: Request, session_token: Optional[str] = Cookie(None)):
     user = await get_current_user(request, session_token)
-    await get_user_roles(user["id"], org_id)
-    
     jobs = await db.jobs.find({"organization_id": org_id}, {"_id": 0}).to_list(1000)
     total_applications = 0
     
@@ -1,8 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends, Request, Cookie
 from typing import Optional
 from server import db
-from models import Score
-from utils.auth import get_current_user
+from utils.auth import get_current_user, get_principal
 from services.scoring import ScoringService
 
 router = APIRouter()
@@ -18,36 +17,44 @@ async def recalculate_score(application_id: str, request: Request, session_token
     if not app:
         raise HTTPException(status_code=404, detail="Candidatura não encontrada")
     
-    score_data = await scoring_service.calculate_score(application_id)
+    results = await scoring_service.score_applications([application_id])
+    if application_id not in results:
+        raise HTTPException(status_code=404, detail="Vaga ou candidato da candidatura não encontrado")
     
-    existing_score = await db.scores.find_one({"application_id": application_id})
-    if existing_score:
-        await db.scores.update_one(
-            {"application_id": application_id},
-            {"$set": {"total_score": score_data["total_score"], "breakdown": score_data["breakdown"]}}
-        )
-    else:
-        score_obj = Score(
-            application_id=application_id,
-            total_score=score_data["total_score"],
-            breakdown=score_data["breakdown"]
-        )
-        await db.scores.insert_one(score_obj.model_dump())
+    return results[application_id]
+
+
+@router.post("/jobs/{job_id}/recalculate")
+async def recalculate_job_scores(job_id: str, request: Request, session_token: Optional[str] = Cookie(None)):
+    """Recalcula em lote as pontuações de todas as candidaturas da vaga"""
+    principal = await get_principal(request, session_token)
+    
+    job = await db.jobs.find_one({"id": job_id}, {"_id": 0, "organization_id": 1})
+    if not job:
+        raise HTTPException(status_code=404, detail="Vaga não encontrada")
     
-    await db.applications.update_one(
-        {"id": application_id},
-        {"$set": {"stage_score": score_data["total_score"]}}
-    )
+    principal.require(["admin", "recruiter"], job["organization_id"])
     
-    return score_data
+    scored = await scoring_service.score_job(job_id)
+    return {"job_id": job_id, "scored": scored}
 
 
 @router.get("/{application_id}")
 async def get_score(application_id: str, request: Request, session_token: Optional[str] = Cookie(None)):
     user = await get_current_user(request, session_token)
     
-    score = await db.scores.find_one({"application_id": application_id}, {"_id": 0})
-    if not score:
+    app = await db.applications.find_one({"id": application_id}, {"_id": 0, "scores": 1})
+    if not app:
+        raise HTTPException(status_code=404, detail="Candidatura não encontrada")
+    
+    scores = app.get("scores") or {}
+    if "total" not in scores:
         raise HTTPException(status_code=404, detail="Pontuação não encontrada")
     
-    return score
+    return {
+        "application_id": application_id,
+        "status": scores.get("status", "done"),
+        "total_score": scores["total"],
+        "breakdown": scores.get("breakdown", {}),
+        "updated_at": scores.get("updated_at")
+    }
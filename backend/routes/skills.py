@@ -4,6 +4,10 @@ from typing import Optional, List
 from server import db
 from models import Skill, Tag
 from utils.auth import get_current_user
+from utils.skill_index import skill_index
+from utils.typeahead import typeahead_index
+from utils.semantic_search import semantic_index
+from utils.search_fields import build_skill_search_fields
 
 router = APIRouter()
 
@@ -21,12 +25,19 @@ class TagCreate(BaseModel):
 async def create_skill(data: SkillCreate, request: Request, session_token: Optional[str] = Cookie(None)):
     user = await get_current_user(request, session_token)
     
-    existing = await db.skills.find_one({"name": data.name})
+    # Duplicata pelo nome normalizado ("Node.JS" e "node js" são a mesma skill)
+    search = build_skill_search_fields(data.name)
+    if not search["name"]:
+        raise HTTPException(status_code=400, detail="Nome da habilidade é obrigatório")
+    existing = await db.skills.find_one({"search.name": search["name"]}, {"_id": 1})
     if existing:
         raise HTTPException(status_code=400, detail="Habilidade já existe")
     
     skill = Skill(**data.model_dump())
-    await db.skills.insert_one(skill.model_dump())
+    await db.skills.insert_one({**skill.model_dump(), "search": search})
+    skill_index.add_skill(skill.id, skill.name)
+    typeahead_index.add_skill(skill.id, skill.name)
+    semantic_index.add_skill(skill.id, skill.name)
     return skill
 
 
@@ -36,7 +47,7 @@ async def list_skills(category: Optional[str] = None):
     if category:
         query["category"] = category
     
-    skills = await db.skills.find(query, {"_id": 0}).to_list(1000)
+    skills = await db.skills.find(query, {"_id": 0, "search": 0}).to_list(1000)
     return skills
 
 
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends, Request, Cookie
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, Cookie
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List, Literal
 from server import db
 from models import UserOrgRole
-from utils.auth import get_current_user, require_role
+from utils.auth import get_current_user, get_principal, invalidate_user_auth
+from utils.session_cache import session_cache
+from utils.candidate_search import refresh_candidate_search
 
 router = APIRouter()
 
@@ -20,8 +22,8 @@ class ChangePasswordByAdminRequest(BaseModel):
 
 @router.get("")
 async def list_users(organization_id: Optional[str] = None, request: Request = None, session_token: Optional[str] = Cookie(None)):
-    user = await get_current_user(request, session_token)
-    await require_role(user, ["admin", "recruiter"])
+    principal = await get_principal(request, session_token)
+    principal.require(["admin", "recruiter"])
     
     query = {"is_active": True}
     users = await db.users.find(query, {"_id": 0, "password_hash": 0}).to_list(1000)
@@ -36,15 +38,14 @@ async def list_users(organization_id: Optional[str] = None, request: Request = N
 
 @router.get("/me/roles")
 async def get_my_roles(request: Request, session_token: Optional[str] = Cookie(None)):
-    user = await get_current_user(request, session_token)
-    roles = await db.user_org_roles.find({"user_id": user["id"]}, {"_id": 0}).to_list(100)
-    return roles
+    principal = await get_principal(request, session_token)
+    return principal.roles
 
 
 @router.post("/roles")
 async def create_user_org_role(data: UserOrgRoleCreate, request: Request, session_token: Optional[str] = Cookie(None)):
-    user = await get_current_user(request, session_token)
-    await require_role(user, ["admin"], data.organization_id)
+    principal = await get_principal(request, session_token)
+    principal.require(["admin"], data.organization_id)
     
     existing = await db.user_org_roles.find_one({
         "user_id": data.user_id,
@@ -56,26 +57,29 @@ async def create_user_org_role(data: UserOrgRoleCreate, request: Request, sessio
     
     role_obj = UserOrgRole(**data.model_dump())
     await db.user_org_roles.insert_one(role_obj.model_dump())
+    await invalidate_user_auth(data.user_id)
     return role_obj
 
 
 @router.delete("/roles/{role_id}")
 async def delete_user_org_role(role_id: str, request: Request, session_token: Optional[str] = Cookie(None)):
-    user = await get_current_user(request, session_token)
-    await require_role(user, ["admin"])
+    principal = await get_principal(request, session_token)
+    principal.require(["admin"])
     
-    result = await db.user_org_roles.delete_one({"id": role_id})
-    if result.deleted_count == 0:
+    role = await db.user_org_roles.find_one_and_delete({"id": role_id})
+    if not role:
         raise HTTPException(status_code=404, detail="Papel não encontrado")
     
+    await invalidate_user_auth(role["user_id"])
+    
     return {"message": "Papel removido com sucesso"}
 
 
 
 @router.get("/{user_id}")
 async def get_user(user_id: str, request: Request, session_token: Optional[str] = Cookie(None)):
-    user = await get_current_user(request, session_token)
-    await require_role(user, ["admin", "recruiter"])
+    principal = await get_principal(request, session_token)
+    principal.require(["admin", "recruiter"])
     
     target_user = await db.users.find_one({"id": user_id}, {"_id": 0, "password_hash": 0})
     if not target_user:
@@ -90,11 +94,12 @@ async def get_user(user_id: str, request: Request, session_token: Optional[str]
 
 @router.patch("/{user_id}")
 async def update_user(user_id: str, update_data: dict, request: Request, session_token: Optional[str] = Cookie(None)):
-    user = await get_current_user(request, session_token)
+    principal = await get_principal(request, session_token)
+    user = principal.user
     
     # Admin pode editar qualquer usuário, outros só podem editar a si mesmos
     if user["id"] != user_id:
-        await require_role(user, ["admin"])
+        principal.require(["admin"])
     
     # Remover campos que não devem ser atualizados diretamente
     update_data.pop("id", None)
@@ -115,13 +120,19 @@ async def update_user(user_id: str, update_data: dict, request: Request, session
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
+    # Desativação revoga os tokens já emitidos
+    await invalidate_user_auth(user_id, revoke_tokens="is_active" in update_data)
+    
+    if "full_name" in update_data or "email" in update_data:
+        await refresh_candidate_search(db, user_id)
+    
     return {"message": "Usuário atualizado com sucesso"}
 
 
 @router.delete("/{user_id}")
 async def delete_user(user_id: str, request: Request, session_token: Optional[str] = Cookie(None)):
-    user = await get_current_user(request, session_token)
-    await require_role(user, ["admin"])
+    principal = await get_principal(request, session_token)
+    principal.require(["admin"])
     
     # Desativar ao invés de deletar (soft delete)
     result = await db.users.update_one(
@@ -132,6 +143,8 @@ async def delete_user(user_id: str, request: Request, session_token: Optional[st
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
+    await invalidate_user_auth(user_id)
+    
     return {"message": "Usuário desativado com sucesso"}
 
 
@@ -161,15 +174,20 @@ async def update_my_profile(update_data: dict, request: Request, session_token:
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
+    session_cache.invalidate_user(user["id"])
+    
+    if "full_name" in update_data or "email" in update_data:
+        await refresh_candidate_search(db, user["id"])
+    
     return {"message": "Perfil atualizado com sucesso"}
 
 
 @router.put("/me/password")
-async def change_my_password(data: dict, request: Request, session_token: Optional[str] = Cookie(None)):
+async def change_my_password(data: dict, request: Request, response: Response, session_token: Optional[str] = Cookie(None)):
     """Usuário troca sua própria senha"""
     user = await get_current_user(request, session_token)
     
-    from utils.auth import verify_password, hash_password
+    from utils.auth import verify_password_async, hash_password_async, load_password_hash, issue_access_token, AUTH_MODE
     
     old_password = data.get("old_password")
     new_password = data.get("new_password")
@@ -178,11 +196,11 @@ async def change_my_password(data: dict, request: Request, session_token: Option
         raise HTTPException(status_code=400, detail="Senha antiga e nova são obrigatórias")
     
     # Verificar senha antiga
-    if not verify_password(old_password, user["password_hash"]):
+    if not await verify_password_async(old_password, await load_password_hash(user)):
         raise HTTPException(status_code=400, detail="Senha antiga incorreta")
     
     # Atualizar senha
-    new_hash = hash_password(new_password)
+    new_hash = await hash_password_async(new_password)
     from datetime import datetime, timezone
     await db.users.update_one(
         {"id": user["id"]},
@@ -192,6 +210,22 @@ async def change_my_password(data: dict, request: Request, session_token: Option
             "updated_at": datetime.now(timezone.utc).isoformat()
         }}
     )
+    await invalidate_user_auth(user["id"])
+    
+    # Tokens anteriores foram revogados: emitir um novo para esta sessão
+    if AUTH_MODE == "stateless":
+        updated_user = await db.users.find_one({"id": user["id"]}, {"_id": 0})
+        access_token = await issue_access_token(db, updated_user)
+        response.set_cookie(
+            key="session_token",
+            value=access_token,
+            httponly=True,
+            secure=True,
+            samesite="none",
+            max_age=7 * 24 * 60 * 60,
+            path="/"
+        )
+        return {"message": "Senha alterada com sucesso", "access_token": access_token}
     
     return {"message": "Senha alterada com sucesso"}
 
@@ -204,12 +238,12 @@ async def admin_change_password(
     session_token: Optional[str] = Cookie(None)
 ):
     """Admin altera senha de um usuário (pode definir manualmente ou gerar automaticamente)"""
-    user = await get_current_user(request, session_token)
-    await require_role(user, ["admin"])
+    principal = await get_principal(request, session_token)
+    principal.require(["admin"])
     
     # Usar senha fornecida ou gerar automaticamente
     import secrets
-    from utils.auth import hash_password
+    from utils.auth import hash_password_async
     
     if data.new_password is not None:
         # Validar que a senha tem pelo menos 1 caractere
@@ -224,7 +258,7 @@ async def admin_change_password(
     result = await db.users.update_one(
         {"id": user_id},
         {"$set": {
-            "password_hash": hash_password(new_password),
+            "password_hash": await hash_password_async(new_password),
             "requires_password_change": False,  # Usuário pode manter a senha
             "updated_at": datetime.now(timezone.utc).isoformat()
         }}
@@ -233,6 +267,8 @@ async def admin_change_password(
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
+    await invalidate_user_auth(user_id)
+    
     return {
         "message": "Senha alterada com sucesso",
         "new_password": new_password
@@ -3,15 +3,19 @@ from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import asyncio
 import logging
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+from utils.query_monitor import command_monitor, QueryStatsMiddleware, DB_QUERY_MONITOR_ENABLED
+from utils.metrics import MetricsMiddleware
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, event_listeners=[command_monitor] if DB_QUERY_MONITOR_ENABLED else [])
 db = client[os.environ['DB_NAME']]
 
 # Create the main app
@@ -26,7 +30,7 @@ import services.notification_service as notif_service_module
 notif_service_module.notification_service = NotificationService(db)
 
 # Import and include all route modules
-from routes import auth, organizations, users, candidates, skills, jobs, applications, interviews, feedbacks, questionnaires, assessments, scores, notifications, consents, reports, recruiter, pipeline, notifications_api, interviews_api, jobs_kanban, candidates_search
+from routes import auth, organizations, users, candidates, skills, jobs, applications, interviews, feedbacks, questionnaires, assessments, scores, notifications, consents, reports, recruiter, pipeline, notifications_api, interviews_api, jobs_kanban, candidates_search, metrics
 
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(organizations.router, prefix="/organizations", tags=["organizations"])
@@ -49,11 +53,19 @@ api_router.include_router(notifications_api.router, prefix="/notifications", tag
 api_router.include_router(interviews_api.router, prefix="/applications", tags=["interviews_v2"])
 api_router.include_router(jobs_kanban.router, prefix="/jobs-kanban", tags=["jobs_kanban"])
 api_router.include_router(candidates_search.router, prefix="/candidates", tags=["candidates_search"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 
 api_router.get("/")(lambda: {"message": "Ciatos ATS API v1.0"})
 
 app.include_router(api_router)
 
+# Contagem/tempo de comandos Mongo por requisição (Server-Timing, X-DB-Queries)
+if DB_QUERY_MONITOR_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
+# Latência HTTP por rota (/api/metrics)
+app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -68,6 +80,101 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def ensure_db_indexes():
+    from utils.indexes import ensure_indexes, format_drift_report
+    try:
+        drift = await ensure_indexes(db)
+        for line in format_drift_report(drift):
+            logger.warning(f"Drift de índice: {line}")
+    except Exception as e:
+        logger.error(f"Erro ao aplicar índices: {e}")
+
+
+@app.on_event("startup")
+async def start_revocation_refresher():
+    from utils.auth import AUTH_MODE, AUTH_REVOCATION_REFRESH_SECONDS
+    from utils.revocation import revocation_list
+    if AUTH_MODE == "stateless":
+        app.state.revocation_task = asyncio.create_task(
+            revocation_list.run_refresher(db, AUTH_REVOCATION_REFRESH_SECONDS)
+        )
+
+
+@app.on_event("startup")
+async def start_session_sweeper():
+    from utils.sessions import run_session_sweeper, SESSION_SWEEP_INTERVAL_SECONDS
+    if SESSION_SWEEP_INTERVAL_SECONDS > 0:
+        app.state.session_sweeper_task = asyncio.create_task(
+            run_session_sweeper(db, SESSION_SWEEP_INTERVAL_SECONDS)
+        )
+
+
+@app.on_event("startup")
+async def start_skill_index():
+    from utils.skill_index import skill_index, SKILL_INDEX_ENABLED, SKILL_INDEX_REFRESH_SECONDS
+    if SKILL_INDEX_ENABLED:
+        app.state.skill_index_task = asyncio.create_task(
+            skill_index.run_refresher(db, SKILL_INDEX_REFRESH_SECONDS)
+        )
+
+
+@app.on_event("startup")
+async def start_semantic_index():
+    from utils.semantic_search import semantic_index, SEMANTIC_INDEX_ENABLED, SEMANTIC_INDEX_REFRESH_SECONDS
+    if SEMANTIC_INDEX_ENABLED:
+        app.state.semantic_index_task = asyncio.create_task(
+            semantic_index.run_refresher(db, SEMANTIC_INDEX_REFRESH_SECONDS)
+        )
+
+
+@app.on_event("startup")
+async def start_typeahead():
+    from utils.typeahead import typeahead_index, TYPEAHEAD_ENABLED, TYPEAHEAD_REFRESH_SECONDS
+    if TYPEAHEAD_ENABLED:
+        app.state.typeahead_task = asyncio.create_task(
+            typeahead_index.run_refresher(db, TYPEAHEAD_REFRESH_SECONDS)
+        )
+
+
+@app.on_event("startup")
+async def start_pool_matcher():
+    from services.matching import pool_matcher, MATCHING_POOL_ENABLED, MATCHING_POOL_REFRESH_SECONDS
+    if MATCHING_POOL_ENABLED:
+        app.state.pool_matcher_task = asyncio.create_task(
+            pool_matcher.run_refresher(db, MATCHING_POOL_REFRESH_SECONDS)
+        )
+
+
+@app.on_event("startup")
+async def start_scoring_queue():
+    from services.scoring_queue import scoring_queue, SCORING_QUEUE_ENABLED
+    if SCORING_QUEUE_ENABLED:
+        app.state.scoring_queue_task = asyncio.create_task(scoring_queue.run(db))
+
+
+@app.on_event("startup")
+async def start_rescore_tracker():
+    from services.rescoring import rescore_tracker, RESCORING_ENABLED
+    if RESCORING_ENABLED:
+        app.state.rescore_task = asyncio.create_task(rescore_tracker.run(db))
+
+
+@app.on_event("startup")
+async def start_metrics():
+    from utils.auth import password_executor
+    from utils.metrics import register_collectors, monitor_event_loop_lag
+    from services.scoring_queue import scoring_queue
+    register_collectors(command_monitor, password_executor, scoring_queue)
+    app.state.loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
+
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    from utils.auth import password_executor
+    password_executor.shutdown()
+    for task_name in ("revocation_task", "session_sweeper_task", "skill_index_task", "semantic_index_task", "typeahead_task", "pool_matcher_task", "scoring_queue_task", "rescore_task", "loop_lag_task"):
+        task = getattr(app.state, task_name, None)
+        if task:
+            task.cancel()
     client.close()
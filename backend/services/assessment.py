@@ -1,6 +1,7 @@
 from typing import Dict, Any
 import os
 from emergentintegrations.llm.chat import LlmChat, UserMessage
+from utils.metrics import llm_timer
 
 
 class AssessmentService:
@@ -27,7 +28,8 @@ class AssessmentService:
         prompt = f"Analise o seguinte perfil DISC e forneça um resumo em 3-4 linhas sobre o perfil comportamental do candidato: {data}"
         
         message = UserMessage(text=prompt)
-        response = await chat.send_message(message)
+        async with llm_timer("assessment_disc"):
+            response = await chat.send_message(message)
         
         return response
     
@@ -41,7 +43,8 @@ class AssessmentService:
         prompt = f"Analise as respostas comportamentais e forneça um resumo sobre o perfil do candidato: {data}"
         
         message = UserMessage(text=prompt)
-        response = await chat.send_message(message)
+        async with llm_timer("assessment_behavioral"):
+            response = await chat.send_message(message)
         
         return response
     
@@ -0,0 +1,149 @@
+"""
+Perfis de requisitos compilados por vaga (cache em memória)
+
+Um JobProfile reúne, já prontos para os cálculos vetorizados, tudo o que a
+pontuação precisa da vaga: skills exigidas em ordem densa (skill_id ->
+coluna), vetor de níveis mínimos, máscara de must-have, anos de experiência
+esperados, cidade/estado normalizados e faixa salarial. ScoringService e o
+matching do pool partem desses arrays em vez de reler job_required_skills e
+reinterpretar employment_type a cada chamada.
+
+Os perfis ficam em cache carimbados com jobs.profile_version, que
+update_job e add_required_skill incrementam no próprio documento da vaga
+(bump_profile_version). get_many lê só {id, profile_version} das vagas e
+recompila as que mudaram; como o carimbo vem do banco, uma alteração feita
+em qualquer worker invalida o perfil em todos antes da próxima pontuação.
+"""
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from utils.text_normalization import normalize_city, normalize_state
+
+JOB_PROFILE_CACHE_SIZE = int(os.getenv("JOB_PROFILE_CACHE_SIZE", "2000"))
+
+# Carimbo de versão dos requisitos, incrementado no documento da vaga
+PROFILE_VERSION_FIELD = "profile_version"
+
+JOB_PROJECTION = {
+    "_id": 0, "id": 1, "employment_type": 1, "work_mode": 1, "location_city": 1, "location_state": 1,
+    "salary_min": 1, "salary_max": 1, "ideal_profile": 1, PROFILE_VERSION_FIELD: 1,
+}
+STAMP_PROJECTION = {"_id": 0, "id": 1, PROFILE_VERSION_FIELD: 1}
+REQUIRED_SKILL_PROJECTION = {"_id": 0, "job_id": 1, "skill_id": 1, "min_level": 1, "must_have": 1}
+
+
+def required_years(job: Dict[str, Any]) -> int:
+    """Anos de experiência esperados pelo tipo de contratação"""
+    employment_type = (job.get("employment_type") or "").lower()
+    if "senior" in employment_type:
+        return 5
+    if "pleno" in employment_type:
+        return 3
+    return 2
+
+
+@dataclass
+class JobProfile:
+    """Requisitos da vaga compilados para a pontuação"""
+    job_id: str
+    version: int
+    skill_ids: List[str]
+    skill_columns: Dict[str, int]
+    min_levels: np.ndarray
+    must_have: np.ndarray
+    required_years: int
+    remote: bool
+    city: Optional[str]
+    state: Optional[str]
+    has_ideal_profile: bool
+    salary_min: Optional[float]
+    salary_max: float  # inf = sem teto
+
+    @classmethod
+    def compile(cls, job: Dict[str, Any], required_skills: List[Dict[str, Any]]) -> "JobProfile":
+        skill_ids = [req["skill_id"] for req in required_skills]
+        return cls(
+            job_id=job["id"],
+            version=job.get(PROFILE_VERSION_FIELD, 0),
+            skill_ids=skill_ids,
+            skill_columns={skill_id: column for column, skill_id in enumerate(skill_ids)},
+            min_levels=np.array([req["min_level"] for req in required_skills], dtype=np.int16),
+            must_have=np.array([bool(req["must_have"]) for req in required_skills], dtype=bool),
+            required_years=required_years(job),
+            remote=job.get("work_mode") == "remoto",
+            city=normalize_city(job.get("location_city")),
+            state=normalize_state(job.get("location_state")),
+            has_ideal_profile=bool(job.get("ideal_profile")),
+            salary_min=job.get("salary_min") or None,
+            salary_max=job.get("salary_max") or np.inf,
+        )
+
+
+async def bump_profile_version(db: AsyncIOMotorDatabase, job_id: str):
+    """Marca os requisitos da vaga como alterados (após gravar a alteração)"""
+    await db.jobs.update_one({"id": job_id}, {"$inc": {PROFILE_VERSION_FIELD: 1}})
+
+
+class JobProfileCache:
+    def __init__(self, max_size: int = JOB_PROFILE_CACHE_SIZE):
+        self.max_size = max_size
+        self._profiles: "OrderedDict[str, JobProfile]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self._profiles.clear()
+
+    def _store(self, profile: JobProfile):
+        self._profiles[profile.job_id] = profile
+        self._profiles.move_to_end(profile.job_id)
+        while len(self._profiles) > self.max_size:
+            self._profiles.popitem(last=False)
+
+    async def get_many(self, db: AsyncIOMotorDatabase, job_ids: Iterable[str]) -> Dict[str, JobProfile]:
+        """
+        Perfis das vagas existentes. Uma consulta leve confere o carimbo de
+        cada vaga; só as ausentes ou desatualizadas são compiladas (duas
+        consultas $in).
+        """
+        stamps = {
+            j["id"]: j.get(PROFILE_VERSION_FIELD, 0)
+            async for j in db.jobs.find({"id": {"$in": list(set(job_ids))}}, STAMP_PROJECTION)
+        }
+        profiles, missing = {}, []
+        for job_id, version in stamps.items():
+            profile = self._profiles.get(job_id)
+            if profile is not None and profile.version == version:
+                self._profiles.move_to_end(job_id)
+                profiles[job_id] = profile
+            else:
+                missing.append(job_id)
+        self.hits += len(profiles)
+        self.misses += len(missing)
+        if not missing:
+            return profiles
+
+        # O carimbo compilado é o lido junto com a vaga: uma alteração concorrente
+        # incrementa depois de gravar, e a próxima chamada recompila
+        jobs = {j["id"]: j async for j in db.jobs.find({"id": {"$in": missing}}, JOB_PROJECTION)}
+        required_by_job: Dict[str, List[Dict[str, Any]]] = {}
+        async for req in db.job_required_skills.find({"job_id": {"$in": list(jobs)}}, REQUIRED_SKILL_PROJECTION):
+            required_by_job.setdefault(req["job_id"], []).append(req)
+
+        for job_id, job in jobs.items():
+            profile = JobProfile.compile(job, required_by_job.get(job_id, []))
+            self._store(profile)
+            profiles[job_id] = profile
+        return profiles
+
+    async def get(self, db: AsyncIOMotorDatabase, job_id: str) -> Optional[JobProfile]:
+        return (await self.get_many(db, [job_id])).get(job_id)
+
+
+# Singleton global usado pela pontuação e pelo matching do pool
+job_profiles = JobProfileCache()
@@ -0,0 +1,230 @@
+"""
+Matching reverso: ranqueia o banco de talentos (visibility "pool") para uma vaga
+
+Aplica os mesmos critérios e pesos do ScoringService, mas vetorizados sobre
+todos os candidatos do pool de uma vez, sem criar candidaturas, a partir do
+perfil compilado da vaga (services/job_profiles.py). O pool é
+mantido em memória como arrays NumPy (níveis de skill esparsos por skill,
+anos de experiência, códigos de cidade/estado normalizados, pretensão salarial) e
+reconstruído periodicamente; cada consulta só monta a matriz das skills
+exigidas pela vaga e seleciona o top-K com argpartition.
+
+Diferenças em relação ao cálculo por candidatura: sem candidatura não há
+avaliações, então o critério comportamental vale 50 quando a vaga tem
+ideal_profile (como "sem avaliações") e 100 caso contrário.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from services.job_profiles import JobProfile, job_profiles
+from services.scoring import ScoringService
+from utils.text_normalization import normalize_city, normalize_state
+
+logger = logging.getLogger(__name__)
+
+MATCHING_POOL_ENABLED = os.getenv("MATCHING_POOL_ENABLED", "true").lower() == "true"
+MATCHING_POOL_REFRESH_SECONDS = int(os.getenv("MATCHING_POOL_REFRESH_SECONDS", "300"))
+
+DAYS_PER_YEAR = 365.25
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _days(value: datetime) -> float:
+    return (value.replace(tzinfo=None) - _EPOCH).total_seconds() / 86400
+
+
+class CandidatePool:
+    """Arrays do pool de candidatos, alinhados por linha"""
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.city = np.zeros(0, dtype=np.int32)
+        self.state = np.zeros(0, dtype=np.int32)
+        self.salary = np.zeros(0, dtype=np.float64)  # NaN = sem pretensão
+        self.experience_count = np.zeros(0, dtype=np.int32)
+        self.closed_years = np.zeros(0, dtype=np.float64)
+        self.open_count = np.zeros(0, dtype=np.int32)
+        self.open_start_days = np.zeros(0, dtype=np.float64)  # soma das datas de início em aberto
+        # skill_id -> (linhas, níveis)
+        self.skills: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        # Valores normalizados -> código (None também tem código, como no ScoringService)
+        self.city_codes: Dict[Optional[str], int] = {}
+        self.state_codes: Dict[Optional[str], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def _code(codes: Dict[Optional[str], int], value: Optional[str]) -> int:
+        return codes.setdefault(value, len(codes))
+
+    @classmethod
+    async def load(cls, db: AsyncIOMotorDatabase, batch_size: int = 5000) -> "CandidatePool":
+        pool = cls()
+        city, state, salary = [], [], []
+        projection = {"_id": 0, "id": 1, "location_city": 1, "location_state": 1, "salary_expectation": 1}
+        async for candidate in db.candidates.find({"visibility": "pool"}, projection).batch_size(batch_size):
+            pool.rows[candidate["id"]] = len(pool.ids)
+            pool.ids.append(candidate["id"])
+            city.append(cls._code(pool.city_codes, normalize_city(candidate.get("location_city"))))
+            state.append(cls._code(pool.state_codes, normalize_state(candidate.get("location_state"))))
+            salary.append(candidate.get("salary_expectation") or np.nan)
+
+        n = len(pool.ids)
+        pool.city = np.array(city, dtype=np.int32)
+        pool.state = np.array(state, dtype=np.int32)
+        pool.salary = np.array(salary, dtype=np.float64)
+        pool.experience_count = np.zeros(n, dtype=np.int32)
+        pool.closed_years = np.zeros(n, dtype=np.float64)
+        pool.open_count = np.zeros(n, dtype=np.int32)
+        pool.open_start_days = np.zeros(n, dtype=np.float64)
+
+        skill_rows: Dict[str, List[int]] = {}
+        skill_levels: Dict[str, List[int]] = {}
+        for start in range(0, n, batch_size):
+            batch_ids = pool.ids[start:start + batch_size]
+            experiences = db.experiences.find(
+                {"candidate_id": {"$in": batch_ids}},
+                {"_id": 0, "candidate_id": 1, "start_date": 1, "end_date": 1}
+            )
+            async for exp in experiences:
+                row = pool.rows[exp["candidate_id"]]
+                pool.experience_count[row] += 1
+                if exp.get("end_date"):
+                    pool.closed_years[row] += (exp["end_date"] - exp["start_date"]).days / DAYS_PER_YEAR
+                else:
+                    pool.open_count[row] += 1
+                    pool.open_start_days[row] += _days(exp["start_date"])
+
+            candidate_skills = db.candidate_skills.find(
+                {"candidate_id": {"$in": batch_ids}},
+                {"_id": 0, "candidate_id": 1, "skill_id": 1, "level": 1}
+            )
+            async for cs in candidate_skills:
+                skill_rows.setdefault(cs["skill_id"], []).append(pool.rows[cs["candidate_id"]])
+                skill_levels.setdefault(cs["skill_id"], []).append(cs["level"])
+
+        pool.skills = {
+            skill_id: (np.array(rows, dtype=np.int64), np.array(skill_levels[skill_id], dtype=np.int16))
+            for skill_id, rows in skill_rows.items()
+        }
+        return pool
+
+    # ---- critérios vetorizados (mesmas regras do ScoringService) ----
+
+    def skill_levels(self, skill_id: str) -> np.ndarray:
+        """Nível do candidato na skill (0 = não possui)"""
+        levels = np.zeros(len(self), dtype=np.int16)
+        if skill_id in self.skills:
+            rows, values = self.skills[skill_id]
+            np.maximum.at(levels, rows, values)
+        return levels
+
+    def skills_score(self, profile: JobProfile) -> np.ndarray:
+        if not profile.skill_ids:
+            return np.full(len(self), 100.0)
+        matched = np.zeros(len(self), dtype=np.float64)
+        must_have_failed = np.zeros(len(self), dtype=bool)
+        for skill_id, min_level, must_have in zip(profile.skill_ids, profile.min_levels, profile.must_have):
+            meets = self.skill_levels(skill_id) >= min_level
+            matched += meets
+            if must_have:
+                must_have_failed |= ~meets
+        score = np.where(must_have_failed, 80.0, 100.0) * (matched / len(profile.skill_ids))
+        return np.maximum(score, 0)
+
+    def experience_score(self, profile: JobProfile, now: datetime) -> np.ndarray:
+        years = self.closed_years + (self.open_count * _days(now) - self.open_start_days) / DAYS_PER_YEAR
+        ratio = np.minimum(years / profile.required_years, 1.0)
+        return np.where(self.experience_count > 0, ratio * 100, 50.0)
+
+    def location_score(self, profile: JobProfile) -> np.ndarray:
+        if profile.remote:
+            return np.full(len(self), 100.0)
+        same_city = self.city == self.city_codes.get(profile.city, -1)
+        same_state = self.state == self.state_codes.get(profile.state, -1)
+        return np.where(same_city, 100.0, np.where(same_state, 70.0, 40.0))
+
+    def behavioral_score(self, profile: JobProfile) -> np.ndarray:
+        return np.full(len(self), 50.0 if profile.has_ideal_profile else 100.0)
+
+    def availability_score(self, profile: JobProfile) -> np.ndarray:
+        if not profile.salary_min:
+            return np.full(len(self), 100.0)
+        within = np.isnan(self.salary) | (self.salary <= profile.salary_max)
+        return np.where(within, 100.0, 50.0)
+
+    def score(self, profile: JobProfile, weights: Dict[str, float],
+              now: Optional[datetime] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Pontuação total e breakdown por critério para todo o pool"""
+        breakdown = {
+            "skills": self.skills_score(profile),
+            "experience": self.experience_score(profile, now or datetime.now()),
+            "location": self.location_score(profile),
+            "behavioral": self.behavioral_score(profile),
+            "availability": self.availability_score(profile),
+        }
+        total = sum(breakdown[name] * weight for name, weight in weights.items())
+        return np.maximum(total, 0), breakdown
+
+    def top_k(self, totals: np.ndarray, k: int, exclude_rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Linhas das k maiores pontuações, em ordem decrescente"""
+        if exclude_rows is not None and len(exclude_rows):
+            totals = totals.copy()
+            totals[exclude_rows] = -np.inf
+        k = min(k, int(np.isfinite(totals).sum()))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64)
+        top = np.argpartition(-totals, k - 1)[:k]
+        return top[np.lexsort((top, -totals[top]))]
+
+
+class PoolMatcher:
+    def __init__(self):
+        self.ready = False
+        self.built_at: Optional[datetime] = None
+        self.pool = CandidatePool()
+        self.weights = ScoringService().weights
+
+    async def build(self, db: AsyncIOMotorDatabase):
+        self.pool = await CandidatePool.load(db)
+        self.built_at = datetime.now()
+        self.ready = True
+
+    async def match(self, db: AsyncIOMotorDatabase, job: Dict[str, Any], k: int,
+                    exclude_candidate_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Top-K do pool para a vaga: [{candidate_id, total_score, breakdown}]"""
+        pool = self.pool
+        profile = await job_profiles.get(db, job["id"])
+        totals, breakdown = pool.score(profile, self.weights)
+        exclude_rows = np.array([pool.rows[i] for i in exclude_candidate_ids or [] if i in pool.rows], dtype=np.int64)
+        return [
+            {
+                "candidate_id": pool.ids[row],
+                "total_score": round(float(totals[row]), 2),
+                "breakdown": {name: round(float(values[row]), 2) for name, values in breakdown.items()}
+            }
+            for row in pool.top_k(totals, k, exclude_rows)
+        ]
+
+    async def run_refresher(self, db: AsyncIOMotorDatabase, interval_seconds: int):
+        while True:
+            try:
+                await self.build(db)
+                logger.info(f"Pool de matching: {len(self.pool)} candidatos")
+            except Exception as e:
+                logger.error(f"Erro ao carregar pool de matching: {e}")
+            if interval_seconds <= 0 and self.ready:
+                return
+            await asyncio.sleep(interval_seconds if interval_seconds > 0 else 60)
+
+
+# Singleton global usado pela rota de matching
+pool_matcher = PoolMatcher()
@@ -5,6 +5,7 @@ Usa Emergent LLM Key para gerar análises detalhadas
 import os
 from typing import Dict, Any, List
 from emergentintegrations.llm.chat import LlmChat, UserMessage
+from utils.metrics import llm_timer
 
 
 class QuestionnaireAnalyzer:
@@ -23,7 +24,8 @@ class QuestionnaireAnalyzer:
             ).with_model("openai", "gpt-4o-mini")
             
             user_message = UserMessage(text=prompt)
-            response = await chat.send_message(user_message)
+            async with llm_timer("questionnaire_analyzer"):
+                response = await chat.send_message(user_message)
             
             return response.strip()
         except Exception as e:
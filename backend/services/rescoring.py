@@ -0,0 +1,169 @@
+"""
+Repontuação incremental dirigida por eventos
+
+As rotas que alteram entradas da pontuação avisam o rastreador:
+
+- candidato: cidade/estado, pretensão salarial, skills, experiências;
+- vaga: tipo de contratação, modalidade, cidade/estado, faixa salarial,
+  perfil ideal, skills exigidas;
+- candidatura: nova avaliação (critério comportamental).
+
+Os eventos são agrupados (debounce de RESCORING_DEBOUNCE_SECONDS sem novos
+eventos, no máximo RESCORING_MAX_DELAY_SECONDS após o primeiro) e
+coalescidos por entidade; no flush, as entidades são resolvidas para as
+candidaturas ativas afetadas com uma consulta $in e enviadas à fila de
+pontuação em lote. Assim a pontuação acompanha as alterações sem
+recálculo completo periódico.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from services.scoring import ScoringService, SCORING_BATCH_SIZE
+from services.scoring_queue import scoring_queue, SCORING_QUEUE_ENABLED
+
+logger = logging.getLogger(__name__)
+
+RESCORING_ENABLED = os.getenv("RESCORING_ENABLED", "true").lower() == "true"
+RESCORING_DEBOUNCE_SECONDS = float(os.getenv("RESCORING_DEBOUNCE_SECONDS", "2"))
+RESCORING_MAX_DELAY_SECONDS = float(os.getenv("RESCORING_MAX_DELAY_SECONDS", "10"))
+
+# Campos que entram na pontuação (alterações em outros campos não repontuam)
+CANDIDATE_SCORE_FIELDS = ("location_city", "location_state", "salary_expectation")
+JOB_SCORE_FIELDS = (
+    "employment_type", "work_mode", "location_city", "location_state", "salary_min", "salary_max", "ideal_profile"
+)
+
+
+def affects_score(fields: Iterable[str], old: Optional[Dict[str, Any]], changes: Dict[str, Any]) -> bool:
+    """True se alguma alteração muda um campo usado na pontuação"""
+    old = old or {}
+    return any(field in changes and changes[field] != old.get(field) for field in fields)
+
+
+class RescoreTracker:
+    def __init__(self, debounce_seconds: float = RESCORING_DEBOUNCE_SECONDS,
+                 max_delay_seconds: float = RESCORING_MAX_DELAY_SECONDS, enabled: bool = RESCORING_ENABLED):
+        # Desabilitado, os eventos são ignorados (nenhuma tarefa drena os conjuntos)
+        self.enabled = enabled
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self._candidates: Set[str] = set()
+        self._jobs: Set[str] = set()
+        self._applications: Set[str] = set()
+        self._event: Optional[asyncio.Event] = None
+        self._first_at: Optional[float] = None
+        self._last_at: Optional[float] = None
+        self.flushes = 0
+        self.rescored = 0
+
+    @property
+    def event(self) -> asyncio.Event:
+        if self._event is None:
+            self._event = asyncio.Event()
+        return self._event
+
+    # ---- eventos ----
+
+    def candidate_changed(self, candidate_id: str):
+        self._mark(self._candidates, candidate_id)
+
+    def job_changed(self, job_id: str):
+        self._mark(self._jobs, job_id)
+
+    def application_changed(self, application_id: str):
+        self._mark(self._applications, application_id)
+
+    def _mark(self, ids: Set[str], entity_id: str):
+        if not self.enabled:
+            return
+        ids.add(entity_id)
+        now = time.monotonic()
+        self._last_at = now
+        if self._first_at is None:
+            self._first_at = now
+        self.event.set()
+
+    # ---- flush ----
+
+    async def _wait_quiet(self):
+        """Espera debounce_seconds sem eventos, limitado a max_delay_seconds desde o primeiro"""
+        while True:
+            wake_at = min(self._last_at + self.debounce_seconds, self._first_at + self.max_delay_seconds)
+            remaining = wake_at - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(remaining)
+
+    async def affected_applications(self, db: AsyncIOMotorDatabase, candidate_ids: Iterable[str],
+                                    job_ids: Iterable[str], application_ids: Iterable[str]) -> List[str]:
+        """Candidaturas ativas que dependem das entidades alteradas"""
+        clauses = []
+        if candidate_ids:
+            clauses.append({"candidate_id": {"$in": list(candidate_ids)}})
+        if job_ids:
+            clauses.append({"job_id": {"$in": list(job_ids)}})
+        if application_ids:
+            clauses.append({"id": {"$in": list(application_ids)}})
+        if not clauses:
+            return []
+        return await db.applications.distinct("id", {"$or": clauses, "status": "active"})
+
+    async def flush(self, db: AsyncIOMotorDatabase) -> int:
+        """Resolve os eventos acumulados e agenda a repontuação; retorna quantas candidaturas"""
+        candidates, jobs, applications = self._candidates, self._jobs, self._applications
+        self._candidates, self._jobs, self._applications = set(), set(), set()
+        self._first_at = self._last_at = None
+        self.event.clear()
+
+        try:
+            application_ids = await self.affected_applications(db, candidates, jobs, applications)
+            if SCORING_QUEUE_ENABLED:
+                scoring_queue.enqueue(application_ids)
+            else:
+                scoring_service = ScoringService()
+                for start in range(0, len(application_ids), SCORING_BATCH_SIZE):
+                    await scoring_service.score_applications(application_ids[start:start + SCORING_BATCH_SIZE])
+        except Exception:
+            # Devolve os eventos ao rastreador: o próximo flush tenta de novo
+            self._restore(candidates, jobs, applications)
+            raise
+        self.flushes += 1
+        self.rescored += len(application_ids)
+        logger.debug(
+            f"Repontuação: {len(candidates)} candidatos, {len(jobs)} vagas, "
+            f"{len(applications)} candidaturas -> {len(application_ids)} candidaturas"
+        )
+        return len(application_ids)
+
+    def _restore(self, candidates: Set[str], jobs: Set[str], applications: Set[str]):
+        self._candidates |= candidates
+        self._jobs |= jobs
+        self._applications |= applications
+        if self._candidates or self._jobs or self._applications:
+            now = time.monotonic()
+            self._first_at = self._first_at or now
+            self._last_at = self._last_at or now
+            self.event.set()
+
+    async def run(self, db: AsyncIOMotorDatabase):
+        failures = 0
+        while True:
+            await self.event.wait()
+            await self._wait_quiet()
+            try:
+                await self.flush(db)
+                failures = 0
+            except Exception as e:
+                failures += 1
+                logger.error(f"Erro na repontuação incremental (eventos mantidos para nova tentativa): {e}")
+                # Backoff exponencial antes de tentar de novo (máx. 5 min)
+                await asyncio.sleep(min(max(self.debounce_seconds, 1) * 2 ** min(failures, 10), 300))
+
+
+# Singleton global usado pelas rotas
+rescore_tracker = RescoreTracker()
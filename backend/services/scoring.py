@@ -1,5 +1,41 @@
+"""
+Pontuação de aderência candidato x vaga
+
+Critérios (pesos em ScoringService.weights): skills exigidas pela vaga,
+anos de experiência, localização, perfil comportamental e pretensão
+salarial. A pontuação é calculada em lote: score_applications carrega
+todas as entradas do lote com poucas consultas $in (candidaturas,
+candidatos, skills dos candidatos, experiências e avaliações), parte dos
+perfis compilados das vagas (services/job_profiles.py, em cache), calcula
+cada critério vetorizado com NumPy e grava o resultado com um único
+bulk_write. calculate_score (uma candidatura) e
+score_job (todas as candidaturas da vaga) usam o mesmo caminho.
+
+A pontuação vive só na candidatura, em applications.scores
+({status, total, breakdown, updated_at}); scores.total é indexado com a
+vaga e o estágio, então filtros por pontuação mínima e ordenação por
+pontuação são varreduras de índice.
+"""
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+from pymongo import UpdateOne
+
 from server import db
-from typing import Dict, Any
+from services.job_profiles import JobProfile, job_profiles
+from utils.text_normalization import normalize_city, normalize_state
+
+SCORING_BATCH_SIZE = int(os.getenv("SCORING_BATCH_SIZE", "5000"))
+
+DAYS_PER_YEAR = 365.25
+
+CANDIDATE_PROJECTION = {"_id": 0, "id": 1, "location_city": 1, "location_state": 1, "salary_expectation": 1}
+
+
+def _to_datetime64(values: List[datetime]) -> np.ndarray:
+    return np.array([v.replace(tzinfo=None) for v in values], dtype="datetime64[us]")
 
 
 class ScoringService:
@@ -11,124 +47,174 @@ class ScoringService:
             "behavioral": 0.20,
             "availability": 0.10
         }
-    
+
     async def calculate_score(self, application_id: str) -> Dict[str, Any]:
-        app = await db.applications.find_one({"id": application_id})
-        if not app:
+        """Pontuação de uma candidatura, sem gravar"""
+        results = await self.score_applications([application_id], write=False)
+        if application_id not in results:
             raise ValueError("Application not found")
-        
-        job = await db.jobs.find_one({"id": app["job_id"]})
-        candidate = await db.candidates.find_one({"id": app["candidate_id"]})
-        
-        skills_score = await self._calculate_skills_score(app, job, candidate)
-        experience_score = await self._calculate_experience_score(app, job, candidate)
-        location_score = await self._calculate_location_score(job, candidate)
-        behavioral_score = await self._calculate_behavioral_score(app, job)
-        availability_score = await self._calculate_availability_score(job, candidate)
-        
-        total_score = (
-            skills_score * self.weights["skills"] +
-            experience_score * self.weights["experience"] +
-            location_score * self.weights["location"] +
-            behavioral_score * self.weights["behavioral"] +
-            availability_score * self.weights["availability"]
-        )
-        
-        total_score = max(0, total_score)
-        
-        return {
-            "total_score": round(total_score, 2),
-            "breakdown": {
-                "skills": round(skills_score, 2),
-                "experience": round(experience_score, 2),
-                "location": round(location_score, 2),
-                "behavioral": round(behavioral_score, 2),
-                "availability": round(availability_score, 2)
+        return results[application_id]
+
+    async def score_job(self, job_id: str, batch_size: int = SCORING_BATCH_SIZE) -> int:
+        """Recalcula e grava todas as candidaturas da vaga; retorna quantas foram pontuadas"""
+        application_ids = await db.applications.distinct("id", {"job_id": job_id})
+        scored = 0
+        for start in range(0, len(application_ids), batch_size):
+            scored += len(await self.score_applications(application_ids[start:start + batch_size]))
+        return scored
+
+    async def score_applications(self, application_ids: Sequence[str], write: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Pontua um lote de candidaturas: {application_id: {total_score, breakdown}}.
+
+        Candidaturas cuja vaga ou candidato não existe mais são ignoradas.
+        Com write=True grava applications.scores (status "done").
+        """
+        apps = await db.applications.find(
+            {"id": {"$in": list(application_ids)}}, {"_id": 0, "id": 1, "job_id": 1, "candidate_id": 1}
+        ).to_list(None)
+        if not apps:
+            return {}
+
+        profiles = await job_profiles.get_many(db, {a["job_id"] for a in apps})
+        candidate_ids = list({a["candidate_id"] for a in apps})
+        candidates = {c["id"]: c async for c in db.candidates.find({"id": {"$in": candidate_ids}}, CANDIDATE_PROJECTION)}
+        apps = [a for a in apps if a["job_id"] in profiles and a["candidate_id"] in candidates]
+        if not apps:
+            return {}
+
+        # Candidatos alinhados por linha; cada candidatura aponta para a linha do seu candidato
+        candidate_ids = list({a["candidate_id"] for a in apps})
+        candidate_rows = {candidate_id: row for row, candidate_id in enumerate(candidate_ids)}
+        app_rows = np.array([candidate_rows[a["candidate_id"]] for a in apps], dtype=np.int64)
+
+        required_skill_ids = {skill_id for profile in profiles.values() for skill_id in profile.skill_ids}
+        skill_levels = await self._skill_levels(candidate_ids, required_skill_ids)
+        experience_years, has_experience = await self._experience(candidate_ids)
+        assessed = await self._assessed_applications([a["id"] for a in apps if profiles[a["job_id"]].has_ideal_profile])
+
+        city = np.array([normalize_city(candidates[c].get("location_city")) for c in candidate_ids], dtype=object)
+        state = np.array([normalize_state(candidates[c].get("location_state")) for c in candidate_ids], dtype=object)
+        salary = np.array([candidates[c].get("salary_expectation") or np.nan for c in candidate_ids], dtype=np.float64)
+        has_assessment = np.array([a["id"] in assessed for a in apps], dtype=bool)
+
+        breakdown = {name: np.zeros(len(apps), dtype=np.float64) for name in self.weights}
+        job_of_app = np.array([a["job_id"] for a in apps], dtype=object)
+        for job_id in {a["job_id"] for a in apps}:
+            profile = profiles[job_id]
+            mask = job_of_app == job_id
+            rows = app_rows[mask]
+            breakdown["skills"][mask] = self._skills_score(profile, skill_levels, rows)
+            breakdown["experience"][mask] = self._experience_score(profile, experience_years[rows], has_experience[rows])
+            breakdown["location"][mask] = self._location_score(profile, city[rows], state[rows])
+            breakdown["behavioral"][mask] = self._behavioral_score(profile, has_assessment[mask])
+            breakdown["availability"][mask] = self._availability_score(profile, salary[rows])
+
+        total = np.maximum(sum(breakdown[name] * weight for name, weight in self.weights.items()), 0)
+        results = {
+            app["id"]: {
+                "total_score": round(float(total[i]), 2),
+                "breakdown": {name: round(float(values[i]), 2) for name, values in breakdown.items()}
             }
+            for i, app in enumerate(apps)
         }
-    
-    async def _calculate_skills_score(self, app, job, candidate) -> float:
-        required_skills = await db.job_required_skills.find({"job_id": job["id"]}).to_list(100)
-        if not required_skills:
-            return 100.0
-        
-        candidate_skills = await db.candidate_skills.find({"candidate_id": candidate["id"]}).to_list(100)
-        candidate_skill_map = {cs["skill_id"]: cs for cs in candidate_skills}
-        
-        score = 100.0
-        matched = 0
-        must_have_failed = False
-        
-        for req in required_skills:
-            if req["skill_id"] in candidate_skill_map:
-                cand_skill = candidate_skill_map[req["skill_id"]]
-                if cand_skill["level"] >= req["min_level"]:
-                    matched += 1
-                elif req["must_have"]:
-                    must_have_failed = True
-            elif req["must_have"]:
-                must_have_failed = True
-        
-        if must_have_failed:
-            score -= 20
-        
-        if required_skills:
-            match_ratio = matched / len(required_skills)
-            score = score * match_ratio
-        
-        return max(0, score)
-    
-    async def _calculate_experience_score(self, app, job, candidate) -> float:
-        experiences = await db.experiences.find({"candidate_id": candidate["id"]}).to_list(100)
-        
-        if not experiences:
-            return 50.0
-        
-        total_years = 0
-        for exp in experiences:
-            start = exp["start_date"]
-            end = exp["end_date"] if exp["end_date"] else datetime.now()
-            years = (end - start).days / 365.25
-            total_years += years
-        
-        required_years = 2
-        if job.get("employment_type") and "senior" in job["employment_type"].lower():
-            required_years = 5
-        elif job.get("employment_type") and "pleno" in job["employment_type"].lower():
-            required_years = 3
-        
-        ratio = min(total_years / required_years, 1.0) if required_years > 0 else 1.0
-        return ratio * 100
-    
-    async def _calculate_location_score(self, job, candidate) -> float:
-        if job["work_mode"] == "remoto":
-            return 100.0
-        
-        if candidate.get("location_city") == job.get("location_city"):
-            return 100.0
-        elif candidate.get("location_state") == job.get("location_state"):
-            return 70.0
-        else:
-            return 40.0
-    
-    async def _calculate_behavioral_score(self, app, job) -> float:
-        if not job.get("ideal_profile"):
-            return 100.0
-        
-        assessments = await db.assessments.find({"application_id": app["id"]}).to_list(100)
-        if not assessments:
-            return 50.0
-        
-        return 75.0
-    
-    async def _calculate_availability_score(self, job, candidate) -> float:
-        if not job.get("salary_min") or not candidate.get("salary_expectation"):
-            return 100.0
-        
-        if candidate["salary_expectation"] <= job.get("salary_max", float('inf')):
-            return 100.0
-        else:
-            return 50.0
+        if write:
+            await self._write(results)
+        return results
 
+    # ---- carga das entradas ----
 
-from datetime import datetime
+    async def _skill_levels(self, candidate_ids: List[str], skill_ids: set) -> Dict[str, np.ndarray]:
+        """
+        skill_id exigida -> nível de cada candidato (0 = não possui)
+
+        Sempre do banco (um $in): o skill_index é por processo e pode estar
+        defasado em relação a escritas de outro worker, e a pontuação gravada
+        não seria corrigida depois.
+        """
+        levels = {skill_id: np.zeros(len(candidate_ids), dtype=np.int16) for skill_id in skill_ids}
+        if not levels:
+            return levels
+        candidate_rows = {candidate_id: row for row, candidate_id in enumerate(candidate_ids)}
+        async for cs in db.candidate_skills.find(
+            {"candidate_id": {"$in": candidate_ids}, "skill_id": {"$in": list(skill_ids)}},
+            {"_id": 0, "candidate_id": 1, "skill_id": 1, "level": 1}
+        ):
+            row = candidate_rows[cs["candidate_id"]]
+            levels[cs["skill_id"]][row] = max(levels[cs["skill_id"]][row], cs["level"])
+        return levels
+
+    async def _experience(self, candidate_ids: List[str]):
+        """(anos de experiência somados, tem alguma experiência) por candidato"""
+        candidate_rows = {candidate_id: row for row, candidate_id in enumerate(candidate_ids)}
+        rows, starts, ends = [], [], []
+        now = datetime.now()
+        async for exp in db.experiences.find(
+            {"candidate_id": {"$in": candidate_ids}}, {"_id": 0, "candidate_id": 1, "start_date": 1, "end_date": 1}
+        ):
+            rows.append(candidate_rows[exp["candidate_id"]])
+            starts.append(exp["start_date"])
+            ends.append(exp.get("end_date") or now)
+        if not rows:
+            return np.zeros(len(candidate_ids)), np.zeros(len(candidate_ids), dtype=bool)
+        # Dias inteiros por experiência (como timedelta.days)
+        days = (_to_datetime64(ends) - _to_datetime64(starts)) // np.timedelta64(1, "D")
+        rows = np.array(rows, dtype=np.int64)
+        years = np.bincount(rows, weights=days / DAYS_PER_YEAR, minlength=len(candidate_ids))
+        return years, np.bincount(rows, minlength=len(candidate_ids)) > 0
+
+    async def _assessed_applications(self, application_ids: List[str]) -> set:
+        """Candidaturas (entre as informadas) que já têm avaliação"""
+        if not application_ids:
+            return set()
+        return set(await db.assessments.distinct("application_id", {"application_id": {"$in": application_ids}}))
+
+    # ---- critérios vetorizados ----
+
+    def _skills_score(self, profile: JobProfile, skill_levels: Dict[str, np.ndarray], rows: np.ndarray) -> np.ndarray:
+        if not profile.skill_ids:
+            return np.full(len(rows), 100.0)
+        # Matriz candidatura x skill exigida, colunas na ordem densa do perfil
+        levels = np.stack([skill_levels[skill_id][rows] for skill_id in profile.skill_ids], axis=1)
+        meets = levels >= profile.min_levels
+        # Qualquer must_have não atendido tira 20 pontos antes da proporção de skills atendidas
+        must_have_failed = (~meets & profile.must_have).any(axis=1)
+        score = np.where(must_have_failed, 80.0, 100.0) * (meets.sum(axis=1) / len(profile.skill_ids))
+        return np.maximum(score, 0)
+
+    def _experience_score(self, profile: JobProfile, years: np.ndarray, has_experience: np.ndarray) -> np.ndarray:
+        ratio = np.minimum(years / profile.required_years, 1.0)
+        return np.where(has_experience, ratio * 100, 50.0)
+
+    def _location_score(self, profile: JobProfile, city: np.ndarray, state: np.ndarray) -> np.ndarray:
+        if profile.remote:
+            return np.full(len(city), 100.0)
+        # Comparação normalizada: "São Paulo - SP" e "sao paulo" são a mesma cidade
+        same_city = city == profile.city
+        same_state = state == profile.state
+        return np.where(same_city, 100.0, np.where(same_state, 70.0, 40.0))
+
+    def _behavioral_score(self, profile: JobProfile, has_assessment: np.ndarray) -> np.ndarray:
+        if not profile.has_ideal_profile:
+            return np.full(len(has_assessment), 100.0)
+        return np.where(has_assessment, 75.0, 50.0)
+
+    def _availability_score(self, profile: JobProfile, salary: np.ndarray) -> np.ndarray:
+        if not profile.salary_min:
+            return np.full(len(salary), 100.0)
+        return np.where(np.isnan(salary) | (salary <= profile.salary_max), 100.0, 50.0)
+
+    # ---- gravação ----
+
+    async def _write(self, results: Dict[str, Dict[str, Any]]):
+        """applications.scores em um único bulk_write (remove o stage_score legado)"""
+        if not results:
+            return
+        now = datetime.now()
+        await db.applications.bulk_write([
+            UpdateOne({"id": app_id}, {
+                "$set": {"scores": {"status": "done", "total": r["total_score"], "breakdown": r["breakdown"], "updated_at": now}},
+                "$unset": {"stage_score": ""}
+            })
+            for app_id, r in results.items()
+        ], ordered=False)
@@ -0,0 +1,153 @@
+"""
+Fila de pontuação de candidaturas em background (no próprio processo)
+
+create_application grava a candidatura com scores.status = "pending",
+enfileira o id e responde sem esperar a pontuação. Workers (concorrência
+limitada por SCORING_QUEUE_CONCURRENCY) drenam a fila em lotes e pontuam
+com ScoringService.score_applications, que grava scores.status = "done".
+Falhas são repetidas com backoff exponencial; esgotadas as tentativas, as
+candidaturas ficam com scores.status = "failed". Candidaturas que o
+ScoringService ignora (vaga ou candidato não existe mais) também ficam
+"failed", para não continuarem "pending" para sempre. Erros (inclusive ao
+gravar "failed" durante uma queda do Mongo) são registrados sem derrubar o
+worker, e run() reinicia qualquer worker que termine.
+
+A fila é só em memória: no startup, candidaturas que ficaram "pending"
+(processo reiniciado antes de pontuar) são reenfileiradas.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Iterable, List, Optional, Set
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from services.scoring import ScoringService
+
+logger = logging.getLogger(__name__)
+
+SCORING_QUEUE_ENABLED = os.getenv("SCORING_QUEUE_ENABLED", "true").lower() == "true"
+SCORING_QUEUE_CONCURRENCY = int(os.getenv("SCORING_QUEUE_CONCURRENCY", "2"))
+SCORING_QUEUE_BATCH_SIZE = int(os.getenv("SCORING_QUEUE_BATCH_SIZE", "200"))
+SCORING_QUEUE_MAX_RETRIES = int(os.getenv("SCORING_QUEUE_MAX_RETRIES", "3"))
+SCORING_QUEUE_RETRY_SECONDS = float(os.getenv("SCORING_QUEUE_RETRY_SECONDS", "2"))
+
+
+class ScoringQueue:
+    def __init__(
+        self,
+        concurrency: int = SCORING_QUEUE_CONCURRENCY,
+        batch_size: int = SCORING_QUEUE_BATCH_SIZE,
+        max_retries: int = SCORING_QUEUE_MAX_RETRIES,
+        retry_seconds: float = SCORING_QUEUE_RETRY_SECONDS
+    ):
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_seconds = retry_seconds
+        self.scoring_service = ScoringService()
+        self._queue: Optional[asyncio.Queue] = None
+        # Ids na fila (evita enfileirar a mesma candidatura duas vezes)
+        self._queued: Set[str] = set()
+        self.scored = 0
+        self.failed = 0
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        return self._queue
+
+    @property
+    def depth(self) -> int:
+        return len(self._queued)
+
+    def enqueue(self, application_ids: Iterable[str]):
+        """Agenda a pontuação (não bloqueia; ids já na fila são ignorados)"""
+        for application_id in application_ids:
+            if application_id not in self._queued:
+                self._queued.add(application_id)
+                self.queue.put_nowait(application_id)
+
+    async def _next_batch(self) -> List[str]:
+        batch = [await self.queue.get()]
+        while len(batch) < self.batch_size and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        # Saem do conjunto antes de pontuar: uma alteração durante o cálculo reenfileira
+        self._queued.difference_update(batch)
+        return batch
+
+    async def _mark_failed(self, db: AsyncIOMotorDatabase, application_ids: List[str]):
+        self.failed += len(application_ids)
+        try:
+            await db.applications.update_many(
+                {"id": {"$in": application_ids}, "scores.status": "pending"},
+                {"$set": {"scores.status": "failed", "scores.updated_at": datetime.now()}}
+            )
+        except Exception as e:
+            # Continuam "pending" e são reenfileiradas no próximo startup
+            logger.error(f"Erro ao marcar {len(application_ids)} candidaturas como falha: {e}")
+
+    async def _score(self, db: AsyncIOMotorDatabase, batch: List[str]):
+        for attempt in range(self.max_retries + 1):
+            try:
+                results = await self.scoring_service.score_applications(batch)
+                break
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error(f"Falha ao pontuar {len(batch)} candidaturas após {attempt + 1} tentativas: {e}")
+                    await self._mark_failed(db, batch)
+                    return
+                delay = self.retry_seconds * 2 ** attempt
+                logger.warning(f"Erro ao pontuar lote (tentativa {attempt + 1}), nova tentativa em {delay}s: {e}")
+                await asyncio.sleep(delay)
+
+        self.scored += len(results)
+        skipped = [application_id for application_id in batch if application_id not in results]
+        if skipped:
+            logger.warning(f"{len(skipped)} candidaturas sem vaga ou candidato; marcadas como falha")
+            await self._mark_failed(db, skipped)
+
+    async def _worker(self, db: AsyncIOMotorDatabase):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._score(db, batch)
+            except Exception as e:
+                # Um lote com erro inesperado não pode derrubar o worker
+                logger.error(f"Erro inesperado no worker de pontuação ({len(batch)} candidaturas): {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def run(self, db: AsyncIOMotorDatabase):
+        """Reenfileira pendentes e supervisiona os workers até ser cancelado"""
+        try:
+            pending = await db.applications.distinct("id", {"scores.status": "pending"})
+            if pending:
+                logger.info(f"Fila de pontuação: {len(pending)} candidaturas pendentes reenfileiradas")
+                self.enqueue(pending)
+        except Exception as e:
+            logger.error(f"Erro ao buscar candidaturas pendentes de pontuação: {e}")
+
+        workers = {asyncio.create_task(self._worker(db)) for _ in range(self.concurrency)}
+        try:
+            while True:
+                done, workers = await asyncio.wait(workers, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = None if task.cancelled() else task.exception()
+                    logger.error(f"Worker de pontuação encerrou ({error!r}); reiniciando")
+                    workers.add(asyncio.create_task(self._worker(db)))
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def join(self):
+        """Aguarda a fila esvaziar (scripts e testes)"""
+        await self.queue.join()
+
+
+# Singleton global usado pelas rotas
+scoring_queue = ScoringQueue()
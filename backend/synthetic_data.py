@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+Gerador determinístico de dados sintéticos em escala
+
+Gera organizações, usuários, papéis, candidatos (skills, experiências,
+formação), vagas com skills exigidas, candidaturas com stage_history
+coerente, entrevistas e notificações, usando as classes de models.py.
+
+- Determinístico: a mesma seed (e --base-date) produz exatamente os mesmos
+  documentos, inclusive ids; cada lote de candidatos usa um RNG próprio
+  derivado da seed, então a saída não depende da ordem de escrita.
+- Em escala: os candidatos são gerados em lotes (streaming, memória
+  constante) e gravados com insert_many por vários escritores em paralelo.
+
+Uso:
+    python synthetic_data.py --scale medium --drop
+    python synthetic_data.py --candidates 2000000 --tenants 200 --writers 8 --drop
+    python synthetic_data.py --scale small --seed 7 --db-name ciatos_synthetic
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+from models import (
+    Organization, User, UserOrgRole, Candidate, Skill, CandidateSkill, Experience, Education,
+    Job, JobRequiredSkill, Application, Interview, Notification
+)
+from utils.auth import hash_password
+from utils.candidate_search import build_search_fields
+from utils.search_fields import build_job_search_fields, build_skill_search_fields
+
+load_dotenv(Path(__file__).parent / '.env')
+
+DEFAULT_PASSWORD = "synthetic123"
+
+SCALES = {
+    "small": {"tenants": 3, "jobs_per_tenant": 5, "recruiters_per_tenant": 1, "candidates": 300, "applications_per_candidate": 3},
+    "medium": {"tenants": 20, "jobs_per_tenant": 25, "recruiters_per_tenant": 2, "candidates": 20000, "applications_per_candidate": 4},
+    "large": {"tenants": 100, "jobs_per_tenant": 50, "recruiters_per_tenant": 3, "candidates": 500000, "applications_per_candidate": 5},
+    "xlarge": {"tenants": 300, "jobs_per_tenant": 60, "recruiters_per_tenant": 4, "candidates": 2000000, "applications_per_candidate": 5},
+}
+
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela", "João",
+               "Juliana", "Lucas", "Mariana", "Nicolas", "Patrícia", "Rafael", "Sofia", "Thiago", "Vitória", "Caio",
+               "Letícia", "Matheus", "Beatriz", "Gustavo", "Larissa", "Pedro", "Camila", "Rodrigo", "Fernanda", "André"]
+LAST_NAMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+              "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa",
+              "Araújo", "Conceição", "Nascimento", "Mendes", "Cardoso"]
+LOCATIONS = [("São Paulo", "SP", ["Pinheiros", "Moema", "Vila Mariana", "Tatuapé", "Santana"]),
+             ("Rio de Janeiro", "RJ", ["Copacabana", "Tijuca", "Botafogo", "Barra da Tijuca"]),
+             ("Belo Horizonte", "MG", ["Savassi", "Funcionários", "Pampulha"]),
+             ("Curitiba", "PR", ["Batel", "Água Verde", "Centro"]),
+             ("Porto Alegre", "RS", ["Moinhos de Vento", "Menino Deus", "Centro Histórico"]),
+             ("Recife", "PE", ["Boa Viagem", "Casa Forte"]),
+             ("Salvador", "BA", ["Barra", "Pituba"]),
+             ("Campinas", "SP", ["Cambuí", "Taquaral"]),
+             ("Florianópolis", "SC", ["Centro", "Trindade"]),
+             ("Goiânia", "GO", ["Setor Bueno", "Setor Marista"])]
+SKILL_CATALOG = {
+    "tecnologia": ["Python", "JavaScript", "React", "SQL", "Java", "Node.js", "AWS", "Docker", "Power BI"],
+    "negócios": ["Excel", "Vendas", "Negociação", "Gestão de Projetos", "Marketing Digital", "Contabilidade"],
+    "comportamental": ["Liderança", "Comunicação", "Trabalho em Equipe", "Atendimento ao Cliente"],
+    "idiomas": ["Inglês", "Espanhol"],
+}
+JOB_TITLES = ["Desenvolvedor Full Stack", "Analista de Dados", "Vendedor Externo", "Assistente Administrativo",
+              "Analista Financeiro", "Gerente de Projetos", "Designer UX/UI", "Analista de Marketing",
+              "Atendente de SAC", "Coordenador de Logística", "Analista de RH", "Engenheiro de Software"]
+COMPANIES = ["Grupo Horizonte", "Loja Central", "Banco Popular", "Construtora Atlas", "Rede Saúde Mais",
+             "Agro Vale", "Transportes Rápido", "Escola Nova Era", "Mercado Bom Preço", "Indústria Prisma"]
+EDUCATION = [("ensino_medio", None, None), ("graduacao", "Administração", "Administração de Empresas"),
+             ("graduacao", "Engenharia", "Engenharia de Produção"), ("graduacao", "Tecnologia", "Ciência da Computação"),
+             ("pos_graduacao", "Gestão", "MBA em Gestão Empresarial"), ("mestrado", "Tecnologia", "Mestrado em Computação"),
+             ("graduacao", "Comunicação", "Publicidade e Propaganda"), ("doutorado", "Economia", "Doutorado em Economia")]
+INSTITUTIONS = ["USP", "UNICAMP", "UFMG", "UFRJ", "PUC-SP", "Mackenzie", "UFPR", "UFRGS", "FGV", "UNIP"]
+
+# Progressão do pipeline e probabilidade de o candidato parar em cada estágio
+PIPELINE = ["submitted", "screening", "recruiter_interview", "shortlisted", "client_interview", "offer", "hired"]
+STOP_WEIGHTS = [30, 25, 15, 10, 8, 5, 7]
+INTERVIEW_STAGES = {"recruiter_interview": "recruiter", "client_interview": "client"}
+
+
+class SyntheticDataGenerator:
+    def __init__(
+        self,
+        seed: int = 42,
+        base_date: Optional[datetime] = None,
+        tenants: int = 3,
+        jobs_per_tenant: int = 5,
+        recruiters_per_tenant: int = 1,
+        candidates: int = 300,
+        applications_per_candidate: int = 3,
+        chunk_size: int = 1000,
+        password_hash: Optional[str] = None
+    ):
+        self.seed = seed
+        self.base_date = base_date or datetime(2025, 1, 1, tzinfo=timezone.utc)
+        self.tenants = tenants
+        self.jobs_per_tenant = jobs_per_tenant
+        self.recruiters_per_tenant = recruiters_per_tenant
+        self.candidates = candidates
+        self.applications_per_candidate = applications_per_candidate
+        self.chunk_size = chunk_size
+        # Um único bcrypt para todos os usuários: hash por usuário tornaria a geração inviável
+        self.password_hash = password_hash or hash_password(DEFAULT_PASSWORD)
+
+        self.skills: List[Skill] = []
+        self.jobs: List[Job] = []
+        self.required_skills: Dict[str, List[JobRequiredSkill]] = {}
+        self.recruiters_by_tenant: Dict[str, List[str]] = {}
+        self.candidates_org: Optional[Organization] = None
+
+    # Utilitários determinísticos
+
+    def rng(self, *parts) -> random.Random:
+        return random.Random(":".join(str(p) for p in (self.seed,) + parts))
+
+    @staticmethod
+    def uid(rng: random.Random) -> str:
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    def at(self, days: float) -> datetime:
+        return self.base_date + timedelta(days=days)
+
+    @staticmethod
+    def recruiter_email(tenant: int, index: int) -> str:
+        return f"recrutador{tenant}.{index}@synthetic.ciatos.com"
+
+    @staticmethod
+    def client_email(tenant: int) -> str:
+        return f"cliente{tenant}@synthetic.ciatos.com"
+
+    @staticmethod
+    def candidate_email(index: int) -> str:
+        return f"candidato{index}@synthetic.ciatos.com"
+
+    # Dados de referência (pequenos, mantidos em memória)
+
+    def reference_data(self) -> Dict[str, List[Dict[str, Any]]]:
+        rng = self.rng("reference")
+        docs: Dict[str, List[Any]] = {k: [] for k in ("organizations", "users", "user_org_roles", "skills", "jobs", "job_required_skills")}
+
+        agency = Organization(id=self.uid(rng), name="Ciatos Recrutamento", org_type="agency", created_at=self.base_date, updated_at=self.base_date)
+        self.candidates_org = Organization(id=self.uid(rng), name="Candidatos", org_type="agency", created_at=self.base_date, updated_at=self.base_date)
+        admin = self._user(rng, "admin@synthetic.ciatos.com", "Admin Sintético", 0)
+        docs["organizations"] += [agency, self.candidates_org]
+        docs["users"].append(admin)
+        docs["user_org_roles"].append(UserOrgRole(id=self.uid(rng), user_id=admin.id, organization_id=agency.id, role="admin", created_at=self.base_date))
+
+        for category, names in SKILL_CATALOG.items():
+            for name in names:
+                self.skills.append(Skill(id=self.uid(rng), name=name, category=category, created_at=self.base_date))
+        docs["skills"] += self.skills
+
+        for t in range(self.tenants):
+            created = self.at(rng.uniform(0, 30))
+            org = Organization(id=self.uid(rng), name=f"{rng.choice(COMPANIES)} {t}", org_type="client",
+                               tax_id=f"{rng.randint(10**13, 10**14 - 1)}", created_at=created, updated_at=created)
+            docs["organizations"].append(org)
+
+            recruiter_ids = []
+            for r in range(self.recruiters_per_tenant):
+                recruiter = self._user(rng, self.recruiter_email(t, r), self._name(rng), rng.uniform(0, 30))
+                docs["users"].append(recruiter)
+                docs["user_org_roles"].append(UserOrgRole(id=self.uid(rng), user_id=recruiter.id, organization_id=org.id, role="recruiter", created_at=created))
+                recruiter_ids.append(recruiter.id)
+            self.recruiters_by_tenant[org.id] = recruiter_ids
+
+            client_user = self._user(rng, self.client_email(t), self._name(rng), rng.uniform(0, 30))
+            docs["users"].append(client_user)
+            docs["user_org_roles"].append(UserOrgRole(id=self.uid(rng), user_id=client_user.id, organization_id=org.id, role="client", created_at=created))
+
+            for _ in range(self.jobs_per_tenant):
+                city, state, _ = rng.choice(LOCATIONS)
+                job_created = self.at(rng.uniform(30, 300))
+                salary_min = rng.randrange(1500, 15000, 100)
+                status = rng.choices(["published", "in_review", "paused", "closed", "draft"], [60, 10, 8, 15, 7])[0]
+                job = Job(
+                    id=self.uid(rng), organization_id=org.id, title=rng.choice(JOB_TITLES),
+                    description="Vaga gerada pelo gerador de dados sintéticos.",
+                    employment_type=rng.choice(["CLT", "PJ", "Estágio"]),
+                    location_city=city, location_state=state, work_mode=rng.choice(["presencial", "hibrido", "remoto"]),
+                    salary_min=salary_min, salary_max=salary_min + rng.randrange(500, 6000, 100), status=status,
+                    recruitment_stage="contratacao" if status == "closed" else rng.choice(["cadastro", "triagem", "entrevistas", "selecao", "envio_cliente"]),
+                    blind_review=rng.random() < 0.1, created_by=rng.choice(recruiter_ids),
+                    created_at=job_created, updated_at=job_created
+                )
+                self.jobs.append(job)
+                required = [
+                    JobRequiredSkill(id=self.uid(rng), job_id=job.id, skill_id=skill.id, must_have=rng.random() < 0.35,
+                                     min_level=rng.randint(1, 4), created_at=job_created)
+                    for skill in rng.sample(self.skills, rng.randint(2, 5))
+                ]
+                self.required_skills[job.id] = required
+                docs["jobs"].append(job)
+                docs["job_required_skills"] += required
+
+        reference = {collection: [m.model_dump() for m in models] for collection, models in docs.items()}
+        for doc in reference["jobs"]:
+            doc["search"] = build_job_search_fields(doc)
+        for doc in reference["skills"]:
+            doc["search"] = build_skill_search_fields(doc["name"])
+        return reference
+
+    # Candidatos e dados dependentes, em lotes
+
+    def candidate_chunks(self) -> Iterator[Dict[str, List[Dict[str, Any]]]]:
+        if not self.jobs:
+            raise RuntimeError("reference_data() deve ser chamado antes de candidate_chunks()")
+        for chunk_index, start in enumerate(range(0, self.candidates, self.chunk_size)):
+            yield self.candidate_chunk(chunk_index, start, min(start + self.chunk_size, self.candidates))
+
+    def candidate_chunk(self, chunk_index: int, start: int, end: int) -> Dict[str, List[Dict[str, Any]]]:
+        rng = self.rng("candidates", chunk_index)
+        docs: Dict[str, List[Any]] = {k: [] for k in (
+            "users", "user_org_roles", "candidates", "candidate_skills", "experiences",
+            "educations", "applications", "interviews", "notifications"
+        )}
+
+        for index in range(start, end):
+            signup_day = rng.uniform(0, 600)
+            user = self._user(rng, self.candidate_email(index), self._name(rng), signup_day)
+            docs["users"].append(user)
+            docs["user_org_roles"].append(UserOrgRole(id=self.uid(rng), user_id=user.id, organization_id=self.candidates_org.id,
+                                                      role="candidate", created_at=user.created_at))
+
+            city, state, neighborhoods = rng.choice(LOCATIONS)
+            level, area, course = rng.choice(EDUCATION)
+            candidate = Candidate(
+                id=self.uid(rng), user_id=user.id, email=user.email,
+                phone=f"({rng.randint(11, 99)}) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+                birthdate=self.base_date - timedelta(days=365.25 * rng.uniform(18, 62)),
+                location_city=city, location_state=state, location_neighborhood=rng.choice(neighborhoods),
+                address_zip_code=f"{rng.randint(10000, 99999)}-{rng.randint(100, 999)}",
+                resume_url=f"/uploads/resumes/{index}.pdf", resume_filename=f"curriculo_{index}.pdf",
+                education_level=level, education_area=area, education_course=course,
+                education_institution=rng.choice(INSTITUTIONS) if area else None,
+                salary_expectation=float(rng.randrange(1500, 20000, 100)),
+                availability=rng.choice(["Imediato", "15 dias", "30 dias"]),
+                visibility=rng.choices(["pool", "private"], [80, 20])[0],
+                professional_summary=f"Profissional de {area or 'nível médio'} em {city}.",
+                created_at=user.created_at, updated_at=user.created_at
+            )
+            docs["candidates"].append(candidate)
+
+            for skill in rng.sample(self.skills, rng.randint(2, 8)):
+                docs["candidate_skills"].append(CandidateSkill(id=self.uid(rng), candidate_id=candidate.id, skill_id=skill.id,
+                                                               level=rng.randint(1, 5), years=round(rng.uniform(0, 12), 1),
+                                                               created_at=user.created_at))
+
+            career_start = candidate.birthdate + timedelta(days=365.25 * rng.uniform(18, 24))
+            for e in range(rng.randint(0, 4)):
+                started = career_start + timedelta(days=e * rng.uniform(300, 900))
+                is_current = e == 0 and rng.random() < 0.5
+                docs["experiences"].append(Experience(
+                    id=self.uid(rng), candidate_id=candidate.id, company=rng.choice(COMPANIES), title=rng.choice(JOB_TITLES),
+                    start_date=started, end_date=None if is_current else started + timedelta(days=rng.uniform(120, 900)),
+                    is_current=is_current, created_at=user.created_at
+                ))
+            if area:
+                start_year = career_start.year
+                docs["educations"].append(Education(id=self.uid(rng), candidate_id=candidate.id, institution=candidate.education_institution,
+                                                    degree=level, field=area, start_year=start_year, end_year=start_year + 4,
+                                                    created_at=user.created_at))
+
+            applied_jobs = rng.sample(self.jobs, min(self.applications_per_candidate, len(self.jobs)))
+            for job in applied_jobs:
+                self._application(rng, docs, user, candidate, job)
+
+        chunk = {collection: [m.model_dump() for m in models] for collection, models in docs.items()}
+        users_by_id = {u["id"]: u for u in chunk["users"]}
+        for doc in chunk["candidates"]:
+            doc["search"] = build_search_fields(doc, users_by_id.get(doc["user_id"]))
+        return chunk
+
+    def _application(self, rng: random.Random, docs: Dict[str, List[Any]], user: User, candidate: Candidate, job: Job):
+        recruiters = self.recruiters_by_tenant[job.organization_id]
+        applied_at = max(job.created_at, user.created_at) + timedelta(days=rng.uniform(0, 20))
+
+        # Caminhada pelo pipeline; reprovação/desistência podem encerrar em qualquer estágio
+        stop = rng.choices(range(len(PIPELINE)), STOP_WEIGHTS)[0]
+        ending = rng.choices([None, "rejected", "withdrawn"], [60, 32, 8])[0] if PIPELINE[stop] != "hired" else None
+        history = [{"from": None, "to": "submitted", "changedBy": user.id, "changedAt": applied_at.isoformat(), "note": "Candidatura recebida"}]
+        changed_at = applied_at
+        path = PIPELINE[1:stop + 1] + ([ending] if ending else [])
+        for previous, stage in zip(PIPELINE[:stop] + ([PIPELINE[stop]] if ending else []), path):
+            changed_at += timedelta(days=rng.uniform(0.5, 7))
+            note = None
+            if stage == "rejected":
+                note = rng.choice(["Perfil não aderente", "Pretensão salarial acima", "Sem retorno do candidato"])
+            elif stage == "withdrawn":
+                note = "Candidato desistiu do processo"
+            history.append({"from": previous, "to": stage, "changedBy": rng.choice(recruiters),
+                            "changedAt": changed_at.isoformat(), "note": note})
+
+        current_stage = history[-1]["to"]
+        status = {"hired": "hired", "rejected": "rejected", "withdrawn": "withdrawn"}.get(current_stage, "active")
+        application = Application(
+            id=self.uid(rng), tenant_id=job.organization_id, job_id=job.id, candidate_id=candidate.id,
+            current_stage=current_stage, status=status,
+            scores={"status": "done", "total": rng.randint(20, 98), "breakdown": {"skills": rng.randint(0, 100), "location": rng.choice([0, 50, 100])}},
+            stage_history=history, created_at=applied_at, updated_at=changed_at
+        )
+        docs["applications"].append(application)
+
+        for entry in history[1:]:
+            interview_type = INTERVIEW_STAGES.get(entry["to"])
+            if interview_type:
+                starts_at = datetime.fromisoformat(entry["changedAt"]) + timedelta(days=rng.uniform(1, 5))
+                done = entry is not history[-1]
+                docs["interviews"].append(Interview(
+                    id=self.uid(rng), tenant_id=job.organization_id, application_id=application.id,
+                    interview_type=interview_type, starts_at=starts_at, ends_at=starts_at + timedelta(hours=1),
+                    location={"kind": "video", "meetUrl": f"https://meet.example.com/{application.id[:8]}"},
+                    interviewer_user_id=rng.choice(recruiters), created_by=entry["changedBy"],
+                    status="done" if done else rng.choice(["scheduled", "scheduled", "no_show"]),
+                    created_at=datetime.fromisoformat(entry["changedAt"]), updated_at=starts_at
+                ))
+            created = datetime.fromisoformat(entry["changedAt"])
+            docs["notifications"].append(Notification(
+                id=self.uid(rng), user_id=user.id, tenant_id=job.organization_id, channel="system",
+                notification_type="stage_changed", title=f"Sua candidatura para {job.title} avançou",
+                body=f"Nova etapa: {entry['to']}", link=f"/applications/{application.id}",
+                is_read=rng.random() < 0.6, created_at=created
+            ))
+
+    def _user(self, rng: random.Random, email: str, full_name: str, day: float) -> User:
+        created = self.at(day)
+        return User(id=self.uid(rng), email=email, password_hash=self.password_hash, full_name=full_name,
+                    created_at=created, updated_at=created)
+
+    @staticmethod
+    def _name(rng: random.Random) -> str:
+        return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+async def write_dataset(db, generator: SyntheticDataGenerator, writers: int = 4, batch_size: int = 1000,
+                        progress: bool = False) -> Dict[str, int]:
+    """
+    Grava dados de referência e lotes de candidatos com insert_many.
+    A geração do próximo lote acontece enquanto os escritores gravam o anterior.
+    Um erro de gravação (ex.: BulkWriteError por rodar de novo sem --drop)
+    interrompe a geração e é relançado; os escritores continuam drenando a
+    fila para o produtor nunca ficar bloqueado nela.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=writers * 4)
+    counts: Dict[str, int] = {}
+    errors: List[Exception] = []
+
+    async def writer():
+        while True:
+            item = await queue.get()
+            try:
+                if item is None:
+                    return
+                if errors:
+                    continue
+                collection, docs = item
+                await db[collection].insert_many(docs, ordered=False)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                queue.task_done()
+
+    async def enqueue(batch: Dict[str, List[Dict[str, Any]]]):
+        for collection, docs in batch.items():
+            counts[collection] = counts.get(collection, 0) + len(docs)
+            for i in range(0, len(docs), batch_size):
+                if errors:
+                    raise errors[0]
+                await queue.put((collection, docs[i:i + batch_size]))
+
+    tasks = [asyncio.create_task(writer()) for _ in range(writers)]
+    try:
+        await enqueue(generator.reference_data())
+        started_at = time.perf_counter()
+        for chunk_index, chunk in enumerate(generator.candidate_chunks()):
+            await enqueue(chunk)
+            if progress and chunk_index % 10 == 9:
+                done = min((chunk_index + 1) * generator.chunk_size, generator.candidates)
+                rate = done / (time.perf_counter() - started_at)
+                print(f"  {done}/{generator.candidates} candidatos ({rate:.0f}/s)")
+        for _ in tasks:
+            await queue.put(None)
+        await asyncio.gather(*tasks)
+        if errors:
+            raise errors[0]
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    return counts
+
+
+async def main(args):
+    client = AsyncIOMotorClient(args.mongo_url or os.environ['MONGO_URL'])
+    db = client[args.db_name or os.environ['DB_NAME']]
+
+    scale = dict(SCALES[args.scale])
+    for key in scale:
+        if getattr(args, key) is not None:
+            scale[key] = getattr(args, key)
+
+    generator = SyntheticDataGenerator(
+        seed=args.seed,
+        base_date=datetime.fromisoformat(args.base_date).replace(tzinfo=timezone.utc),
+        chunk_size=args.chunk_size,
+        **scale
+    )
+
+    if args.drop:
+        for collection in ("organizations", "users", "user_org_roles", "skills", "jobs", "job_required_skills",
+                           "candidates", "candidate_skills", "experiences", "educations", "applications",
+                           "interviews", "notifications"):
+            await db[collection].drop()
+        print("✓ Coleções removidas")
+
+    print(f"🌱 Gerando dados (seed={args.seed}): {scale}")
+    started_at = time.perf_counter()
+    counts = await write_dataset(db, generator, writers=args.writers, batch_size=args.batch_size, progress=True)
+    elapsed = time.perf_counter() - started_at
+    for collection, count in sorted(counts.items()):
+        print(f"  ✓ {collection}: {count}")
+    print(f"\n✅ {sum(counts.values())} documentos em {elapsed:.1f}s ({sum(counts.values()) / elapsed:.0f} docs/s)")
+
+    # Índices depois da carga: criar antes deixaria cada insert mais caro
+    if not args.skip_indexes:
+        from utils.indexes import ensure_indexes
+        await ensure_indexes(db)
+        print("✓ Índices aplicados")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="small", choices=sorted(SCALES))
+    parser.add_argument("--tenants", type=int)
+    parser.add_argument("--jobs-per-tenant", type=int)
+    parser.add_argument("--recruiters-per-tenant", type=int)
+    parser.add_argument("--candidates", type=int)
+    parser.add_argument("--applications-per-candidate", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--base-date", default="2025-01-01", help="data de referência dos timestamps gerados")
+    parser.add_argument("--writers", type=int, default=4, help="escritores insert_many em paralelo")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=1000, help="candidatos por lote de geração")
+    parser.add_argument("--mongo-url", default=None)
+    parser.add_argument("--db-name", default=None)
+    parser.add_argument("--drop", action="store_true", help="remove as coleções geradas antes da carga")
+    parser.add_argument("--skip-indexes", action="store_true")
+    asyncio.run(main(parser.parse_args()))
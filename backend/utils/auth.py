@@ -1,12 +1,25 @@
 from fastapi import HTTPException, Request, Cookie
-from typing import Optional
+from typing import Optional, Dict, Any, List, Set
 import jwt
 import os
+import uuid
 from datetime import datetime, timedelta, timezone
 from passlib.context import CryptContext
 from motor.motor_asyncio import AsyncIOMotorClient
+from utils.session_cache import session_cache
+from utils.executor import BoundedExecutor
+from utils.revocation import revocation_list, revoke_jti, revoke_user_tokens
+from utils.sessions import to_utc_datetime
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Custo do bcrypt; hashes com custo diferente são refeitos no próximo login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# bcrypt bloqueia ~200ms por chamada: roda fora do event loop
+password_executor = BoundedExecutor("bcrypt", PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
 
 JWT_SECRET = os.getenv("JWT_SECRET")
 JWT_REFRESH_SECRET = os.getenv("JWT_REFRESH_SECRET")
@@ -14,6 +27,12 @@ JWT_ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+# "session": token validado contra user_sessions + users (padrão)
+# "stateless": token assinado com claims de usuário/papéis, sem consulta ao banco
+AUTH_MODE = os.getenv("AUTH_MODE", "session")
+STATELESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("STATELESS_TOKEN_EXPIRE_MINUTES", str(7 * 24 * 60)))
+AUTH_REVOCATION_REFRESH_SECONDS = int(os.getenv("AUTH_REVOCATION_REFRESH_SECONDS", "15"))
+
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -23,6 +42,22 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def hash_password_async(password: str) -> str:
+    return await password_executor.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_executor.run(verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str):
+    """
+    Verifica a senha e, se o hash usar um custo diferente de BCRYPT_ROUNDS,
+    retorna também o novo hash. Returns: (valid, new_hash | None)
+    """
+    return await password_executor.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -37,6 +72,33 @@ def create_refresh_token(data: dict) -> str:
     return jwt.encode(to_encode, JWT_REFRESH_SECRET, algorithm=JWT_ALGORITHM)
 
 
+def create_stateless_access_token(user: Dict[str, Any], roles: List[Dict[str, Any]]) -> str:
+    """Token de acesso autocontido: usuário, versão do token e papéis por organização"""
+    expire = datetime.now(timezone.utc) + timedelta(minutes=STATELESS_TOKEN_EXPIRE_MINUTES)
+    to_encode = {
+        "user_id": user["id"],
+        "email": user["email"],
+        "full_name": user.get("full_name"),
+        "active": bool(user.get("is_active")),
+        "rpc": bool(user.get("requires_password_change", False)),
+        "tv": user.get("token_version", 0),
+        "roles": [[r["organization_id"], r["role"], r.get("id")] for r in roles],
+        "jti": uuid.uuid4().hex,
+        "exp": expire,
+        "type": "access",
+        "stateless": True
+    }
+    return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+
+async def issue_access_token(db, user: Dict[str, Any]) -> str:
+    """Emite o token de acesso conforme AUTH_MODE"""
+    if AUTH_MODE == "stateless":
+        roles = await db.user_org_roles.find({"user_id": user["id"]}, {"_id": 0}).to_list(100)
+        return create_stateless_access_token(user, roles)
+    return create_access_token({"user_id": user["id"], "email": user["email"]})
+
+
 def decode_token(token: str, token_type: str = "access") -> dict:
     try:
         secret = JWT_SECRET if token_type == "access" else JWT_REFRESH_SECRET
@@ -50,46 +112,208 @@ def decode_token(token: str, token_type: str = "access") -> dict:
         raise HTTPException(status_code=401, detail="Token inválido")
 
 
-async def get_current_user(request: Request, session_token: Optional[str] = Cookie(None)):
-    from server import db
-    
+def _extract_token(request: Request, session_token: Optional[str]) -> Optional[str]:
     token = session_token
     if not token:
         auth_header = request.headers.get("Authorization")
         if auth_header and auth_header.startswith("Bearer "):
             token = auth_header.split(" ")[1]
+    return token
+
+
+def _decode_stateless(token: str) -> Optional[Dict[str, Any]]:
+    """Retorna as claims se o token for stateless e válido; None se não for stateless"""
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expirado")
+    except jwt.InvalidTokenError:
+        return None
     
-    if not token:
-        raise HTTPException(status_code=401, detail="Não autenticado")
-    
+    if not payload.get("stateless") or payload.get("type") != "access":
+        return None
+    if revocation_list.is_revoked(payload):
+        raise HTTPException(status_code=401, detail="Sessão revogada")
+    if not payload.get("active"):
+        raise HTTPException(status_code=401, detail="Usuário não encontrado")
+    return payload
+
+
+def _principal_from_claims(payload: Dict[str, Any]) -> "Principal":
+    user = {
+        "id": payload["user_id"],
+        "email": payload.get("email"),
+        "full_name": payload.get("full_name"),
+        "is_active": True,
+        "requires_password_change": payload.get("rpc", False),
+        "token_version": payload.get("tv", 0)
+    }
+    roles = [
+        {"id": role_id, "user_id": payload["user_id"], "organization_id": org_id, "role": role}
+        for org_id, role, role_id in payload.get("roles", [])
+    ]
+    return Principal(user, roles)
+
+
+async def _resolve_session(db, token: str):
+    """Valida o token (sessão ou JWT) e retorna (user_id, expires_at)"""
+    expires_at = None
     session = await db.user_sessions.find_one({"session_token": token})
     if not session:
         try:
             payload = decode_token(token, "access")
+            # Tokens stateless só valem em AUTH_MODE=stateless (onde passam pela
+            # revogação/token_version); fora dele, ex. emitidos antes de voltar
+            # para session, são recusados
+            if payload.get("stateless"):
+                raise HTTPException(status_code=401, detail="Sessão inválida")
             user_id = payload.get("user_id")
+            if payload.get("exp"):
+                expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc)
         except:
             raise HTTPException(status_code=401, detail="Sessão inválida")
     else:
-        # Verificar se session tem expires_at
-        if "expires_at" in session:
-            expires_at = session["expires_at"]
-            if isinstance(expires_at, str):
-                expires_at = datetime.fromisoformat(expires_at)
-            if not expires_at.tzinfo:
-                expires_at = expires_at.replace(tzinfo=timezone.utc)
-            
-            if expires_at < datetime.now(timezone.utc):
-                raise HTTPException(status_code=401, detail="Sessão expirada")
+        # O monitor de TTL roda a cada ~60s: sessões expiradas ainda podem ser lidas
+        expires_at = to_utc_datetime(session.get("expires_at"))
+        if expires_at and expires_at < datetime.now(timezone.utc):
+            raise HTTPException(status_code=401, detail="Sessão expirada")
         
         user_id = session["user_id"]
     
+    return user_id, expires_at
+
+
+async def get_current_user(request: Request, session_token: Optional[str] = Cookie(None)):
+    from server import db
+    
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return dict(principal.user)
+    
+    token = _extract_token(request, session_token)
+    if not token:
+        raise HTTPException(status_code=401, detail="Não autenticado")
+    
+    if AUTH_MODE == "stateless":
+        payload = _decode_stateless(token)
+        if payload is not None:
+            principal = _principal_from_claims(payload)
+            request.state.principal = principal
+            return dict(principal.user)
+    
+    cached_user = session_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+    
+    user_id, expires_at = await _resolve_session(db, token)
+    
     user = await db.users.find_one({"id": user_id}, {"_id": 0})
     if not user or not user.get("is_active"):
         raise HTTPException(status_code=401, detail="Usuário não encontrado")
     
+    session_cache.set(token, user, expires_at)
     return user
 
 
+class Principal:
+    """
+    Usuário autenticado + todos os seus papéis, resolvidos uma vez por requisição.
+
+    tenant_roles mapeia organization_id -> {roles}, permitindo checagens de
+    acesso sem novas consultas a user_org_roles.
+    """
+    
+    def __init__(self, user: Dict[str, Any], roles: List[Dict[str, Any]]):
+        self.user = user
+        self.id = user["id"]
+        self.roles = roles
+        self.tenant_roles: Dict[str, Set[str]] = {}
+        for r in roles:
+            self.tenant_roles.setdefault(r["organization_id"], set()).add(r["role"])
+        self.role_keys: Set[str] = {r["role"] for r in roles}
+    
+    def roles_in(self, tenant_id: str) -> Set[str]:
+        return self.tenant_roles.get(tenant_id, set())
+    
+    def has_role(self, *roles: str) -> bool:
+        """Possui algum dos papéis em qualquer organização"""
+        return any(role in self.role_keys for role in roles)
+    
+    def can(self, tenant_id: str, *roles: str) -> bool:
+        """Possui algum dos papéis na organização (sem papéis = qualquer papel)"""
+        tenant = self.tenant_roles.get(tenant_id)
+        if not tenant:
+            return False
+        return not roles or any(role in tenant for role in roles)
+    
+    def tenant_ids(self, *roles: str) -> List[str]:
+        """Organizações em que possui algum dos papéis (sem papéis = todas)"""
+        return [t for t, tenant in self.tenant_roles.items() if not roles or any(role in tenant for role in roles)]
+    
+    def require(self, roles: list, organization_id: Optional[str] = None):
+        allowed = self.can(organization_id, *roles) if organization_id else self.has_role(*roles)
+        if not allowed:
+            raise HTTPException(status_code=403, detail="Permissão negada")
+        return True
+
+
+async def get_principal(request: Request, session_token: Optional[str] = Cookie(None)) -> Principal:
+    """
+    Dependência FastAPI: resolve usuário + papéis uma única vez por requisição.
+
+    Pode ser usada com Depends(get_principal) ou chamada diretamente como
+    get_current_user. O resultado fica em request.state.principal.
+    """
+    from server import db
+    
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+    
+    token = _extract_token(request, session_token)
+    if not token:
+        raise HTTPException(status_code=401, detail="Não autenticado")
+    
+    if AUTH_MODE == "stateless":
+        payload = _decode_stateless(token)
+        if payload is not None:
+            principal = _principal_from_claims(payload)
+            request.state.principal = principal
+            return principal
+    
+    user = session_cache.get(token)
+    roles = session_cache.get_roles(token) if user is not None else None
+    
+    if user is None:
+        user_id, expires_at = await _resolve_session(db, token)
+        
+        # Usuário e papéis em um único round-trip
+        docs = await db.users.aggregate([
+            {"$match": {"id": user_id}},
+            {"$lookup": {
+                "from": "user_org_roles",
+                "localField": "id",
+                "foreignField": "user_id",
+                "as": "roles"
+            }},
+            {"$project": {"_id": 0, "roles._id": 0}}
+        ]).to_list(1)
+        
+        user = docs[0] if docs else None
+        if not user or not user.get("is_active"):
+            raise HTTPException(status_code=401, detail="Usuário não encontrado")
+        
+        roles = user.pop("roles", [])
+        session_cache.set(token, user, expires_at, roles)
+    elif roles is None:
+        roles = await db.user_org_roles.find({"user_id": user["id"]}, {"_id": 0}).to_list(100)
+        session_cache.set_roles(token, roles)
+    
+    principal = Principal(user, roles)
+    request.state.principal = principal
+    return principal
+
+
 async def get_user_roles(user_id: str, organization_id: Optional[str] = None):
     from server import db
     
@@ -101,7 +325,10 @@ async def get_user_roles(user_id: str, organization_id: Optional[str] = None):
     return roles
 
 
-async def require_role(user: dict, required_roles: list, organization_id: Optional[str] = None):
+async def require_role(user, required_roles: list, organization_id: Optional[str] = None):
+    if isinstance(user, Principal):
+        return user.require(required_roles, organization_id)
+    
     roles = await get_user_roles(user["id"], organization_id)
     user_role_keys = [r["role"] for r in roles]
     
@@ -109,3 +336,39 @@ async def require_role(user: dict, required_roles: list, organization_id: Option
         raise HTTPException(status_code=403, detail="Permissão negada")
     
     return True
+
+
+async def load_password_hash(user: Dict[str, Any]) -> Optional[str]:
+    """password_hash do usuário (ausente nas claims de tokens stateless)"""
+    if "password_hash" in user:
+        return user["password_hash"]
+    from server import db
+    doc = await db.users.find_one({"id": user["id"]}, {"_id": 0, "password_hash": 1})
+    return doc.get("password_hash") if doc else None
+
+
+async def invalidate_user_auth(user_id: str, revoke_tokens: bool = True):
+    """
+    Invalida o estado de autenticação em cache de um usuário. Com
+    revoke_tokens, também revoga todos os tokens stateless já emitidos
+    (troca de senha, desativação, mudança de papéis). No modo session
+    tokens stateless nunca são aceitos, então não há o que revogar.
+    """
+    from server import db
+    
+    session_cache.invalidate_user(user_id)
+    if revoke_tokens and AUTH_MODE == "stateless":
+        expires_at = datetime.now(timezone.utc) + timedelta(minutes=STATELESS_TOKEN_EXPIRE_MINUTES)
+        await revoke_user_tokens(db, user_id, expires_at)
+
+
+async def revoke_access_token(token: str):
+    """Revoga um token stateless específico (logout); ignora tokens de sessão"""
+    from server import db
+    
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    except jwt.InvalidTokenError:
+        return
+    if payload.get("stateless") and payload.get("jti"):
+        await revoke_jti(db, payload["jti"], payload["user_id"], datetime.fromtimestamp(payload["exp"], timezone.utc))
@@ -0,0 +1,78 @@
+"""
+Campos de busca normalizados dos candidatos (candidates.search)
+
+A busca avançada filtra por igualdade nesses campos (indexados) e usa o
+índice de texto em search.text para o filtro livre, em vez de $regex
+case-insensitive e varredura em Python. Os campos são recalculados em toda
+escrita que altera o candidato ou o nome/e-mail do usuário; registros
+antigos (ou de versões anteriores da normalização, search.v) são
+preenchidos por backfill_search_fields.py.
+"""
+from datetime import datetime
+from typing import Dict, Any, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from utils.text_normalization import (
+    normalize_text, clean_text, normalize_city, normalize_state, normalize_institution
+)
+from utils.search_cache import search_cache
+
+# Incrementar ao mudar a normalização dos campos (o backfill recalcula os antigos)
+SEARCH_FIELDS_VERSION = 2
+
+# campo em candidates.search -> campo do candidato
+KEY_FIELDS = {
+    "city": "location_city",
+    "state": "location_state",
+    "neighborhood": "location_neighborhood",
+    "education_area": "education_area",
+    "education_institution": "education_institution",
+}
+# Normalizador de cada campo; filtros da busca passam pelo mesmo (normalize_key)
+KEY_NORMALIZERS = {
+    "city": normalize_city,
+    "state": normalize_state,
+    "neighborhood": clean_text,
+    "education_area": clean_text,
+    "education_institution": normalize_institution,
+}
+CANDIDATE_TEXT_FIELDS = ["professional_summary", "education_area", "education_course", "education_institution"]
+USER_TEXT_FIELDS = ["full_name", "email"]
+
+# Campos lidos para montar o documento de busca
+CANDIDATE_PROJECTION = {"_id": 0, "id": 1, "user_id": 1, "birthdate": 1, **{f: 1 for f in set(KEY_FIELDS.values()) | set(CANDIDATE_TEXT_FIELDS)}}
+USER_PROJECTION = {"_id": 0, "id": 1, **{f: 1 for f in USER_TEXT_FIELDS}}
+
+
+def birth_year(value: Any) -> Optional[int]:
+    """Ano de nascimento (datetime ou string ISO); a faixa etária da busca é por ano"""
+    if isinstance(value, datetime):
+        return value.year
+    if isinstance(value, str) and value[:4].isdigit():
+        return int(value[:4])
+    return None
+
+
+def normalize_key(key: str, value: Any) -> Optional[str]:
+    """Forma normalizada de um valor de filtro, comparável com candidates.search.<key>"""
+    return KEY_NORMALIZERS[key](value)
+
+
+def build_search_fields(candidate: Dict[str, Any], user: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Monta candidates.search a partir do candidato e do usuário"""
+    search = {key: normalize_key(key, candidate.get(field)) for key, field in KEY_FIELDS.items()}
+    search["birth_year"] = birth_year(candidate.get("birthdate"))
+    parts = [(user or {}).get(f) for f in USER_TEXT_FIELDS] + [candidate.get(f) for f in CANDIDATE_TEXT_FIELDS]
+    search["text"] = normalize_text(" ".join(p for p in parts if p)) or ""
+    search["v"] = SEARCH_FIELDS_VERSION
+    return search
+
+
+async def refresh_candidate_search(db: AsyncIOMotorDatabase, user_id: str):
+    """Recalcula candidates.search do candidato do usuário (se existir)"""
+    candidate = await db.candidates.find_one({"user_id": user_id}, CANDIDATE_PROJECTION)
+    if not candidate:
+        return
+    user = await db.users.find_one({"id": user_id}, USER_PROJECTION)
+    await db.candidates.update_one({"id": candidate["id"]}, {"$set": {"search": build_search_fields(candidate, user)}})
+    # A alteração pode mudar quais buscas o candidato satisfaz
+    search_cache.bump()
@@ -0,0 +1,85 @@
+"""
+Executor limitado para trabalho síncrono pesado em CPU (ex.: bcrypt)
+
+Roda funções bloqueantes em um pool de threads dedicado, para não travar o
+event loop. A fila é limitada: acima de max_queue tarefas pendentes, novas
+submissões são recusadas com 503 em vez de acumular latência indefinidamente.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any
+from fastapi import HTTPException
+
+
+class BoundedExecutor:
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self.pending = 0  # na fila + em execução
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.run_seconds_total = 0.0
+        self.run_seconds_max = 0.0
+
+    async def run(self, fn: Callable, *args):
+        if self.pending >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Servidor ocupado, tente novamente em instantes")
+
+        self.pending += 1
+        submitted_at = time.perf_counter()
+
+        def task():
+            started_at = time.perf_counter()
+            with self._lock:
+                self.running += 1
+            try:
+                return fn(*args)
+            finally:
+                elapsed = time.perf_counter() - started_at
+                waited = started_at - submitted_at
+                with self._lock:
+                    self.running -= 1
+                    self.run_seconds_total += elapsed
+                    self.run_seconds_max = max(self.run_seconds_max, elapsed)
+                    self.wait_seconds_total += waited
+                    self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, task)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    @property
+    def queue_depth(self) -> int:
+        """Tarefas aguardando uma thread livre"""
+        return max(0, self.pending - self.running)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            "running": self.running,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.wait_seconds_total / self.completed * 1000, 2) if self.completed else 0.0,
+            "max_wait_ms": round(self.wait_seconds_max * 1000, 2),
+            "avg_run_ms": round(self.run_seconds_total / self.completed * 1000, 2) if self.completed else 0.0,
+            "max_run_ms": round(self.run_seconds_max * 1000, 2)
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,311 @@
+"""
+Registro declarativo de índices do MongoDB
+
+Cada coleção definida em models.py tem uma entrada em INDEXES. O registro é
+aplicado de forma idempotente no startup (server.py) e pela CLI
+ensure_indexes.py, que também reporta divergências (drift) entre o que está
+declarado e o que existe no banco.
+"""
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+logger = logging.getLogger(__name__)
+
+# Opções de índice que participam da comparação de drift
+COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+def index(keys: List[Tuple[str, Any]], name: Optional[str] = None, **options) -> Dict[str, Any]:
+    """Declara um índice: chaves + opções (unique, sparse, expireAfterSeconds...)"""
+    if name is None:
+        name = "_".join(f"{field}_{direction}" for field, direction in keys)
+    return {"name": name, "keys": list(keys), "options": options}
+
+
+# Uma entrada por coleção de models.py e utils/ (nome da coleção -> índices)
+INDEXES: Dict[str, List[Dict[str, Any]]] = {
+    "organizations": [
+        index([("id", ASCENDING)], unique=True),
+        index([("name", ASCENDING)]),
+    ],
+    "users": [
+        index([("id", ASCENDING)], unique=True),
+        index([("email", ASCENDING)], unique=True),
+        index([("is_active", ASCENDING)]),
+    ],
+    "user_org_roles": [
+        index([("id", ASCENDING)], unique=True),
+        index([("user_id", ASCENDING), ("organization_id", ASCENDING), ("role", ASCENDING)]),
+        index([("organization_id", ASCENDING), ("role", ASCENDING)]),
+    ],
+    "candidates": [
+        index([("id", ASCENDING)], unique=True),
+        index([("user_id", ASCENDING)]),
+        index([("visibility", ASCENDING), ("search.city", ASCENDING), ("id", ASCENDING)]),
+        # Paginação por cursor de /candidates/search (ordem por id dentro do pool)
+        index([("visibility", ASCENDING), ("id", ASCENDING)]),
+        # Campos normalizados da busca avançada (utils/candidate_search.py)
+        index([("search.city", ASCENDING), ("search.neighborhood", ASCENDING)]),
+        index([("search.state", ASCENDING)]),
+        index([("search.education_area", ASCENDING)]),
+        index([("search.education_institution", ASCENDING)]),
+        index([("search.birth_year", ASCENDING)]),
+        index([("search.text", TEXT)], name="search_text", default_language="portuguese",
+              language_override="search_language"),
+    ],
+    "skills": [
+        index([("id", ASCENDING)], unique=True),
+        index([("name", ASCENDING)]),
+        # Nome normalizado: deduplicação e filtro de skills (utils/search_fields.py)
+        index([("search.name", ASCENDING)]),
+        index([("category", ASCENDING)]),
+    ],
+    "candidate_skills": [
+        index([("id", ASCENDING)], unique=True),
+        index([("candidate_id", ASCENDING)]),
+        index([("skill_id", ASCENDING), ("level", ASCENDING)]),
+    ],
+    "experiences": [
+        index([("id", ASCENDING)], unique=True),
+        index([("candidate_id", ASCENDING)]),
+    ],
+    "educations": [
+        index([("id", ASCENDING)], unique=True),
+        index([("candidate_id", ASCENDING)]),
+    ],
+    "candidate_documents": [
+        index([("id", ASCENDING)], unique=True),
+        index([("candidate_id", ASCENDING)]),
+    ],
+    "jobs": [
+        index([("id", ASCENDING)], unique=True),
+        index([("organization_id", ASCENDING), ("status", ASCENDING)]),
+        index([("organization_id", ASCENDING), ("updated_at", DESCENDING)]),
+        index([("tenant_id", ASCENDING)], sparse=True),
+        index([("status", ASCENDING), ("search.city", ASCENDING)]),
+    ],
+    "job_required_skills": [
+        index([("id", ASCENDING)], unique=True),
+        index([("job_id", ASCENDING)]),
+    ],
+    "applications": [
+        index([("id", ASCENDING)], unique=True),
+        index([("job_id", ASCENDING), ("candidate_id", ASCENDING)]),
+        # Pipeline: filtro por pontuação mínima e ordenação por scores.total
+        index([("tenant_id", ASCENDING), ("job_id", ASCENDING), ("current_stage", ASCENDING), ("scores.total", DESCENDING)]),
+        index([("tenant_id", ASCENDING), ("job_id", ASCENDING), ("scores.total", DESCENDING)]),
+        index([("tenant_id", ASCENDING), ("status", ASCENDING)]),
+        index([("candidate_id", ASCENDING)]),
+        # Listagem/shortlist: mesmos filtros + pontuação
+        index([("status", ASCENDING), ("job_id", ASCENDING), ("current_stage", ASCENDING), ("scores.total", DESCENDING)]),
+        index([("status", ASCENDING), ("job_id", ASCENDING), ("scores.total", DESCENDING)]),
+        # Listagem sem job_id ordenada/filtrada por pontuação ou por data (sort=recent)
+        index([("status", ASCENDING), ("scores.total", DESCENDING)]),
+        index([("status", ASCENDING), ("created_at", DESCENDING)]),
+        # Reenfileiramento de pontuações pendentes no startup (services/scoring_queue.py)
+        index([("scores.status", ASCENDING)]),
+    ],
+    "application_stage_history": [
+        index([("id", ASCENDING)], unique=True),
+        index([("application_id", ASCENDING), ("changed_at", DESCENDING)]),
+    ],
+    "interviews": [
+        index([("id", ASCENDING)], unique=True),
+        index([("tenant_id", ASCENDING), ("starts_at", ASCENDING)]),
+        index([("application_id", ASCENDING)]),
+    ],
+    "feedbacks": [
+        index([("id", ASCENDING)], unique=True),
+        index([("application_id", ASCENDING)]),
+    ],
+    "questionnaires": [
+        index([("id", ASCENDING)], unique=True),
+        index([("key", ASCENDING)]),
+    ],
+    "questions": [
+        index([("id", ASCENDING)], unique=True),
+        index([("questionnaire_id", ASCENDING), ("order_index", ASCENDING)]),
+    ],
+    "questionnaire_assignments": [
+        index([("id", ASCENDING)], unique=True),
+        index([("application_id", ASCENDING)]),
+    ],
+    "question_responses": [
+        index([("id", ASCENDING)], unique=True),
+        index([("assignment_id", ASCENDING)]),
+    ],
+    "assessments": [
+        index([("id", ASCENDING)], unique=True),
+        index([("application_id", ASCENDING)]),
+    ],
+    "scores": [
+        index([("id", ASCENDING)], unique=True),
+        index([("application_id", ASCENDING)]),
+    ],
+    "tags": [
+        index([("id", ASCENDING)], unique=True),
+        index([("name", ASCENDING)]),
+    ],
+    "candidate_tags": [
+        index([("id", ASCENDING)], unique=True),
+        index([("candidate_id", ASCENDING)]),
+        index([("tag_id", ASCENDING)]),
+    ],
+    "job_publications": [
+        index([("id", ASCENDING)], unique=True),
+        index([("job_id", ASCENDING)]),
+    ],
+    "consents": [
+        index([("id", ASCENDING)], unique=True),
+        index([("candidate_id", ASCENDING)]),
+    ],
+    "notifications": [
+        index([("id", ASCENDING)], unique=True),
+        index([("user_id", ASCENDING), ("channel", ASCENDING), ("is_read", ASCENDING), ("created_at", DESCENDING)]),
+        index([("channel", ASCENDING), ("status", ASCENDING)], sparse=True),
+    ],
+    "notification_preferences": [
+        index([("id", ASCENDING)], unique=True),
+        index([("user_id", ASCENDING)]),
+    ],
+    "audit_logs": [
+        index([("id", ASCENDING)], unique=True),
+        index([("tenant_id", ASCENDING), ("occurred_at", DESCENDING)]),
+        index([("entity", ASCENDING), ("entity_id", ASCENDING)]),
+    ],
+    "user_sessions": [
+        index([("id", ASCENDING)], unique=True),
+        index([("session_token", ASCENDING)]),
+        index([("user_id", ASCENDING)]),
+        index([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "token_revocations": [
+        index([("id", ASCENDING)], unique=True),
+        index([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "data_subject_requests": [
+        index([("id", ASCENDING)], unique=True),
+        index([("candidate_id", ASCENDING)]),
+    ],
+    "job_stage_history": [
+        index([("id", ASCENDING)], unique=True),
+        index([("job_id", ASCENDING), ("changed_at", DESCENDING)]),
+    ],
+    "job_notes": [
+        index([("id", ASCENDING)], unique=True),
+        index([("job_id", ASCENDING), ("created_at", DESCENDING)]),
+    ],
+}
+
+
+def _normalize_keys(keys) -> List[Tuple[str, Any]]:
+    return [(field, int(direction) if isinstance(direction, (int, float)) else direction) for field, direction in keys]
+
+
+def _existing_keys(info: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    """Chaves de um índice existente; índices de texto aparecem como _fts/_ftsx + weights"""
+    keys = []
+    for field, direction in _normalize_keys(info["key"]):
+        if field == "_fts":
+            keys.extend((text_field, "text") for text_field in sorted(info.get("weights", {})))
+        elif field != "_ftsx":
+            keys.append((field, direction))
+    return keys
+
+
+def _declared_options(spec: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in spec["options"].items() if k in COMPARED_OPTIONS and v not in (None, False)}
+
+
+def _existing_options(info: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: info[k] for k in COMPARED_OPTIONS if info.get(k) not in (None, False)}
+
+
+def _to_index_model(spec: Dict[str, Any]) -> IndexModel:
+    return IndexModel(spec["keys"], name=spec["name"], **spec["options"])
+
+
+async def check_index_drift(db: AsyncIOMotorDatabase, collections: Optional[List[str]] = None) -> Dict[str, Dict[str, List]]:
+    """
+    Compara os índices declarados com os existentes no banco.
+
+    Returns:
+        { collection: {"missing": [nomes], "extra": [nomes], "different": [nomes]} }
+        apenas para coleções com alguma divergência.
+    """
+    report = {}
+    for collection in collections or INDEXES.keys():
+        declared = {spec["name"]: spec for spec in INDEXES.get(collection, [])}
+        existing = await db[collection].index_information()
+        existing.pop("_id_", None)
+
+        missing, different = [], []
+        for name, spec in declared.items():
+            info = existing.get(name)
+            if info is None:
+                missing.append(name)
+            elif (_existing_keys(info) != _normalize_keys(spec["keys"])
+                  or _existing_options(info) != _declared_options(spec)):
+                different.append(name)
+
+        extra = [name for name in existing if name not in declared]
+
+        if missing or extra or different:
+            report[collection] = {"missing": missing, "extra": extra, "different": different}
+
+    return report
+
+
+async def ensure_indexes(
+    db: AsyncIOMotorDatabase,
+    collections: Optional[List[str]] = None,
+    rebuild_different: bool = False,
+    drop_extra: bool = False
+) -> Dict[str, Dict[str, List]]:
+    """
+    Aplica o registro de forma idempotente: cria os índices ausentes e,
+    opcionalmente, recria os divergentes e remove os não declarados.
+
+    Índices com especificação diferente nunca são alterados sem
+    rebuild_different=True; eles aparecem no relatório retornado.
+
+    Returns:
+        Relatório de drift após a aplicação (ver check_index_drift).
+    """
+    drift = await check_index_drift(db, collections)
+
+    for collection, entry in drift.items():
+        declared = {spec["name"]: spec for spec in INDEXES.get(collection, [])}
+        to_create = list(entry["missing"])
+
+        if rebuild_different:
+            for name in entry["different"]:
+                await db[collection].drop_index(name)
+                to_create.append(name)
+
+        if drop_extra:
+            for name in entry["extra"]:
+                await db[collection].drop_index(name)
+
+        for name in to_create:
+            try:
+                await db[collection].create_indexes([_to_index_model(declared[name])])
+                logger.info(f"Índice criado: {collection}.{name}")
+            except OperationFailure as e:
+                # Ex.: dados duplicados impedem um índice unique
+                logger.error(f"Falha ao criar índice {collection}.{name}: {e}")
+
+    return await check_index_drift(db, collections)
+
+
+def format_drift_report(report: Dict[str, Dict[str, List]]) -> List[str]:
+    """Formata o relatório de drift em linhas legíveis"""
+    lines = []
+    for collection, entry in sorted(report.items()):
+        for kind in ("missing", "different", "extra"):
+            for name in entry[kind]:
+                lines.append(f"{collection}: {kind} {name}")
+    return lines
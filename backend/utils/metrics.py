@@ -0,0 +1,138 @@
+"""
+Métricas Prometheus coletadas no próprio processo (GET /api/metrics)
+
+- latência HTTP por rota (template da rota, não o path, para limitar a
+  cardinalidade);
+- latência e falhas de comandos Mongo por coleção/operação (via observer do
+  CommandMonitor de utils/query_monitor);
+- latência e falhas de chamadas ao LLM (llm_timer);
+- atraso do event loop, medido por uma tarefa em background;
+- fila do executor de bcrypt e fila de pontuação (lidas no momento da coleta).
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from prometheus_client import Histogram, Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+EVENT_LOOP_LAG_INTERVAL_SECONDS = float(os.getenv("EVENT_LOOP_LAG_INTERVAL_SECONDS", "0.5"))
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP por rota",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+MONGO_COMMAND_SECONDS = Histogram(
+    "mongo_command_duration_seconds",
+    "Latência dos comandos MongoDB por coleção/operação",
+    ["collection", "operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "mongo_command_failures_total",
+    "Comandos MongoDB com erro",
+    ["collection", "operation"]
+)
+LLM_CALL_SECONDS = Histogram(
+    "llm_call_duration_seconds",
+    "Latência das chamadas ao LLM",
+    ["call"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+)
+LLM_CALL_FAILURES = Counter(
+    "llm_call_failures_total",
+    "Chamadas ao LLM com erro",
+    ["call"]
+)
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds",
+    "Atraso do event loop em relação ao sleep agendado",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+BCRYPT_QUEUE_DEPTH = Gauge(
+    "bcrypt_executor_queue_depth",
+    "Tarefas de bcrypt aguardando uma thread livre"
+)
+BCRYPT_REJECTED = Gauge(
+    "bcrypt_executor_rejected",
+    "Tarefas de bcrypt recusadas (503) desde o início do processo"
+)
+
+SCORING_QUEUE_DEPTH = Gauge(
+    "scoring_queue_depth",
+    "Candidaturas aguardando pontuação em background"
+)
+SCORING_QUEUE_FAILED = Gauge(
+    "scoring_queue_failed",
+    "Candidaturas marcadas como falha de pontuação desde o início do processo"
+)
+
+
+def observe_mongo_command(operation: str, collection: str, duration_seconds: float, failed: bool):
+    MONGO_COMMAND_SECONDS.labels(collection or "-", operation).observe(duration_seconds)
+    if failed:
+        MONGO_COMMAND_FAILURES.labels(collection or "-", operation).inc()
+
+
+def register_collectors(command_monitor, password_executor, scoring_queue):
+    """Liga as métricas às fontes já existentes (chamado uma vez no startup)"""
+    command_monitor.add_observer(observe_mongo_command)
+    BCRYPT_QUEUE_DEPTH.set_function(lambda: password_executor.queue_depth)
+    BCRYPT_REJECTED.set_function(lambda: password_executor.rejected)
+    SCORING_QUEUE_DEPTH.set_function(lambda: scoring_queue.depth)
+    SCORING_QUEUE_FAILED.set_function(lambda: scoring_queue.failed)
+
+
+@asynccontextmanager
+async def llm_timer(call: str):
+    """Mede uma chamada ao LLM; exceções contam como falha e são repassadas"""
+    started_at = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        LLM_CALL_FAILURES.labels(call).inc()
+        raise
+    finally:
+        LLM_CALL_SECONDS.labels(call).observe(time.perf_counter() - started_at)
+
+
+async def monitor_event_loop_lag(interval_seconds: float = EVENT_LOOP_LAG_INTERVAL_SECONDS):
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval_seconds
+        await asyncio.sleep(interval_seconds)
+        EVENT_LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - expected))
+
+
+class MetricsMiddleware:
+    """Mede a latência HTTP por rota (ASGI puro, sem tarefa extra por requisição)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+        started_at = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                scope.get("method", ""),
+                getattr(route, "path", "unmatched"),
+                str(status["code"])
+            ).observe(time.perf_counter() - started_at)
@@ -0,0 +1,63 @@
+"""
+Paginação por cursor (keyset)
+
+Em vez de skip/limit, cada página continua a partir da última chave vista:
+ordenamos por um campo único e indexado (por padrão "id") e o cursor guarda
+o valor da última linha. O custo por página é constante, independente da
+profundidade, e inserções concorrentes não duplicam nem pulam linhas.
+
+O cursor é opaco para o cliente (base64 de um JSON) e deve ser repassado
+sem alterações.
+"""
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import HTTPException
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(last_value: Any) -> str:
+    raw = json.dumps({"k": last_value}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Any:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode()))["k"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def apply_cursor(query: Dict[str, Any], cursor: Optional[str], sort_field: str = "id") -> Dict[str, Any]:
+    """Retorna uma cópia da query restrita às linhas após o cursor"""
+    if not cursor:
+        return query
+    paged = dict(query)
+    condition = paged.get(sort_field)
+    condition = dict(condition) if isinstance(condition, dict) else ({"$eq": condition} if condition is not None else {})
+    condition["$gt"] = decode_cursor(cursor)
+    paged[sort_field] = condition
+    return paged
+
+
+async def fetch_page(
+    collection,
+    query: Dict[str, Any],
+    projection: Dict[str, Any],
+    limit: int,
+    cursor: Optional[str] = None,
+    sort_field: str = "id"
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Busca uma página ordenada por sort_field; retorna (linhas, próximo cursor ou None)"""
+    docs = await collection.find(
+        apply_cursor(query, cursor, sort_field), projection
+    ).sort(sort_field, 1).limit(limit + 1).to_list(limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1][sort_field])
+    return docs, next_cursor
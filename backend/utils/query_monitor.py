@@ -0,0 +1,195 @@
+"""
+Instrumentação de comandos do MongoDB por requisição
+
+CommandMonitor (listener de comandos do PyMongo) atribui cada comando à
+requisição corrente via ContextVar; o Motor copia o contexto para as threads
+onde o PyMongo executa, então o listener enxerga as estatísticas da
+requisição que disparou o comando.
+
+QueryStatsMiddleware (ASGI) abre as estatísticas no início da requisição e:
+- adiciona os headers Server-Timing (db;dur=...) e X-DB-Queries à resposta;
+- registra em log requisições com N+1 suspeito, isto é, o mesmo formato de
+  consulta (comando + coleção + chaves do filtro) repetido mais de
+  DB_QUERY_REPEAT_THRESHOLD vezes.
+
+Comandos emitidos fora de uma requisição (startup, scripts) são ignorados.
+"""
+import logging
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, Tuple
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+DB_QUERY_MONITOR_ENABLED = os.getenv("DB_QUERY_MONITOR", "1") == "1"
+DB_QUERY_REPEAT_THRESHOLD = int(os.getenv("DB_QUERY_REPEAT_THRESHOLD", "5"))
+# Requisições com tempo de banco acima disso são registradas em log
+DB_SLOW_REQUEST_MS = float(os.getenv("DB_SLOW_REQUEST_MS", "500"))
+
+# Comandos de handshake/monitoramento que não são consultas da aplicação
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue", "endSessions", "buildInfo"}
+
+
+def _shape(value: Any) -> Any:
+    """Substitui valores por '?', mantendo campos e operadores"""
+    if isinstance(value, dict):
+        return {k: _shape(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        shapes = [_shape(v) for v in value]
+        # Listas de valores ($in) têm o mesmo formato independente do tamanho
+        return shapes[:1] if all(s == "?" for s in shapes) else shapes
+    return "?"
+
+
+def query_shape(command_name: str, command: Dict[str, Any]) -> Tuple[str, str, str]:
+    """(comando, coleção, formato do filtro) usado para detectar N+1"""
+    collection = command.get(command_name)
+    if not isinstance(collection, str):
+        collection = ""
+
+    if command_name == "find":
+        spec = command.get("filter", {})
+    elif command_name == "aggregate":
+        spec = [next(iter(stage), "") for stage in command.get("pipeline", [])]
+        return command_name, collection, repr(spec)
+    elif command_name in ("count", "distinct"):
+        spec = command.get("query", {})
+    elif command_name in ("update", "delete"):
+        statements = command.get("updates") or command.get("deletes") or [{}]
+        spec = statements[0].get("q", {})
+    elif command_name == "findAndModify":
+        spec = command.get("query", {})
+    else:
+        spec = {}
+    return command_name, collection, repr(_shape(spec))
+
+
+class RequestQueryStats:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest: Optional[str] = None
+        self.shapes: Counter = Counter()
+        self._inflight: Dict[Tuple[Any, int], Tuple[str, str, str]] = {}
+
+    def started(self, key, shape: Tuple[str, str, str]):
+        self._inflight[key] = shape
+        self.shapes[shape] += 1
+
+    def finished(self, key, duration_ms: float) -> Optional[Tuple[str, str, str]]:
+        shape = self._inflight.pop(key, None)
+        if shape is None:
+            return None
+        self.count += 1
+        self.total_ms += duration_ms
+        if duration_ms > self.slowest_ms:
+            self.slowest_ms = duration_ms
+            self.slowest = f"{shape[0]} {shape[1]}"
+        return shape
+
+    def repeated_shapes(self, threshold: int = DB_QUERY_REPEAT_THRESHOLD):
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+
+current_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """Listener registrado no AsyncIOMotorClient (event_listeners=[...])"""
+
+    def __init__(self):
+        self._observers = []
+        # Coleção dos comandos em andamento, para observers (os eventos de término não a trazem)
+        self._collections: Dict[Tuple[Any, int], str] = {}
+
+    def add_observer(self, fn):
+        """fn(command_name, collection, duration_seconds, failed) para cada comando"""
+        self._observers.append(fn)
+
+    def _key(self, event):
+        return (event.connection_id, event.request_id)
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        if self._observers:
+            collection = event.command.get(event.command_name)
+            self._collections[self._key(event)] = collection if isinstance(collection, str) else ""
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.started(self._key(event), query_shape(event.command_name, event.command))
+
+    def _finished(self, event, failed: bool):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        duration_ms = event.duration_micros / 1000
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.finished(self._key(event), duration_ms)
+        collection = self._collections.pop(self._key(event), "")
+        for observer in self._observers:
+            try:
+                observer(event.command_name, collection, duration_ms / 1000, failed)
+            except Exception as e:
+                logger.error(f"Erro em observer de comandos: {e}")
+
+    def succeeded(self, event):
+        self._finished(event, failed=False)
+
+    def failed(self, event):
+        self._finished(event, failed=True)
+
+
+# Singleton global registrado em server.py
+command_monitor = CommandMonitor()
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app, repeat_threshold: int = DB_QUERY_REPEAT_THRESHOLD):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = current_query_stats.set(stats)
+        started_at = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append((b"server-timing", f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"'.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+            self._log(scope, stats, (time.perf_counter() - started_at) * 1000)
+
+    def _log(self, scope, stats: RequestQueryStats, elapsed_ms: float):
+        route = scope.get("route")
+        path = getattr(route, "path", None) or scope.get("path")
+        summary = (
+            f"{scope.get('method')} {path}: {stats.count} queries, "
+            f"db {stats.total_ms:.1f}ms / total {elapsed_ms:.1f}ms, "
+            f"mais lenta {stats.slowest or '-'} ({stats.slowest_ms:.1f}ms)"
+        )
+
+        repeated = stats.repeated_shapes(self.repeat_threshold)
+        if repeated:
+            details = "; ".join(f"{n}x {cmd} {coll} {spec}" for (cmd, coll, spec), n in repeated[:3])
+            logger.warning(f"Possível N+1 em {summary} | {details}")
+        elif stats.total_ms > DB_SLOW_REQUEST_MS:
+            logger.warning(f"Requisição lenta no banco: {summary}")
+        else:
+            logger.debug(summary)
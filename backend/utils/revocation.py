@@ -0,0 +1,108 @@
+"""
+Lista de revogação de tokens stateless (AUTH_MODE=stateless)
+
+Tokens stateless carregam user_id, flag de ativo, token_version (tv) e os
+papéis do usuário, e são validados sem consultar o banco. Para logout e
+desativação, mantemos em memória:
+
+- jtis revogados (logout de um token específico);
+- a menor token_version válida por usuário (troca de senha, desativação,
+  mudança de papéis invalidam todos os tokens anteriores).
+
+Os registros ficam na coleção token_revocations (TTL em expires_at) e a
+lista em memória é recarregada periodicamente para propagar revogações
+feitas por outros workers.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+from pymongo import ReturnDocument
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationList:
+    def __init__(self):
+        self.jtis: Dict[str, datetime] = {}
+        self.min_versions: Dict[str, int] = {}
+        self.refreshed_at: Optional[datetime] = None
+
+    def is_revoked(self, payload: Dict[str, Any]) -> bool:
+        if payload.get("jti") in self.jtis:
+            return True
+        return payload.get("tv", 0) < self.min_versions.get(payload.get("user_id"), 0)
+
+    def add_jti(self, jti: str, expires_at: datetime):
+        self.jtis[jti] = expires_at
+
+    def add_min_version(self, user_id: str, token_version: int):
+        if token_version > self.min_versions.get(user_id, 0):
+            self.min_versions[user_id] = token_version
+
+    async def refresh(self, db: AsyncIOMotorDatabase):
+        """Recarrega os registros ainda válidos do Mongo"""
+        now = datetime.now(timezone.utc)
+        jtis, min_versions = {}, {}
+        async for doc in db.token_revocations.find({"expires_at": {"$gt": now}}, {"_id": 0}):
+            if doc["kind"] == "jti":
+                jtis[doc["jti"]] = doc["expires_at"]
+            elif doc["kind"] == "user":
+                min_versions[doc["user_id"]] = max(min_versions.get(doc["user_id"], 0), doc["token_version"])
+        self.jtis = jtis
+        self.min_versions = min_versions
+        self.refreshed_at = now
+
+    async def run_refresher(self, db: AsyncIOMotorDatabase, interval_seconds: int):
+        while True:
+            try:
+                await self.refresh(db)
+            except Exception as e:
+                logger.error(f"Erro ao recarregar lista de revogação: {e}")
+            await asyncio.sleep(interval_seconds)
+
+
+# Singleton global usado por utils/auth
+revocation_list = RevocationList()
+
+
+async def revoke_jti(db: AsyncIOMotorDatabase, jti: str, user_id: str, expires_at: datetime):
+    """Revoga um único token (logout)"""
+    revocation_list.add_jti(jti, expires_at)
+    await db.token_revocations.insert_one({
+        "id": str(uuid.uuid4()),
+        "kind": "jti",
+        "jti": jti,
+        "user_id": user_id,
+        "expires_at": expires_at,
+        "created_at": datetime.now(timezone.utc)
+    })
+
+
+async def revoke_user_tokens(db: AsyncIOMotorDatabase, user_id: str, expires_at: datetime) -> Optional[int]:
+    """
+    Incrementa users.token_version, invalidando todos os tokens já emitidos
+    para o usuário. expires_at deve cobrir a validade máxima de um token.
+    """
+    user = await db.users.find_one_and_update(
+        {"id": user_id},
+        {"$inc": {"token_version": 1}},
+        projection={"_id": 0, "token_version": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if not user:
+        return None
+
+    token_version = user["token_version"]
+    revocation_list.add_min_version(user_id, token_version)
+    await db.token_revocations.insert_one({
+        "id": str(uuid.uuid4()),
+        "kind": "user",
+        "user_id": user_id,
+        "token_version": token_version,
+        "expires_at": expires_at,
+        "created_at": datetime.now(timezone.utc)
+    })
+    return token_version
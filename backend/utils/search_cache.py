@@ -0,0 +1,93 @@
+"""
+Cache de resultados da busca avançada de candidatos
+
+Guarda, por escopo de tenant e conjunto de filtros canonicalizado, a lista
+ordenada de ids que casaram com a busca. As páginas seguintes (cursor) e as
+variações de limit/include_total são servidas da lista, sem repetir a
+consulta de filtros nem a contagem; só os documentos da página são lidos.
+
+Invalidação por contador de versão: escritas que alteram a pertinência de
+um candidato aos filtros (perfil, endereço, skills, nome/e-mail do usuário,
+criação de candidato) chamam bump(), e entradas de versões anteriores são
+descartadas na leitura. O contador é por processo; o TTL limita a
+defasagem vista pelos demais workers.
+
+Resultados com mais de ADVANCED_SEARCH_CACHE_MAX_IDS ids não são cacheados
+(ficam marcados para ir direto ao caminho paginado no banco).
+"""
+import json
+import os
+import threading
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+from cachetools import TTLCache
+
+ADVANCED_SEARCH_CACHE_ENABLED = os.getenv("ADVANCED_SEARCH_CACHE_ENABLED", "true").lower() == "true"
+ADVANCED_SEARCH_CACHE_TTL_SECONDS = int(os.getenv("ADVANCED_SEARCH_CACHE_TTL_SECONDS", "120"))
+ADVANCED_SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("ADVANCED_SEARCH_CACHE_MAX_ENTRIES", "512"))
+ADVANCED_SEARCH_CACHE_MAX_IDS = int(os.getenv("ADVANCED_SEARCH_CACHE_MAX_IDS", "20000"))
+
+# Marca de resultado grande demais para o cache
+TOO_LARGE = object()
+
+
+def canonical_key(tenant_ids: List[str], filters: Dict[str, Any]) -> str:
+    """Chave estável: tenants ordenados + filtros sem vazios, com chaves ordenadas"""
+    cleaned = {k: v for k, v in filters.items() if v not in (None, "", [])}
+    return json.dumps({"t": sorted(tenant_ids), "f": cleaned}, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class SearchResultCache:
+    def __init__(
+        self,
+        maxsize: int = ADVANCED_SEARCH_CACHE_MAX_ENTRIES,
+        ttl: int = ADVANCED_SEARCH_CACHE_TTL_SECONDS,
+        max_ids: int = ADVANCED_SEARCH_CACHE_MAX_IDS
+    ):
+        # TTLCache também é LRU: ao atingir maxsize, descarta o menos usado
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.max_ids = max_ids
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        """Lista de ids (ordenada), TOO_LARGE, ou None (miss)"""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] == self.version:
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._cache.pop(key, None)
+            self.misses += 1
+            return None
+
+    def set(self, key: str, ids: Optional[List[str]], version: int):
+        """Guarda a lista de ids (None = grande demais) lida na versão informada"""
+        with self._lock:
+            if version != self.version:
+                return
+            self._cache[key] = (version, TOO_LARGE if ids is None else ids)
+
+    def bump(self):
+        """Invalida todas as entradas (escrita que afeta a busca)"""
+        with self._lock:
+            self.version += 1
+            self._cache.clear()
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+def page_from_ids(ids: List[str], limit: int, after: Optional[str]) -> Tuple[List[str], bool]:
+    """Página de ids após o cursor (ids ordenados); retorna (ids da página, há mais)"""
+    start = bisect_right(ids, after) if after is not None else 0
+    page = ids[start:start + limit]
+    return page, start + limit < len(ids)
+
+
+# Singleton global usado pela busca avançada
+search_cache = SearchResultCache()
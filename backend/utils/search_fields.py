@@ -0,0 +1,30 @@
+"""
+Campos normalizados de vagas (jobs.search) e skills (skills.search)
+
+Mesma ideia de candidates.search (utils/candidate_search.py): a forma
+normalizada é gravada junto com o documento, e filtros, matching e
+deduplicação comparam por igualdade indexada nesses campos.
+"""
+from typing import Any, Dict, Optional
+from utils.text_normalization import normalize_city, normalize_state, normalize_skill
+
+# Incrementar ao mudar a normalização dos campos (o backfill recalcula os antigos)
+JOB_SEARCH_VERSION = 1
+SKILL_SEARCH_VERSION = 1
+
+JOB_PROJECTION = {"_id": 1, "location_city": 1, "location_state": 1}
+SKILL_PROJECTION = {"_id": 1, "name": 1}
+
+
+def build_job_search_fields(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Monta jobs.search a partir da vaga"""
+    return {
+        "city": normalize_city(job.get("location_city")),
+        "state": normalize_state(job.get("location_state")),
+        "v": JOB_SEARCH_VERSION,
+    }
+
+
+def build_skill_search_fields(name: Optional[str]) -> Dict[str, Any]:
+    """Monta skills.search a partir do nome da skill"""
+    return {"name": normalize_skill(name), "v": SKILL_SEARCH_VERSION}
@@ -0,0 +1,165 @@
+"""
+Busca semântica de candidatos com embeddings locais
+
+Cada candidato vira um texto (resumo profissional, formação e skills),
+embutido pelo embedder local (utils/vector_index.py) e guardado em um
+VectorIndex em memória.
+
+Atenção: sem EMBEDDING_MODEL (e o pacote opcional sentence-transformers,
+fora de requirements.txt por depender de torch) o embedder é o
+HashingEmbedder, ou seja, a busca "por IA" é lexical: tolera acentos,
+plurais e grafias próximas, mas não entende sinônimos. O startup registra
+um aviso nesse caso, e a busca avançada devolve ranking_mode = "lexical"
+para o front não anunciar ranking semântico. A consulta é embutida da mesma forma e respondida
+por top-K de similaridade, opcionalmente restrita aos ids que passaram
+pelos filtros estruturados da busca avançada.
+
+O índice é construído no startup (com o catálogo de skills em cache,
+atualizado por POST /skills), atualizado incrementalmente quando o
+perfil ou as skills do candidato mudam e reconstruído periodicamente para
+absorver escritas de outros workers. O embedding roda no executor padrão
+para não bloquear o event loop.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from utils.vector_index import VectorIndex, create_embedder
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_INDEX_ENABLED = os.getenv("SEMANTIC_INDEX_ENABLED", "true").lower() == "true"
+# Reconstrução completa periódica; 0 constrói só no startup
+SEMANTIC_INDEX_REFRESH_SECONDS = int(os.getenv("SEMANTIC_INDEX_REFRESH_SECONDS", "3600"))
+
+CANDIDATE_PROJECTION = {
+    "_id": 0, "id": 1, "professional_summary": 1, "education_level": 1,
+    "education_area": 1, "education_course": 1, "education_institution": 1,
+}
+
+
+def candidate_text(candidate: Dict, skill_names: List[str]) -> str:
+    """Texto do perfil usado no embedding"""
+    parts = [
+        candidate.get("professional_summary"),
+        candidate.get("education_course"),
+        candidate.get("education_area"),
+        candidate.get("education_institution"),
+        (candidate.get("education_level") or "").replace("_", " "),
+        ", ".join(skill_names),
+    ]
+    return ". ".join(p for p in parts if p)
+
+
+class CandidateSemanticIndex:
+    def __init__(self):
+        self.ready = False
+        self.built_at: Optional[datetime] = None
+        self._embedder = None
+        self._index: Optional[VectorIndex] = None
+        # Candidatos alterados durante uma reconstrução, reprocessados ao final
+        self._building = False
+        self._pending: Set[str] = set()
+        # skill_id -> nome; carregado no build e mantido por add_skill
+        self._skill_names: Dict[str, str] = {}
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            self._embedder = create_embedder()
+        return self._embedder
+
+    @property
+    def ranking_mode(self) -> str:
+        """'semantic' com modelo de embeddings; 'lexical' com o HashingEmbedder"""
+        return "lexical" if self.embedder.name == "hashing" else "semantic"
+
+    async def _embed(self, texts: List[str]):
+        return await asyncio.get_running_loop().run_in_executor(None, self.embedder.embed, texts)
+
+    async def _embed_candidates(self, db: AsyncIOMotorDatabase, candidates: List[Dict], skill_names: Dict[str, str]):
+        candidate_skills = await db.candidate_skills.find(
+            {"candidate_id": {"$in": [c["id"] for c in candidates]}},
+            {"_id": 0, "candidate_id": 1, "skill_id": 1}
+        ).to_list(None)
+        skills_by_candidate: Dict[str, List[str]] = {}
+        for cs in candidate_skills:
+            if cs["skill_id"] in skill_names:
+                skills_by_candidate.setdefault(cs["candidate_id"], []).append(skill_names[cs["skill_id"]])
+        texts = [candidate_text(c, skills_by_candidate.get(c["id"], [])) for c in candidates]
+        return await self._embed(texts)
+
+    async def _load_skill_names(self, db: AsyncIOMotorDatabase) -> Dict[str, str]:
+        return {s["id"]: s["name"] async for s in db.skills.find({}, {"_id": 0, "id": 1, "name": 1})}
+
+    def add_skill(self, skill_id: str, name: str):
+        """Registra uma skill nova no catálogo em cache (POST /skills)"""
+        self._skill_names[skill_id] = name
+
+    async def build(self, db: AsyncIOMotorDatabase, batch_size: int = 1000):
+        """Reconstrói o índice a partir de todos os candidatos"""
+        self._building = True
+        self._pending = set()
+        try:
+            index = VectorIndex(self.embedder.dim)
+            skill_names = await self._load_skill_names(db)
+            self._skill_names = skill_names
+            batch = []
+            async for candidate in db.candidates.find({}, CANDIDATE_PROJECTION).batch_size(batch_size):
+                batch.append(candidate)
+                if len(batch) >= batch_size:
+                    index.upsert_many([c["id"] for c in batch], await self._embed_candidates(db, batch, skill_names))
+                    batch = []
+            if batch:
+                index.upsert_many([c["id"] for c in batch], await self._embed_candidates(db, batch, skill_names))
+
+            pending = list(self._pending)
+            if pending:
+                candidates = await db.candidates.find({"id": {"$in": pending}}, CANDIDATE_PROJECTION).to_list(None)
+                if candidates:
+                    index.upsert_many([c["id"] for c in candidates], await self._embed_candidates(db, candidates, skill_names))
+
+            self._index = index
+            self.built_at = datetime.now(timezone.utc)
+            self.ready = True
+        finally:
+            self._building = False
+            self._pending = set()
+
+    async def refresh_candidate(self, db: AsyncIOMotorDatabase, candidate_id: str):
+        """Re-embute um candidato após alteração de perfil ou skills"""
+        if self._building:
+            self._pending.add(candidate_id)
+        if not self.ready:
+            return
+        candidate = await db.candidates.find_one({"id": candidate_id}, CANDIDATE_PROJECTION)
+        if not candidate:
+            self._index.remove(candidate_id)
+            return
+        vectors = await self._embed_candidates(db, [candidate], self._skill_names)
+        self._index.upsert_many([candidate_id], vectors)
+
+    async def search(self, query: str, k: int, allowed_ids: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """Top-K (candidate_id, similaridade) para a consulta em linguagem natural"""
+        vector = (await self._embed([query]))[0]
+        return [(candidate_id, score) for candidate_id, score in self._index.search(vector, k, allowed_ids) if score > 0]
+
+    async def run_refresher(self, db: AsyncIOMotorDatabase, interval_seconds: int):
+        while True:
+            try:
+                await self.build(db)
+                logger.info(f"Índice semântico: {len(self._index)} candidatos ({self.embedder.name})")
+                if self.embedder.name == "hashing":
+                    logger.warning("Busca semântica em modo lexical (hashing): defina EMBEDDING_MODEL e instale sentence-transformers para embeddings reais")
+            except Exception as e:
+                logger.error(f"Erro ao construir índice semântico: {e}")
+            if interval_seconds <= 0 and self.ready:
+                return
+            await asyncio.sleep(interval_seconds if interval_seconds > 0 else 60)
+
+
+# Singleton global usado pela busca avançada
+semantic_index = CandidateSemanticIndex()
@@ -0,0 +1,114 @@
+"""
+Cache em memória de sessões resolvidas (token -> usuário e papéis)
+
+Evita as duas consultas (user_sessions + users) de get_current_user em
+requisições repetidas com o mesmo token. As entradas expiram por TTL e o
+cache é limitado em tamanho (LRU). Rotas que alteram o usuário ou a sessão
+devem invalidar explicitamente (invalidate_token / invalidate_user), inclusive
+ao alterar os papéis (user_org_roles) do usuário.
+"""
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Set
+from cachetools import TTLCache
+
+SESSION_CACHE_TTL_SECONDS = int(os.getenv("SESSION_CACHE_TTL_SECONDS", "60"))
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "10000"))
+
+
+class SessionCache:
+    def __init__(self, maxsize: int = SESSION_CACHE_MAX_ENTRIES, ttl: int = SESSION_CACHE_TTL_SECONDS):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._tokens_by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Retorna uma cópia do usuário em cache, ou None (miss)"""
+        with self._lock:
+            entry = self._cache.get(token)
+            if entry is not None:
+                user, expires_at, _ = entry
+                if expires_at is None or expires_at > datetime.now(timezone.utc):
+                    self.hits += 1
+                    return dict(user)
+                self._pop(token)
+            self.misses += 1
+            return None
+
+    def get_roles(self, token: str) -> Optional[List[Dict[str, Any]]]:
+        """Retorna os papéis (user_org_roles) em cache para o token, se carregados"""
+        with self._lock:
+            entry = self._cache.get(token)
+            if entry is None or entry[2] is None:
+                return None
+            return list(entry[2])
+
+    def set(
+        self,
+        token: str,
+        user: Dict[str, Any],
+        expires_at: Optional[datetime] = None,
+        roles: Optional[List[Dict[str, Any]]] = None
+    ):
+        """Guarda o usuário resolvido; expires_at limita a validade à da sessão"""
+        with self._lock:
+            self._cache[token] = (dict(user), expires_at, list(roles) if roles is not None else None)
+            # Descartar tokens do usuário que já saíram do cache (TTL/LRU)
+            tokens = {t for t in self._tokens_by_user.get(user["id"], set()) if t in self._cache}
+            tokens.add(token)
+            self._tokens_by_user[user["id"]] = tokens
+
+    def set_roles(self, token: str, roles: List[Dict[str, Any]]):
+        with self._lock:
+            entry = self._cache.get(token)
+            if entry is not None:
+                self._cache[token] = (entry[0], entry[1], list(roles))
+
+    def invalidate_token(self, token: str):
+        with self._lock:
+            if self._pop(token):
+                self.invalidations += 1
+
+    def invalidate_user(self, user_id: str):
+        """Remove todas as sessões em cache de um usuário"""
+        with self._lock:
+            for token in self._tokens_by_user.pop(user_id, set()):
+                if self._cache.pop(token, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._tokens_by_user.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "ttl": self._cache.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+    def _pop(self, token: str) -> bool:
+        entry = self._cache.pop(token, None)
+        if entry is None:
+            return False
+        tokens = self._tokens_by_user.get(entry[0]["id"])
+        if tokens:
+            tokens.discard(token)
+            if not tokens:
+                self._tokens_by_user.pop(entry[0]["id"], None)
+        return True
+
+
+# Singleton global usado por utils/auth.get_current_user
+session_cache = SessionCache()
@@ -0,0 +1,62 @@
+"""
+Armazenamento de sessões (user_sessions)
+
+As sessões expiram pelo índice TTL em expires_at (utils/indexes.py), que só
+atua sobre valores do tipo data: expires_at é sempre gravado como datetime
+UTC. Documentos antigos com expires_at em string ISO ou ausente são
+convertidos por migrate_sessions.py.
+
+O sweeper em background é uma rede de segurança para quando o índice TTL
+ainda não existe (ex.: criação falhou no startup); o monitor de TTL do
+Mongo continua sendo o mecanismo principal de remoção.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+logger = logging.getLogger(__name__)
+
+SESSION_EXPIRE_DAYS = int(os.getenv("SESSION_EXPIRE_DAYS", "7"))
+# 0 desativa o sweeper
+SESSION_SWEEP_INTERVAL_SECONDS = int(os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", "3600"))
+
+
+def session_expiry(start: Optional[datetime] = None) -> datetime:
+    """Data de expiração de uma sessão criada em start (padrão: agora)"""
+    return (start or datetime.now(timezone.utc)) + timedelta(days=SESSION_EXPIRE_DAYS)
+
+
+def to_utc_datetime(value: Any) -> Optional[datetime]:
+    """Normaliza datetime ingênuo ou string ISO para datetime UTC"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+async def sweep_expired_sessions(db: AsyncIOMotorDatabase) -> int:
+    """Remove sessões já expiradas; retorna quantas foram removidas"""
+    result = await db.user_sessions.delete_many({"expires_at": {"$lt": datetime.now(timezone.utc)}})
+    return result.deleted_count
+
+
+async def run_session_sweeper(db: AsyncIOMotorDatabase, interval_seconds: int):
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            deleted = await sweep_expired_sessions(db)
+            if deleted:
+                logger.info(f"Sessões expiradas removidas: {deleted}")
+        except Exception as e:
+            logger.error(f"Erro ao remover sessões expiradas: {e}")
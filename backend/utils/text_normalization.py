@@ -0,0 +1,214 @@
+"""
+Normalização de texto em português para busca, matching e deduplicação
+
+Todas as comparações de nomes, cidades, estados, instituições e skills
+passam por aqui, e as formas normalizadas são gravadas em campos "sombra"
+(candidates.search, jobs.search, skills.search) para que a comparação vire
+igualdade indexada no Mongo.
+
+- normalize_text: minúsculas, sem acentos, espaços colapsados ("São  Paulo"
+  -> "sao paulo"). Base de todas as outras e do texto livre.
+- clean_text: normalize_text + pontuação vira espaço ("Node.js" ->
+  "node js"); preserva + e # (C++, C#).
+- normalize_city / normalize_state / normalize_institution: clean_text +
+  expansão de abreviações comuns (SP -> sao paulo, USP -> universidade de
+  sao paulo, "Univ. Federal" -> universidade federal). Cidade descarta a UF
+  no final ("São Paulo - SP" -> sao paulo); estado vira a sigla ("São
+  Paulo" -> sp).
+- normalize_skill: clean_text (sem expansão).
+- stem / stem_text: stemming leve (plural -> singular), opcional.
+
+As funções por tipo são memoizadas (valores como cidades se repetem muito),
+e normalize_many aplica uma delas a um lote, para backfills.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, Optional
+
+_WHITESPACE = re.compile(r"\s+")
+_PUNCTUATION = re.compile(r"[^\w\s+#]|_")
+
+STATES = {
+    "ac": "acre", "al": "alagoas", "ap": "amapa", "am": "amazonas", "ba": "bahia",
+    "ce": "ceara", "df": "distrito federal", "es": "espirito santo", "go": "goias",
+    "ma": "maranhao", "mt": "mato grosso", "ms": "mato grosso do sul", "mg": "minas gerais",
+    "pa": "para", "pb": "paraiba", "pr": "parana", "pe": "pernambuco", "pi": "piaui",
+    "rj": "rio de janeiro", "rn": "rio grande do norte", "rs": "rio grande do sul",
+    "ro": "rondonia", "rr": "roraima", "sc": "santa catarina", "sp": "sao paulo",
+    "se": "sergipe", "to": "tocantins",
+}
+_STATE_BY_NAME = {name: uf for uf, name in STATES.items()}
+
+# Apelidos/siglas de cidades (valor inteiro, já limpo)
+CITY_ALIASES = {
+    "sp": "sao paulo", "sampa": "sao paulo", "rj": "rio de janeiro", "bh": "belo horizonte",
+    "bhz": "belo horizonte", "bsb": "brasilia", "cwb": "curitiba", "floripa": "florianopolis",
+    "ssa": "salvador", "sjc": "sao jose dos campos", "sjrp": "sao jose do rio preto",
+}
+# Abreviações da primeira palavra de nomes de cidades ("S. Paulo", "Sto. André")
+CITY_TOKENS = {"sta": "santa", "sto": "santo", "s": "sao"}
+
+# Siglas de instituições (valor inteiro, já limpo)
+INSTITUTION_ALIASES = {
+    "usp": "universidade de sao paulo",
+    "unicamp": "universidade estadual de campinas",
+    "unesp": "universidade estadual paulista",
+    "unifesp": "universidade federal de sao paulo",
+    "ufrj": "universidade federal do rio de janeiro",
+    "ufmg": "universidade federal de minas gerais",
+    "ufrgs": "universidade federal do rio grande do sul",
+    "ufsc": "universidade federal de santa catarina",
+    "ufpr": "universidade federal do parana",
+    "ufpe": "universidade federal de pernambuco",
+    "ufba": "universidade federal da bahia",
+    "ufc": "universidade federal do ceara",
+    "unb": "universidade de brasilia",
+    "uerj": "universidade do estado do rio de janeiro",
+    "puc sp": "pontificia universidade catolica de sao paulo",
+    "pucsp": "pontificia universidade catolica de sao paulo",
+    "puc rio": "pontificia universidade catolica do rio de janeiro",
+    "pucrs": "pontificia universidade catolica do rio grande do sul",
+    "puc rs": "pontificia universidade catolica do rio grande do sul",
+    "puc minas": "pontificia universidade catolica de minas gerais",
+    "fgv": "fundacao getulio vargas",
+    "ita": "instituto tecnologico de aeronautica",
+    "mackenzie": "universidade presbiteriana mackenzie",
+}
+# Abreviações de palavras em nomes de instituições
+INSTITUTION_TOKENS = {
+    "univ": "universidade", "fac": "faculdade", "fed": "federal", "est": "estadual",
+    "inst": "instituto", "pont": "pontificia", "cat": "catolica",
+}
+
+# Plural -> singular, na ordem de tentativa (sufixo, substituição)
+_PLURAL_RULES = (
+    ("oes", "ao"), ("aes", "ao"), ("ais", "al"), ("eis", "el"), ("ois", "ol"),
+    ("res", "r"), ("zes", "z"), ("ns", "m"),
+)
+_PLURAL_KEEP = ("ss", "us", "is")
+
+
+def fold_accents(value: str) -> str:
+    """Remove acentos/diacríticos (ç -> c, ã -> a)"""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def normalize_text(value: Any) -> Optional[str]:
+    """Minúsculas, sem acentos e com espaços colapsados; None para vazio"""
+    if value is None:
+        return None
+    text = _WHITESPACE.sub(" ", fold_accents(str(value)).lower()).strip()
+    return text or None
+
+
+@lru_cache(maxsize=65536)
+def clean_text(value: Any) -> Optional[str]:
+    """normalize_text sem pontuação (preserva + e #, de C++ e C#)"""
+    text = normalize_text(value)
+    if text is None:
+        return None
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", text)).strip() or None
+
+
+def _expand_tokens(text: str, tokens: dict) -> str:
+    return " ".join(tokens.get(word, word) for word in text.split())
+
+
+@lru_cache(maxsize=65536)
+def normalize_city(value: Any) -> Optional[str]:
+    """Cidade canônica: "São Paulo - SP", "S. Paulo", "SP" -> "sao paulo" """
+    text = clean_text(value)
+    if text is None:
+        return None
+    if text in CITY_ALIASES:
+        return CITY_ALIASES[text]
+    words = text.split()
+    # "Campinas SP" / "Campinas/SP": descarta a UF final
+    if len(words) > 1 and words[-1] in STATES:
+        words = words[:-1]
+    if len(words) > 1:
+        words[0] = CITY_TOKENS.get(words[0], words[0])
+    text = " ".join(words)
+    return CITY_ALIASES.get(text, text)
+
+
+@lru_cache(maxsize=4096)
+def normalize_state(value: Any) -> Optional[str]:
+    """Estado como sigla minúscula: "São Paulo", "SP" -> "sp" (nomes desconhecidos ficam limpos)"""
+    text = clean_text(value)
+    if text is None:
+        return None
+    if text in STATES:
+        return text
+    return _STATE_BY_NAME.get(text, text)
+
+
+@lru_cache(maxsize=65536)
+def normalize_institution(value: Any) -> Optional[str]:
+    """Instituição canônica: "USP", "Univ. de São Paulo" -> "universidade de sao paulo" """
+    text = clean_text(value)
+    if text is None:
+        return None
+    if text in INSTITUTION_ALIASES:
+        return INSTITUTION_ALIASES[text]
+    text = _expand_tokens(text, INSTITUTION_TOKENS)
+    return INSTITUTION_ALIASES.get(text, text)
+
+
+def _normalize_prefix(value: Any, tokens: dict, first_word_only: bool = False) -> Optional[str]:
+    """
+    Prefixo digitado no autocomplete: só acento/caixa/pontuação, mais a
+    expansão de abreviações nas palavras já completas. A palavra sendo
+    digitada nunca é expandida nem descartada ("sao pa" não vira "sao" por
+    "pa" parecer uma UF), então o prefixo só cresce enquanto se digita.
+    """
+    text = clean_text(value)
+    if text is None:
+        return None
+    words = text.split()
+    complete = len(words) if not str(value)[-1:].isalnum() else len(words) - 1
+    for i in range(min(complete, 1) if first_word_only else complete):
+        words[i] = tokens.get(words[i], words[i])
+    return " ".join(words)
+
+
+def normalize_city_prefix(value: Any) -> Optional[str]:
+    """Prefixo comparável com as chaves de normalize_city (ver _normalize_prefix)"""
+    return _normalize_prefix(value, CITY_TOKENS, first_word_only=True)
+
+
+def normalize_institution_prefix(value: Any) -> Optional[str]:
+    """Prefixo comparável com as chaves de normalize_institution (ver _normalize_prefix)"""
+    return _normalize_prefix(value, INSTITUTION_TOKENS)
+
+
+def normalize_skill(value: Any) -> Optional[str]:
+    """Nome de skill para comparação e deduplicação ("Node.JS" -> "node js")"""
+    return clean_text(value)
+
+
+def stem(word: str) -> str:
+    """Stemming leve: reduz o plural ao singular (gestores -> gestor, ações -> acao)"""
+    if len(word) <= 3:
+        return word
+    for suffix, replacement in _PLURAL_RULES:
+        if word.endswith(suffix):
+            return word[:-len(suffix)] + replacement
+    if word.endswith("s") and not word.endswith(_PLURAL_KEEP):
+        return word[:-1]
+    return word
+
+
+def stem_text(value: Any) -> Optional[str]:
+    """clean_text com cada palavra reduzida por stem()"""
+    text = clean_text(value)
+    if text is None:
+        return None
+    return " ".join(stem(word) for word in text.split())
+
+
+def normalize_many(values: Iterable[Any], normalizer: Callable[[Any], Optional[str]] = normalize_text) -> List[Optional[str]]:
+    """Aplica um normalizador a um lote (memoizado por valor distinto)"""
+    return [normalizer(value) for value in values]
@@ -0,0 +1,213 @@
+"""
+Autocomplete (typeahead) de filtros a partir de tries em memória
+
+Para cada campo (cidade, instituição, área de formação e skills) mantemos
+uma trie dos valores distintos, indexada pela forma normalizada do campo
+(a mesma de candidates.search) e com a contagem de candidatos. O prefixo
+digitado passa por um normalizador próprio, que só dobra acento/caixa (e
+expande abreviações de palavras já completas), para as sugestões não
+"voltarem" enquanto se digita; siglas completas continuam valendo ("sp"
+sugere "São Paulo" antes das completions de "sp"). Cada nó guarda o top-N das
+completions abaixo dele, recalculado sob demanda só nos ramos alterados,
+então a resposta custa o tamanho do prefixo, não o número de valores.
+
+O valor sugerido é a grafia original mais frequente; como a busca avançada
+compara campos normalizados, escolher uma sugestão gera um filtro exato e
+indexado.
+
+As tries são construídas no startup, atualizadas incrementalmente nas
+escritas (perfil, endereço, skills) e reconstruídas periodicamente para
+absorver escritas de outros workers.
+"""
+import asyncio
+import heapq
+import logging
+import os
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from utils.text_normalization import (
+    normalize_skill, clean_text, normalize_city_prefix, normalize_institution_prefix
+)
+from utils.candidate_search import KEY_NORMALIZERS
+
+logger = logging.getLogger(__name__)
+
+TYPEAHEAD_ENABLED = os.getenv("TYPEAHEAD_ENABLED", "true").lower() == "true"
+TYPEAHEAD_REFRESH_SECONDS = int(os.getenv("TYPEAHEAD_REFRESH_SECONDS", "600"))
+TYPEAHEAD_MAX_RESULTS = 20
+
+# Campo do typeahead -> campo do candidato
+CANDIDATE_FIELDS = {
+    "city": "location_city",
+    "institution": "education_institution",
+    "area": "education_area",
+}
+FIELDS = list(CANDIDATE_FIELDS) + ["skill"]
+# Campo do typeahead -> normalizador (o mesmo dos campos de busca)
+NORMALIZERS = {
+    "city": KEY_NORMALIZERS["city"],
+    "institution": KEY_NORMALIZERS["education_institution"],
+    "area": KEY_NORMALIZERS["education_area"],
+    "skill": normalize_skill,
+}
+# Campo do typeahead -> normalizador do prefixo digitado (seguro para prefixos)
+PREFIX_NORMALIZERS = {
+    "city": normalize_city_prefix,
+    "institution": normalize_institution_prefix,
+    "area": clean_text,
+    "skill": normalize_skill,
+}
+
+
+class _Node:
+    __slots__ = ("children", "count", "key", "top", "dirty")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.count = 0
+        self.key: Optional[str] = None
+        self.top: List[Tuple[int, str]] = []
+        self.dirty = False
+
+
+class PrefixTrie:
+    def __init__(self, normalizer: Callable[[str], Optional[str]], max_results: int = TYPEAHEAD_MAX_RESULTS,
+                 prefix_normalizer: Optional[Callable[[str], Optional[str]]] = None):
+        self.normalizer = normalizer
+        self.prefix_normalizer = prefix_normalizer or normalizer
+        self.max_results = max_results
+        self._root = _Node()
+        self._labels: Dict[str, Counter] = {}
+
+    def add(self, value: Optional[str], count: int = 1):
+        """Soma count (pode ser negativo) ao valor; count=0 só registra o valor"""
+        key = self.normalizer(value)
+        if not key:
+            return
+        node = self._root
+        node.dirty = True
+        for ch in key:
+            node = node.children.setdefault(ch, _Node())
+            node.dirty = True
+        node.key = key
+        node.count = max(0, node.count + count)
+
+        labels = self._labels.setdefault(key, Counter())
+        labels[value.strip()] += count
+        if labels[value.strip()] <= 0 and len(labels) > 1:
+            del labels[value.strip()]
+
+    def _refresh(self, node: _Node) -> List[Tuple[int, str]]:
+        if not node.dirty:
+            return node.top
+        items = [(node.count, node.key)] if node.count > 0 else []
+        for child in node.children.values():
+            items.extend(self._refresh(child))
+        node.top = heapq.nlargest(self.max_results, items, key=lambda item: item[0])
+        node.dirty = False
+        return node.top
+
+    def warm(self):
+        """Calcula o top-N de todos os nós (após carga em massa)"""
+        self._refresh(self._root)
+
+    def _find(self, key: str) -> Optional[_Node]:
+        node = self._root
+        for ch in key:
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Dict[str, object]]:
+        """Valores que começam com o prefixo (normalizado), mais frequentes primeiro"""
+        node = self._find(self.prefix_normalizer(prefix) or "")
+        items = list(self._refresh(node)[:limit]) if node is not None else []
+        # Sigla/alias completo ("sp" -> "sao paulo"): o valor exato vem primeiro
+        exact_key = self.normalizer(prefix)
+        exact = self._find(exact_key) if exact_key else None
+        if exact is not None and exact.key == exact_key and exact.count > 0 and all(key != exact_key for _, key in items):
+            items = [(exact.count, exact_key)] + items[:limit - 1]
+        return [
+            {"value": self._labels[key].most_common(1)[0][0], "count": count}
+            for count, key in items
+        ]
+
+
+def _new_trie(field: str) -> PrefixTrie:
+    return PrefixTrie(NORMALIZERS[field], prefix_normalizer=PREFIX_NORMALIZERS[field])
+
+
+class TypeaheadIndex:
+    def __init__(self):
+        self.ready = False
+        self._tries: Dict[str, PrefixTrie] = {field: _new_trie(field) for field in FIELDS}
+        self._skill_names: Dict[str, str] = {}
+
+    def complete(self, field: str, prefix: str, limit: int = 10) -> List[Dict[str, object]]:
+        return self._tries[field].complete(prefix, limit)
+
+    # ---- atualização incremental ----
+
+    def update_candidate(self, old: Optional[Dict], new: Dict):
+        """Ajusta as contagens após alteração de perfil/endereço (old = documento anterior)"""
+        for field, candidate_field in CANDIDATE_FIELDS.items():
+            old_value = (old or {}).get(candidate_field)
+            new_value = new.get(candidate_field, old_value)
+            if NORMALIZERS[field](old_value) == NORMALIZERS[field](new_value):
+                continue
+            if old_value:
+                self._tries[field].add(old_value, -1)
+            if new_value:
+                self._tries[field].add(new_value, 1)
+
+    def add_candidate_skill(self, skill_id: str):
+        name = self._skill_names.get(skill_id)
+        if name:
+            self._tries["skill"].add(name, 1)
+
+    def add_skill(self, skill_id: str, name: str):
+        self._skill_names[skill_id] = name
+        self._tries["skill"].add(name, 0)
+
+    # ---- construção ----
+
+    async def build(self, db: AsyncIOMotorDatabase):
+        """Reconstrói todas as tries com agregações de valores distintos"""
+        tries = {field: _new_trie(field) for field in FIELDS}
+        for field, candidate_field in CANDIDATE_FIELDS.items():
+            pipeline = [
+                {"$match": {candidate_field: {"$nin": [None, ""]}}},
+                {"$group": {"_id": f"${candidate_field}", "count": {"$sum": 1}}}
+            ]
+            async for row in db.candidates.aggregate(pipeline):
+                tries[field].add(row["_id"], row["count"])
+
+        skill_names = {s["id"]: s["name"] async for s in db.skills.find({}, {"_id": 0, "id": 1, "name": 1})}
+        skill_counts = {
+            row["_id"]: row["count"]
+            async for row in db.candidate_skills.aggregate([{"$group": {"_id": "$skill_id", "count": {"$sum": 1}}}])
+        }
+        for skill_id, name in skill_names.items():
+            tries["skill"].add(name, skill_counts.get(skill_id, 0))
+        for trie in tries.values():
+            trie.warm()
+
+        self._tries = tries
+        self._skill_names = skill_names
+        self.ready = True
+
+    async def run_refresher(self, db: AsyncIOMotorDatabase, interval_seconds: int):
+        while True:
+            try:
+                await self.build(db)
+            except Exception as e:
+                logger.error(f"Erro ao construir tries de autocomplete: {e}")
+            if interval_seconds <= 0 and self.ready:
+                return
+            await asyncio.sleep(interval_seconds if interval_seconds > 0 else 60)
+
+
+# Singleton global usado pelas rotas
+typeahead_index = TypeaheadIndex()
@@ -0,0 +1,194 @@
+"""
+Embeddings locais e índice vetorial em memória (NumPy)
+
+Embedders:
+- HashingEmbedder (padrão): roda só com NumPy, sem download de modelo.
+  Palavras normalizadas (sem acento), bigramas e trigramas de caracteres
+  são projetados por hashing em um vetor de dimensão fixa e normalizados
+  (L2). Captura sobreposição lexical e variações de grafia, não sinônimos.
+- SentenceTransformerEmbedder: usado quando EMBEDDING_MODEL está definido e
+  o pacote sentence-transformers está instalado (ex.:
+  "paraphrase-multilingual-MiniLM-L12-v2", que roda em CPU). O pacote é
+  opcional e não está em requirements.txt (depende de torch); sem ele a
+  busca semântica é, na prática, lexical.
+
+VectorIndex guarda os vetores em uma matriz float32 contígua e responde
+top-K por produto interno (similaridade de cosseno). Até
+VECTOR_ANN_THRESHOLD vetores a busca é exata (força bruta); acima disso
+usa uma partição IVF (k-means em NumPy) e examina apenas as listas mais
+próximas da consulta. Buscas restritas a um subconjunto de ids (filtros
+estruturados) são sempre exatas sobre o subconjunto.
+"""
+import hashlib
+import logging
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.text_normalization import normalize_text, stem
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "")
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "512"))
+VECTOR_ANN_THRESHOLD = int(os.getenv("VECTOR_ANN_THRESHOLD", "50000"))
+VECTOR_ANN_PROBES = int(os.getenv("VECTOR_ANN_PROBES", "8"))
+
+_TOKEN = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    name = "hashing"
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[Tuple[str, float]]:
+        words = _TOKEN.findall(normalize_text(text) or "")
+        # Palavra inteira reduzida ao singular ("gestores" e "gestor" caem no mesmo slot)
+        features = [(f"w:{stem(w)}", 1.0) for w in words]
+        for w in words:
+            padded = f"#{w}#"
+            for n in (2, 3):
+                features += [(f"c:{padded[i:i + n]}", 0.3) for i in range(len(padded) - n + 1)]
+        return features
+
+    def _slot(self, feature: str) -> Tuple[int, float]:
+        digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dim, 1.0 if (value >> 63) & 1 else -1.0
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                slot, sign = self._slot(feature)
+                vectors[row, slot] += sign * weight
+        return _normalize(vectors)
+
+
+class SentenceTransformerEmbedder:
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.name = model_name
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self._model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self._model.encode(list(texts), batch_size=64, convert_to_numpy=True, show_progress_bar=False)
+        return _normalize(vectors.astype(np.float32))
+
+
+def create_embedder():
+    """Modelo local configurado em EMBEDDING_MODEL, ou o embedder por hashing"""
+    if EMBEDDING_MODEL:
+        try:
+            return SentenceTransformerEmbedder(EMBEDDING_MODEL)
+        except ImportError:
+            logger.warning("EMBEDDING_MODEL definido, mas sentence-transformers não está instalado; usando hashing")
+        except Exception as e:
+            logger.error(f"Erro ao carregar o modelo de embeddings {EMBEDDING_MODEL}: {e}; usando hashing")
+    return HashingEmbedder()
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class VectorIndex:
+    def __init__(self, dim: int, ann_threshold: int = VECTOR_ANN_THRESHOLD, probes: int = VECTOR_ANN_PROBES):
+        self.dim = dim
+        self.ann_threshold = ann_threshold
+        self.probes = probes
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        # IVF: centróides e lista de cada linha (-1 = vetor removido)
+        self._centroids: Optional[np.ndarray] = None
+        self._lists = np.zeros(0, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _grow(self, needed: int):
+        if needed <= self._matrix.shape[0]:
+            return
+        capacity = max(needed, 2 * self._matrix.shape[0], 1024)
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        matrix[:len(self._ids)] = self._matrix[:len(self._ids)]
+        lists = np.full(capacity, -1, dtype=np.int32)
+        lists[:len(self._ids)] = self._lists[:len(self._ids)]
+        self._matrix, self._lists = matrix, lists
+
+    def upsert_many(self, ids: Sequence[str], vectors: np.ndarray):
+        """Insere ou substitui vetores (já normalizados)"""
+        self._grow(len(self._ids) + len(ids))
+        for item_id, vector in zip(ids, vectors):
+            row = self._rows.get(item_id)
+            if row is None:
+                row = len(self._ids)
+                self._ids.append(item_id)
+                self._rows[item_id] = row
+            self._matrix[row] = vector
+            self._lists[row] = self._nearest_list(vector)
+        if self._centroids is None and len(self) >= self.ann_threshold:
+            self.train()
+
+    def remove(self, item_id: str):
+        row = self._rows.pop(item_id, None)
+        if row is not None:
+            self._ids[row] = None
+            self._matrix[row] = 0
+            self._lists[row] = -1
+
+    def _nearest_list(self, vector: np.ndarray) -> int:
+        if self._centroids is None:
+            return 0
+        return int(np.argmax(self._centroids @ vector))
+
+    def train(self, iterations: int = 8, sample_size: int = 50000, seed: int = 0):
+        """Particiona os vetores em ~sqrt(n) listas por k-means esférico"""
+        rows = np.fromiter(self._rows.values(), dtype=np.int64)
+        if len(rows) < self.ann_threshold:
+            self._centroids = None
+            self._lists[rows] = 0
+            return
+        rng = np.random.default_rng(seed)
+        n_lists = int(np.sqrt(len(rows)))
+        sample = self._matrix[rng.choice(rows, size=min(sample_size, len(rows)), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for k in range(n_lists):
+                members = sample[assignment == k]
+                if len(members):
+                    centroids[k] = members.sum(axis=0)
+            centroids = _normalize(centroids)
+        self._centroids = centroids
+        for start in range(0, len(rows), 10000):
+            chunk = rows[start:start + 10000]
+            self._lists[chunk] = np.argmax(self._matrix[chunk] @ centroids.T, axis=1)
+
+    def search(self, query: np.ndarray, k: int, allowed_ids: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """Top-K (id, similaridade); allowed_ids restringe a busca a um subconjunto"""
+        if not len(self) or k <= 0:
+            return []
+        if allowed_ids is not None:
+            rows = np.fromiter((self._rows[i] for i in allowed_ids if i in self._rows), dtype=np.int64)
+        elif self._centroids is not None:
+            probes = np.argsort(-(self._centroids @ query))[:self.probes]
+            rows = np.flatnonzero(np.isin(self._lists[:len(self._ids)], probes))
+        else:
+            rows = np.flatnonzero(self._lists[:len(self._ids)] >= 0)
+        if not len(rows):
+            return []
+
+        scores = self._matrix[rows] @ query
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._ids[rows[i]], float(scores[i])) for i in top]
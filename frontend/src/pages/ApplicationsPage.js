@@ -28,7 +28,7 @@ export default function ApplicationsPage() {
   const fetchData = async () => {
     try {
       const [appsRes, jobsRes] = await Promise.all([
-        api.get('/applications'),
+        api.get('/applications', { params: { sort: 'score' } }),
         api.get('/jobs/')
       ]);
       setApplications(appsRes.data);
@@ -256,10 +256,10 @@ export default function ApplicationsPage() {
                                   <h4 className="font-semibold text-sm" data-testid={`app-candidate-${app.id}`}>
                                     {app.candidate?.full_name || 'Candidato Anônimo'}
                                   </h4>
-                                  {app.stage_score && (
+                                  {app.scores?.total != null && (
                                     <Badge className="bg-green-100 text-green-700" data-testid={`app-score-${app.id}`}>
                                       <Star className="w-3 h-3 mr-1" />
-                                      {app.stage_score.toFixed(0)}
+                                      {app.scores.total.toFixed(0)}
                                     </Badge>
                                   )}
                                 </div>
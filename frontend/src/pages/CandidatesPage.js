@@ -6,8 +6,15 @@ const CandidatesPage = () => {
   const navigate = useNavigate();
   const [loading, setLoading] = useState(false);
   const [candidates, setCandidates] = useState([]);
+  // Paginação por cursor: a busca devolve uma página e next_cursor
+  const [nextCursor, setNextCursor] = useState(null);
+  const [total, setTotal] = useState(null);
+  const [lastSearch, setLastSearch] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [showFilters, setShowFilters] = useState(true);
   const [useAI, setUseAI] = useState(false);
+  // Modo do ranking da busca por IA informado pelo backend: 'semantic' ou 'lexical'
+  const [rankingMode, setRankingMode] = useState(null);
   
   // Opções de filtros
   const [educationLevels, setEducationLevels] = useState([]);
@@ -59,9 +66,15 @@ const CandidatesPage = () => {
       
       const res = await api.post('/candidates/advanced-search', searchData);
       setCandidates(res.data.candidates || []);
+      setNextCursor(res.data.next_cursor || null);
+      setTotal(res.data.total ?? null);
+      setLastSearch(searchData);
+      setRankingMode(res.data.used_ai ? res.data.ranking_mode : null);
       
-      if (res.data.used_ai) {
+      if (res.data.used_ai && res.data.ranking_mode === 'semantic') {
         alert(`✨ Busca por IA ativada! ${res.data.total} candidatos encontrados e ordenados por relevância.`);
+      } else if (res.data.used_ai) {
+        alert(`🔤 ${res.data.total} candidatos encontrados e ordenados por similaridade de termos (busca semântica não configurada no servidor).`);
       }
     } catch (err) {
       console.error('Erro na busca:', err);
@@ -84,9 +97,38 @@ const CandidatesPage = () => {
       ai_query: ''
     });
     setCandidates([]);
+    setNextCursor(null);
+    setTotal(null);
+    setLastSearch(null);
     setUseAI(false);
+    setRankingMode(null);
   };
   
+  // Próxima página da mesma busca, a partir do cursor retornado
+  const handleLoadMore = async () => {
+    if (!nextCursor || !lastSearch) return;
+    try {
+      setLoadingMore(true);
+      const res = await api.post('/candidates/advanced-search', {
+        ...lastSearch,
+        cursor: nextCursor,
+        include_total: false
+      });
+      setCandidates(prev => [...prev, ...(res.data.candidates || [])]);
+      setNextCursor(res.data.next_cursor || null);
+    } catch (err) {
+      console.error('Erro ao carregar mais candidatos:', err);
+      alert('Erro ao carregar mais candidatos');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+  
+  // Com next_cursor ainda há páginas: a lista exibida é parcial
+  const countLabel = nextCursor
+    ? `${candidates.length} de ${total ?? 'mais'}`
+    : `${candidates.length}`;
+  
   const calculateAge = (birthdate) => {
     if (!birthdate) return 'N/A';
     const birth = new Date(birthdate);
@@ -178,7 +220,9 @@ const CandidatesPage = () => {
               />
               {useAI && (
                 <p className="mt-2 text-xs text-gray-500">
-                  💡 A IA irá buscar e ranquear candidatos por relevância semântica, não apenas palavras-chave exatas.
+                  {rankingMode === 'lexical'
+                    ? '💡 Busca semântica não configurada no servidor: os candidatos são ranqueados por similaridade de termos.'
+                    : '💡 A IA irá buscar e ranquear candidatos por relevância semântica, não apenas palavras-chave exatas.'}
                 </p>
               )}
             </div>
@@ -314,7 +358,7 @@ const CandidatesPage = () => {
             <h3 className="text-lg font-semibold text-gray-800">
               Resultados da Busca
               {candidates.length > 0 && (
-                <span className="ml-2 text-blue-600">({candidates.length} candidatos)</span>
+                <span className="ml-2 text-blue-600">({countLabel} candidatos)</span>
               )}
             </h3>
           </div>
@@ -339,7 +383,7 @@ const CandidatesPage = () => {
                         </h4>
                         {candidate.ai_relevance_score && (
                           <span className="px-2 py-1 bg-purple-100 text-purple-800 text-xs font-bold rounded-full">
-                            ✨ Relevância IA: {candidate.ai_relevance_score}
+                            {rankingMode === 'lexical' ? '🔤 Similaridade' : '✨ Relevância IA'}: {candidate.ai_relevance_score}
                           </span>
                         )}
                       </div>
@@ -424,6 +468,17 @@ const CandidatesPage = () => {
                   </div>
                 </div>
               ))}
+              {nextCursor && (
+                <div className="px-6 py-4 text-center">
+                  <button
+                    onClick={handleLoadMore}
+                    disabled={loadingMore}
+                    className="px-6 py-2 bg-white border border-blue-600 text-blue-600 rounded-lg hover:bg-blue-50 text-sm font-medium disabled:opacity-50"
+                  >
+                    {loadingMore ? 'Carregando...' : 'Carregar mais candidatos'}
+                  </button>
+                </div>
+              )}
             </div>
           )}
         </div>
@@ -7,8 +7,15 @@ const CandidatesPagePremium = () => {
   const navigate = useNavigate();
   const [loading, setLoading] = useState(false);
   const [candidates, setCandidates] = useState([]);
+  // Paginação por cursor: a busca devolve uma página e next_cursor
+  const [nextCursor, setNextCursor] = useState(null);
+  const [total, setTotal] = useState(null);
+  const [lastSearch, setLastSearch] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [showFilters, setShowFilters] = useState(true);
   const [useAI, setUseAI] = useState(false);
+  // Modo do ranking da busca por IA informado pelo backend: 'semantic' ou 'lexical'
+  const [rankingMode, setRankingMode] = useState(null);
   
   // Opções de filtros
   const [educationLevels, setEducationLevels] = useState([]);
@@ -60,9 +67,15 @@ const CandidatesPagePremium = () => {
       
       const res = await api.post('/candidates/advanced-search', searchData);
       setCandidates(res.data.candidates || []);
+      setNextCursor(res.data.next_cursor || null);
+      setTotal(res.data.total ?? null);
+      setLastSearch(searchData);
+      setRankingMode(res.data.used_ai ? res.data.ranking_mode : null);
       
-      if (res.data.used_ai) {
+      if (res.data.used_ai && res.data.ranking_mode === 'semantic') {
         alert(`✨ Busca por IA ativada! ${res.data.total} candidatos encontrados e ordenados por relevância.`);
+      } else if (res.data.used_ai) {
+        alert(`🔤 ${res.data.total} candidatos encontrados e ordenados por similaridade de termos (busca semântica não configurada no servidor).`);
       }
     } catch (err) {
       console.error('Erro na busca:', err);
@@ -85,9 +98,38 @@ const CandidatesPagePremium = () => {
       ai_query: ''
     });
     setCandidates([]);
+    setNextCursor(null);
+    setTotal(null);
+    setLastSearch(null);
     setUseAI(false);
+    setRankingMode(null);
   };
   
+  // Próxima página da mesma busca, a partir do cursor retornado
+  const handleLoadMore = async () => {
+    if (!nextCursor || !lastSearch) return;
+    try {
+      setLoadingMore(true);
+      const res = await api.post('/candidates/advanced-search', {
+        ...lastSearch,
+        cursor: nextCursor,
+        include_total: false
+      });
+      setCandidates(prev => [...prev, ...(res.data.candidates || [])]);
+      setNextCursor(res.data.next_cursor || null);
+    } catch (err) {
+      console.error('Erro ao carregar mais candidatos:', err);
+      alert('Erro ao carregar mais candidatos');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+  
+  // Com next_cursor ainda há páginas: a lista exibida é parcial
+  const countLabel = nextCursor
+    ? `${candidates.length} de ${total ?? 'mais'}`
+    : `${candidates.length}`;
+  
   const calculateAge = (birthdate) => {
     if (!birthdate) return 'N/A';
     const birth = new Date(birthdate);
@@ -186,7 +228,11 @@ const CandidatesPagePremium = () => {
                   <svg className="info-icon" viewBox="0 0 24 24" fill="currentColor">
                     <path d="M12 2C6.48 2 2 6.48 2 12s4.48 10 10 10 10-4.48 10-10S17.52 2 12 2zm1 15h-2v-2h2v2zm0-4h-2V7h2v6z"/>
                   </svg>
-                  <span>A IA analisará semanticamente os perfis e ranqueará por relevância</span>
+                  <span>
+                    {rankingMode === 'lexical'
+                      ? 'Busca semântica não configurada no servidor: os perfis são ranqueados por similaridade de termos'
+                      : 'A IA analisará semanticamente os perfis e ranqueará por relevância'}
+                  </span>
                 </div>
               )}
             </div>
@@ -344,7 +390,7 @@ const CandidatesPagePremium = () => {
             <div>
               <h3>Resultados da Busca</h3>
               {candidates.length > 0 && (
-                <p className="results-count">{candidates.length} candidato{candidates.length !== 1 ? 's' : ''} encontrado{candidates.length !== 1 ? 's' : ''}</p>
+                <p className="results-count">{countLabel} candidato{candidates.length !== 1 ? 's' : ''} encontrado{candidates.length !== 1 ? 's' : ''}</p>
               )}
             </div>
           </div>
@@ -376,7 +422,7 @@ const CandidatesPagePremium = () => {
                             <svg className="badge-icon" viewBox="0 0 24 24" fill="currentColor">
                               <path d="M12 2L2 7v10c0 5.55 3.84 10.74 9 12 5.16-1.26 9-6.45 9-12V7l-10-5z"/>
                             </svg>
-                            Relevância IA: {candidate.ai_relevance_score}
+                            {rankingMode === 'lexical' ? 'Similaridade' : 'Relevância IA'}: {candidate.ai_relevance_score}
                           </span>
                         )}
                       </div>
@@ -461,12 +507,25 @@ const CandidatesPagePremium = () => {
                   </div>
                 </div>
               ))}
+              {nextCursor && (
+                <div className="load-more">
+                  <button onClick={handleLoadMore} disabled={loadingMore} className="btn-secondary">
+                    {loadingMore ? 'Carregando...' : 'Carregar mais candidatos'}
+                  </button>
+                </div>
+              )}
             </div>
           )}
         </div>
       </div>
 
       <style jsx>{`
+        .load-more {
+          display: flex;
+          justify-content: center;
+          padding: var(--space-lg);
+        }
+
         .candidates-premium-page {
           min-height: 100vh;
           background: var(--ciatos-bg-secondary);
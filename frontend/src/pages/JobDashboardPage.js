@@ -24,7 +24,7 @@ export default function JobDashboardPage() {
     try {
       const [jobRes, appsRes, statsRes] = await Promise.all([
         api.get(`/jobs/${jobId}`),
-        api.get(`/applications?job_id=${jobId}`),
+        api.get(`/applications?job_id=${jobId}&sort=score`),
         api.get(`/reports/pipeline/${jobId}`)
       ]);
 
@@ -209,11 +209,11 @@ export default function JobDashboardPage() {
                       </div>
                     </div>
                     <div className="flex items-center gap-4">
-                      {app.stage_score && (
+                      {app.scores?.total != null && (
                         <div className="text-right">
                           <p className="text-sm text-gray-600">Score</p>
                           <p className="text-lg font-bold text-green-600" data-testid={`score-${app.id}`}>
-                            {app.stage_score.toFixed(1)}
+                            {app.scores.total.toFixed(1)}
                           </p>
                         </div>
                       )}
@@ -28,9 +28,16 @@ const JobPipelinePage = () => {
     loadPipeline();
   }, [jobId]);
   
-  const loadPipeline = async () => {
+  // Pontuações são calculadas em background: recarregar enquanto houver cards pendentes
+  useEffect(() => {
+    if (!pipeline?.cards.some(c => c.scoreStatus === 'pending')) return;
+    const timer = setTimeout(() => loadPipeline({ silent: true }), 5000);
+    return () => clearTimeout(timer);
+  }, [pipeline]);
+  
+  const loadPipeline = async ({ silent = false } = {}) => {
     try {
-      setLoading(true);
+      if (!silent) setLoading(true);
       setError('');
       
       // Construir query params com filtros
@@ -126,13 +133,27 @@ const JobPipelinePage = () => {
     <div className="bg-white p-4 rounded-lg shadow border border-gray-200 hover:shadow-md transition-shadow cursor-move">
       <div className="flex justify-between items-start mb-2">
         <h4 className="font-semibold text-gray-900">{card.candidateName}</h4>
-        <span className={`px-2 py-1 rounded text-xs font-bold ${
-          card.scoreTotal >= 80 ? 'bg-green-100 text-green-800' :
-          card.scoreTotal >= 60 ? 'bg-yellow-100 text-yellow-800' :
-          'bg-red-100 text-red-800'
-        }`}>
-          {card.scoreTotal}
-        </span>
+        {card.scoreStatus === 'pending' ? (
+          <span className="px-2 py-1 rounded text-xs font-bold bg-gray-100 text-gray-500" title="Pontuação em cálculo">
+            ...
+          </span>
+        ) : card.scoreStatus === 'failed' ? (
+          <span className="px-2 py-1 rounded text-xs font-bold bg-gray-100 text-gray-500" title="Não foi possível calcular a pontuação">
+            ⚠
+          </span>
+        ) : card.scoreStatus === 'unscored' ? (
+          <span className="px-2 py-1 rounded text-xs font-bold bg-gray-100 text-gray-400" title="Sem pontuação">
+            –
+          </span>
+        ) : (
+          <span className={`px-2 py-1 rounded text-xs font-bold ${
+            card.scoreTotal >= 80 ? 'bg-green-100 text-green-800' :
+            card.scoreTotal >= 60 ? 'bg-yellow-100 text-yellow-800' :
+            'bg-red-100 text-red-800'
+          }`}>
+            {card.scoreTotal}
+          </span>
+        )}
       </div>
       
       {card.candidateCity && (